@@ -38,14 +38,9 @@ a = Analysis(
         'PyQt5.QtGui', 
         'PyQt5.QtWidgets',
         
-        # Mapping and web-related dependencies
-        'folium',
-        'folium.plugins',
-        'branca',
-        'branca.colormap',
-        'jinja2',
-        'markupsafe',
-        'requests',
+        # Map page server (level-of-detail track data for the web view)
+        'http.server',
+        'numpy',
         
         # Standard library modules (usually auto-detected but included for safety)
         'json',
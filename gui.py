@@ -2,16 +2,298 @@ import sys
 import os
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
                              QWidget, QPushButton, QLabel, QTextEdit, QFileDialog, 
-                             QMessageBox, QTableWidget, QTableWidgetItem, QSplitter,
-                             QTabWidget, QComboBox)
-from PyQt5.QtCore import Qt, QUrl
+                             QMessageBox, QTableView, QLineEdit, QSplitter,
+                             QTabWidget, QComboBox, QProgressBar, QCheckBox)
+from PyQt5.QtCore import Qt, QUrl, QObject, QThread, QTimer, pyqtSignal, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QFont, QPixmap
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 import csv
-import folium
-import tempfile
-import subprocess
-import shutil
+import time
+import numpy as np
+
+import nmea_parser
+import nmea_gsa
+import nmea_gsv
+from nmea_checksum import ChecksumValidator
+from nmea_io import read_nmea_data, read_nmea_progress
+from nmea_map_server import MapServer, TrackLevels
+from nmea_profile import StageProfile
+from nmea_cache import ParseCache
+from nmea_follow import FOLLOW_INTERVAL, AppendedLines
+from nmea_filter import parse_filter
+
+
+class ParseWorker(QObject):
+    """Parses an NMEA file on a background thread, delivering records in batches"""
+    progress = pyqtSignal(int, int, int)  # bytes read, sentences read, file size
+    batch = pyqtSignal(list)              # decoded records since the previous batch
+    cached = pyqtSignal(list)             # table rows of an earlier parse, instead of batches
+    finished = pyqtSignal(object, bool)   # ChecksumValidator, cancelled
+    failed = pyqtSignal(str)
+
+    # Seconds between batch / progress signals, so the UI thread is not flooded
+    INTERVAL = 0.1
+
+    def __init__(self, filename, parser_type, profile=False, cache=None, follow_from=None, where=None):
+        super().__init__()
+        self.filename = filename
+        self.parser_type = parser_type
+        # nmea_filter.SentenceFilter: sentences outside it are dropped before decoding
+        self.where = where
+        # Follow mode: parse only the complete lines after this byte offset; offset is where parsing stopped
+        self.follow_from = follow_from
+        self.offset = follow_from
+        # Time per parse stage, filled while running (None when not profiling)
+        self.profile = StageProfile() if profile else None
+        # ParseCache checked before parsing; content_hash is the hash of the parsed file
+        self.cache = cache
+        self.content_hash = None
+        self.from_cache = False
+        self.position = 0
+        self.size = 0  # File size when parsing started
+        self.sentences = 0
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _read(self):
+        if self.follow_from is not None:
+            lines = AppendedLines(self.filename, self.follow_from)
+            for sentence in lines:
+                if self._cancelled:
+                    return
+                self.position = self.offset = lines.offset
+                self.sentences += 1
+                yield sentence
+            self.position = self.offset = lines.offset
+            return
+        for sentence, position in read_nmea_progress(self.filename):
+            if self._cancelled:
+                return
+            self.position = position
+            self.sentences += 1
+            yield sentence
+
+    def run(self):
+        try:
+            total = self.size = os.path.getsize(self.filename)
+            # Corrupt sentences are kept but counted
+            validator = ChecksumValidator("warn")
+            if self.cache is not None:
+                rows = self.cache.lookup(self.filename, self.parser_type)
+                self.content_hash = self.cache.known_hash(self.filename)
+                if rows is not None:
+                    self.from_cache = True
+                    self.cached.emit(rows)
+                    self.progress.emit(total, 0, total)
+                    self.finished.emit(validator, False)
+                    return
+            pending = []
+            last_emit = time.monotonic()
+            if self.parser_type == "GSV":
+                # GSV groups are reassembled into one row per satellite, stamped with the GGA/RMC time
+                records = nmea_parser.iter_records(self._read(), nmea_gsv.SKY_VIEW_TYPES, checksum=validator,
+                                                   profile=self.profile, where=self.where)
+                records = (("GSV", row) for row in nmea_gsv.iter_satellites(records))
+            else:
+                records = nmea_parser.iter_records(self._read(), [self.parser_type], checksum=validator,
+                                                   profile=self.profile, where=self.where)
+            for _, data in records:
+                pending.append(data)
+                if time.monotonic() - last_emit >= self.INTERVAL:
+                    self.batch.emit(pending)
+                    self.progress.emit(self.position, self.sentences, total)
+                    pending = []
+                    last_emit = time.monotonic()
+            if pending:
+                self.batch.emit(pending)
+            self.progress.emit(self.position, self.sentences, total)
+            self.finished.emit(validator, self._cancelled)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+# Coordinate columns of the parser types the map supports
+MAP_COLUMNS = {
+    "GGA": ["latitude", "longitude"],
+    "RMC": ["latitude", "longitude"],
+    "GLL": ["Latitude", "Longitude"],
+}
+
+
+def map_coordinates(sentences, parser_type, where=None):
+    """[[lat, lon], ...] of the sentences of parser_type, or None for parser types without coordinates.
+    Decoded with column projection: only the two coordinates of every sentence are converted."""
+    if parser_type not in MAP_COLUMNS:
+        return None
+    records = nmea_parser.iter_records(sentences, [parser_type], where=where,
+                                       columns={parser_type: MAP_COLUMNS[parser_type]})
+    return [data for _, data in records]
+
+
+class MapWorker(QObject):
+    """Decodes the coordinates of a file and precomputes the multi-resolution levels of its track
+    on a background thread. The map page then fetches only the level and viewport it shows from
+    the in-process map server."""
+    finished = pyqtSignal(object, int)  # TrackLevels, point count
+    failed = pyqtSignal(str)
+
+    def __init__(self, filename, parser_type, where=None):
+        super().__init__()
+        self.filename = filename
+        self.parser_type = parser_type
+        self.where = where
+
+    def run(self):
+        try:
+            coordinates = map_coordinates(read_nmea_data(self.filename), self.parser_type, self.where)
+            self.finished.emit(TrackLevels(coordinates), len(coordinates))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class NMEATableModel(QAbstractTableModel):
+    """Table model reading cells straight from the parsed rows, so only visible cells are turned into text.
+    Sorting and filtering build a row index array; the rows themselves are never copied."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.headers = []
+        self.rows = []
+        self._index = None  # Visible row -> position in self.rows, None shows every row in order
+        self._sort = None   # (column, order)
+        self._keys = None   # Sort keys of the visible rows in ascending order, while sorted
+        self._filter = ''
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows) if self._index is None else len(self._index)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        values = self.rows[self.source_row(index.row())]
+        return str(values[index.column()]) if index.column() < len(values) else ''
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section] if section < len(self.headers) else None
+        # Row numbers of the original file order, also when sorted or filtered
+        return str(self.source_row(section) + 1)
+
+    def source_row(self, row):
+        return row if self._index is None else int(self._index[row])
+
+    def set_table(self, headers, rows):
+        """Show rows (a list that is referenced, not copied) under new headers"""
+        self.beginResetModel()
+        self.headers = list(headers)
+        self.rows = rows
+        self._sort = None
+        self._update_index()
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        """Add rows at the end; while a filter is active only matching rows become visible,
+        while a sort is active they are merged into the sorted order"""
+        if not rows:
+            return
+        start = len(self.rows)
+        if self._index is None:
+            self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+            return
+        self.rows.extend(rows)
+        new = np.array([row for row in range(start, len(self.rows)) if self._matches(self.rows[row])], dtype=np.int64)
+        if not len(new):
+            return
+        if self._sort is None:
+            self.beginInsertRows(QModelIndex(), len(self._index), len(self._index) + len(new) - 1)
+            self._index = np.concatenate([self._index, new])
+            self.endInsertRows()
+            return
+        self._merge_sorted(new)
+
+    def _merge_sorted(self, new):
+        """Inserts the new rows (after every existing row) at their sorted positions"""
+        keys = self._sort_keys(new)
+        if keys.dtype.kind != self._keys.dtype.kind:
+            # A text value in a column sorted as numbers so far: the whole column sorts as text now
+            self.beginResetModel()
+            self._update_index()
+            self.endResetModel()
+            return
+        positions = np.argsort(keys, kind='stable')
+        new, keys = new[positions], keys[positions]
+        descending = self._sort[1] == Qt.DescendingOrder
+        ascending_index = self._index[::-1] if descending else self._index
+        # side='right': the new rows come after equal keys, as a stable sort of the whole table puts them
+        positions = np.searchsorted(self._keys, keys, side='right')
+        appended = bool(np.all(positions == len(self._index)))
+        if appended:
+            # The usual case for a time-sorted stream: one insertion at the end (the top when descending)
+            first = 0 if descending else len(self._index)
+            self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+        else:
+            self.beginResetModel()
+        ascending_index = np.insert(ascending_index, positions, new)
+        self._keys = np.insert(self._keys.astype(np.result_type(self._keys, keys)), positions, keys)
+        self._index = ascending_index[::-1] if descending else ascending_index
+        if appended:
+            self.endInsertRows()
+        else:
+            self.endResetModel()
+
+    def set_filter(self, text):
+        """Show only rows containing text (case-insensitive) in any column"""
+        self.beginResetModel()
+        self._filter = text.strip().lower()
+        self._update_index()
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.beginResetModel()
+        self._sort = (column, order) if column >= 0 else None
+        self._update_index()
+        self.endResetModel()
+
+    def _matches(self, values):
+        return any(self._filter in str(value).lower() for value in values)
+
+    def _sort_keys(self, rows):
+        column = self._sort[0]
+        keys = [self.rows[row][column] if column < len(self.rows[row]) else '' for row in rows]
+        try:
+            # Numeric columns sort by value, everything else as text
+            return np.array(keys, dtype=float)
+        except (ValueError, TypeError):
+            return np.array([str(key) for key in keys])
+
+    def _update_index(self):
+        index = None
+        self._keys = None
+        if self._filter:
+            index = np.array([row for row, values in enumerate(self.rows) if self._matches(values)], dtype=np.int64)
+        if self._sort is not None:
+            candidates = np.arange(len(self.rows)) if index is None else index
+            keys = self._sort_keys(candidates)
+            positions = np.argsort(keys, kind='stable')
+            self._keys = keys[positions]
+            if self._sort[1] == Qt.DescendingOrder:
+                positions = positions[::-1]
+            index = candidates[positions]
+        self._index = index
+
 
 class NMEAParserGUI(QMainWindow):
     def __init__(self):
@@ -81,16 +363,32 @@ class NMEAParserGUI(QMainWindow):
         parser_layout = QHBoxLayout()
         parser_layout.addWidget(QLabel('Parser Type:'))
         self.parser_combo = QComboBox()
-        self.parser_combo.addItem("Default (GGA Parser)", "nmea_gga.py")
-        self.parser_combo.addItem("GSA Parser", "nmea_gsa.py")
-        self.parser_combo.addItem("GLL Parser", "nmea_gll.py")
-        self.parser_combo.addItem("RMC Parser", "nmea_rmc.py")
-        self.parser_combo.addItem("VTG Parser", "nmea_vtg.py")
-        self.parser_combo.addItem("GSV Parser", "nmea_gsv.py")
+        self.parser_combo.addItem("Default (GGA Parser)", "GGA")
+        self.parser_combo.addItem("GSA Parser", "GSA")
+        self.parser_combo.addItem("GLL Parser", "GLL")
+        self.parser_combo.addItem("RMC Parser", "RMC")
+        self.parser_combo.addItem("VTG Parser", "VTG")
+        self.parser_combo.addItem("GSV Parser", "GSV")
         self.parser_combo.setEnabled(False)  # Initially disabled
         parser_layout.addWidget(self.parser_combo)
+        # Time per parse stage, shown in the status line when processing finishes
+        self.profile_check = QCheckBox('Profile stages')
+        parser_layout.addWidget(self.profile_check)
+        # Keep parsing the lines a receiver appends to the file
+        self.follow_check = QCheckBox('Follow file')
+        self.follow_check.toggled.connect(self.on_follow_toggled)
+        parser_layout.addWidget(self.follow_check)
         layout.addLayout(parser_layout)
 
+        # Selection applied while parsing: only matching sentences are decoded
+        where_layout = QHBoxLayout()
+        self.where_edit = QLineEdit()
+        self.where_edit.setPlaceholderText('e.g. time=12:00-12:05 box=39.9,32.7,40.1,33.0 fix>=4 status=A '
+                                           '(empty: every sentence)')
+        where_layout.addWidget(QLabel('Parse only:'))
+        where_layout.addWidget(self.where_edit)
+        layout.addLayout(where_layout)
+
         # Action buttons
         button_layout = QHBoxLayout()
         self.process_button = QPushButton('Process Data')
@@ -107,8 +405,13 @@ class NMEAParserGUI(QMainWindow):
         self.show_map_button = QPushButton('Show on Map')
         self.show_map_button.clicked.connect(self.show_map)
         self.show_map_button.setEnabled(False)
+
+        self.cancel_button = QPushButton('Cancel')
+        self.cancel_button.clicked.connect(self.cancel_processing)
+        self.cancel_button.setEnabled(False)
         
         button_layout.addWidget(self.process_button)
+        button_layout.addWidget(self.cancel_button)
         button_layout.addWidget(self.save_button)
         button_layout.addWidget(self.show_map_button)
         button_layout.addWidget(self.clear_button)
@@ -124,14 +427,33 @@ class NMEAParserGUI(QMainWindow):
         left_widget.setLayout(left_layout)
 
         left_layout.addWidget(QLabel('GPS Data'))
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
+        # Filter box - rows containing the text in any column
+        filter_layout = QHBoxLayout()
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText('Text in any column, press Enter to apply')
+        self.filter_edit.returnPressed.connect(self.apply_filter)
+        filter_layout.addWidget(QLabel('Filter:'))
+        filter_layout.addWidget(self.filter_edit)
+        left_layout.addLayout(filter_layout)
+
+        # Variables for data
+        self.processed_data = []
+        self.selected_file = None
+
+        # Model/view table: cells are read from processed_data only when they are drawn
+        self.table = QTableView()
+        self.table_model = NMEATableModel(self)
         self.default_headers = ["Time of Fix(UTC)", 'Latitude', 'Longitude', 'Altitude', 'Number of Satellites', 'Fix Quality']
-        self.table.setHorizontalHeaderLabels(self.default_headers)
+        self.table_model.set_table(self.default_headers, self.processed_data)
+        self.table.setModel(self.table_model)
+        self.table.setSortingEnabled(True)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
 
         # Header alignment
         header = self.table.horizontalHeader()
         header.setDefaultAlignment(Qt.AlignCenter)
+        # Size columns from the first rows only, not the whole (possibly huge) table
+        header.setResizeContentsPrecision(200)
 
         # Set initial column widths
         self.table.setColumnWidth(0, 150)  # UTC column
@@ -163,9 +485,33 @@ class NMEAParserGUI(QMainWindow):
         self.status_label = QLabel('Ready - Please select an NMEA file')
         layout.addWidget(self.status_label)
 
-        # Variables for data
-        self.processed_data = []
-        self.selected_file = None
+        # Progress of background parsing (bytes of the input file)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        # Background thread and worker of the running parse / map job
+        self.worker_thread = None
+        self.worker = None
+
+        # In-process HTTP server of the map page, started by load_default_map
+        self.map_server = None
+
+        # Parsed tables of earlier runs, so reprocessing an unchanged file skips the parse
+        self.parse_cache = ParseCache()
+
+        # Follow mode: byte offset parsed so far, file size at the last parse, parser type, selection,
+        # and the timer checking for appended data
+        self.follow_offset = 0
+        self.follow_size = 0
+        self.follow_parser = None
+        self.follow_where = None
+        self.follow_timer = QTimer(self)
+        self.follow_timer.setSingleShot(True)
+        self.follow_timer.setInterval(int(FOLLOW_INTERVAL * 1000))
+        self.follow_timer.timeout.connect(self.follow_file)
+        # True once a track is on the map, so followed data updates it
+        self.map_shown = False
 
         # Load default map
         self.load_default_map()
@@ -245,314 +591,304 @@ class NMEAParserGUI(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, 'Error', f'Error reading CSV file: {str(e)}')
 
-    def read_parser_csv_output(self, csv_path, parser_type):
-        """Read CSV file according to parser type"""
-        self.processed_data = []
-        
-        try:
-            with open(csv_path, 'r', encoding='utf-8') as file:
-                csv_reader = csv.reader(file)
-                headers = next(csv_reader, None)  # Get headers
-
-                if parser_type == "nmea_gga.py":
-                    # GGA parser - standard format
-                    self.table.setColumnCount(6)
-                    self.table.setHorizontalHeaderLabels(["Time of Fix(UTC)", 'Latitude', 'Longitude', 'Altitude', 'Number of Satellites', 'Fix Quality'])
-
-                    for row in csv_reader:
-                        if len(row) >= 6:
-                            try:
-                                utc = row[0]
-                                lat = float(row[1])
-                                lon = float(row[2])
-                                alt = float(row[3])
-                                satellites = int(row[4])
-                                fix_quality = int(row[5])
-                                self.processed_data.append([utc, lat, lon, alt, satellites, fix_quality])
-                            except (ValueError, IndexError):
-                                continue
-                                
-                elif parser_type == "nmea_gll.py":
-                    # GLL parser 
-                    self.table.setColumnCount(5)
-                    self.table.setHorizontalHeaderLabels(["UTC Time", "Status", "Latitude", "Longitude", "Checksum"])
-                    
-                    for row in csv_reader:
-                        if len(row) >= 5:
-                            try:
-                                self.processed_data.append([row[0], row[1], row[2], row[3], row[4]])
-                            except IndexError:
-                                continue
-                                
-                elif parser_type == "nmea_gsa.py":
-                    # GSA parser
-                    self.table.setColumnCount(6)
-                    self.table.setHorizontalHeaderLabels(["Mode 1", "Mode 2", "Satellite IDs", "PDOP", "HDOP", "VDOP"])
-                    
-                    for row in csv_reader:
-                        if len(row) >= 6:
-                            try:
-                                self.processed_data.append([row[0], row[1], row[2], row[3], row[4], row[5]])
-                            except IndexError:
-                                continue
-                                
-                elif parser_type == "nmea_rmc.py":
-                    # RMC parser
-                    self.table.setColumnCount(10)
-                    self.table.setHorizontalHeaderLabels(["utc_time", "status", "latitude", "longitude", "speed", "direction", "date", "magnetic_variation", "variation_direction", "checksum"])
-                    
-                    for row in csv_reader:
-                        if len(row) >= 10:
-                            try:
-                                self.processed_data.append([row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8], row[9]])
-                            except IndexError:
-                                continue
-                                
-                elif parser_type == "nmea_vtg.py":
-                    # VTG parser
-                    self.table.setColumnCount(5)
-                    self.table.setHorizontalHeaderLabels(["true_track", "magnetic_track", "speed_knots", "speed_kilometers", "checksum"])
-                    
-                    for row in csv_reader:
-                        if len(row) >= 5:
-                            try:
-                                self.processed_data.append([row[0], row[1], row[2], row[3], row[4]])
-                            except IndexError:
-                                continue
-                                
-                elif parser_type == "nmea_gsv.py":
-                    # GSV parser - simplified format
-                    # Remove NMEA_Sentence and Total_GSV_Sentences columns
-                    simplified_headers = []
-                    if headers:
-                        # Filter out unnecessary columns
-                        for header in headers:
-                            if header not in ["NMEA_Sentence", "Total_GSV_Sentences"]:
-                                simplified_headers.append(header)
-                        
-                        self.table.setColumnCount(len(simplified_headers))
-                        self.table.setHorizontalHeaderLabels(simplified_headers)
-                    else:
-                        # Fallback: simplified format
-                        simplified_headers = ["Sentence_Number", "Satellites_in_View",
-                                            "Sat_1_ID", "Sat_1_Elevation", "Sat_1_Azimuth", "Sat_1_SNR",
-                                            "Sat_2_ID", "Sat_2_Elevation", "Sat_2_Azimuth", "Sat_2_SNR", 
-                                            "Sat_3_ID", "Sat_3_Elevation", "Sat_3_Azimuth", "Sat_3_SNR",
-                                            "Sat_4_ID", "Sat_4_Elevation", "Sat_4_Azimuth", "Sat_4_SNR",
-                                            "Checksum"]
-                        self.table.setColumnCount(len(simplified_headers))
-                        self.table.setHorizontalHeaderLabels(simplified_headers)
-
-                    # Process CSV data
-                    for row in csv_reader:
-                        if len(row) >= 5:
-                            try:
-                                # Remove unnecessary columns (NMEA_Sentence and Total_GSV_Sentences)
-                                filtered_row = []
-                                skip_indices = []
-                                
-                                if headers:
-                                    # Determine which columns to skip
-                                    for i, header in enumerate(headers):
-                                        if header in ["NMEA_Sentence", "Total_GSV_Sentences"]:
-                                            skip_indices.append(i)
-
-                                    # Create filtered row
-                                    for i, value in enumerate(row):
-                                        if i not in skip_indices:
-                                            filtered_row.append(value)
-                                else:
-                                    # Fallback: skip first 2 columns
-                                    filtered_row = row[2:]
-
-                                # Place checksum in the correct position - after the last filled satellite data
-                                processed_row = []
-                                checksum = ""
-
-                                # Find and separate checksum
-                                for i, value in enumerate(filtered_row):
-                                    if isinstance(value, str) and value.startswith('*'):
-                                        checksum = value
-                                        break
-                                    elif isinstance(value, str) and '*' in value:
-                                        checksum = '*' + value.split('*')[1]
-                                        filtered_row[i] = value.split('*')[0] if value.split('*')[0] else ''
-                                        break
-
-                                # Process row data
-                                if len(filtered_row) >= 2:  # At least sentence_number and satellites_in_view
-                                    processed_row.append(filtered_row[0])  # Sentence_Number
-                                    processed_row.append(filtered_row[1])  # Satellites_in_View
-
-                                    # Process satellite data (in groups of 4)
-                                    satellite_data = filtered_row[2:]
-
-                                    # Prepare fields for 4 satellites
-                                    for sat_index in range(4):
-                                        start_idx = sat_index * 4
-
-                                        # 4 fields for each satellite (ID, Elevation, Azimuth, SNR)
-                                        for field_idx in range(4):
-                                            data_idx = start_idx + field_idx
-                                            if data_idx < len(satellite_data) and satellite_data[data_idx] and not satellite_data[data_idx].startswith('*'):
-                                                processed_row.append(satellite_data[data_idx])
-                                            else:
-                                                processed_row.append('')  # Empty field
-
-                                    # Append checksum at the end
-                                    processed_row.append(checksum)
-
-                                    # Adjust according to table column count
-                                    target_columns = self.table.columnCount()
-                                    if len(processed_row) < target_columns:
-                                        processed_row.extend([''] * (target_columns - len(processed_row)))
-                                    elif len(processed_row) > target_columns:
-                                        processed_row = processed_row[:target_columns]
-                                    
-                                    self.processed_data.append(processed_row)
-                                    
-                            except (IndexError, ValueError) as e:
-                                print(f"GSV row processing error: {e}")
-                                continue
-                
-                return len(self.processed_data)
-                
-        except Exception as e:
-            print(f"CSV reading error: {e}")
-            return 0
+    def set_table_headers(self, parser_type):
+        """Set the table columns of a parser type"""
+        if parser_type == "GGA":
+            # GGA parser - standard format
+            headers = ["Time of Fix(UTC)", 'Latitude', 'Longitude', 'Altitude', 'Number of Satellites', 'Fix Quality']
+        elif parser_type == "GLL":
+            headers = ["UTC Time", "Status", "Latitude", "Longitude", "Checksum"]
+        elif parser_type == "GSA":
+            headers = ["Mode 1", "Mode 2", "Satellite IDs", "PDOP", "HDOP", "VDOP"]
+        elif parser_type == "RMC":
+            headers = ["utc_time", "status", "latitude", "longitude", "speed", "direction", "date", "magnetic_variation", "variation_direction", "checksum"]
+        elif parser_type == "VTG":
+            headers = ["true_track", "magnetic_track", "speed_knots", "speed_kilometers", "checksum"]
+        elif parser_type == "GSV":
+            # GSV parser - one row per satellite of every complete sky view
+            headers = ["Epoch (UTC)", "Constellation", "PRN", "Elevation", "Azimuth", "SNR"]
+        self.filter_edit.clear()
+        self.table_model.set_table(headers, self.processed_data)
+
+    @staticmethod
+    def table_rows(results, parser_type):
+        """Convert parser results into typed table rows according to parser type"""
+        rows = []
+
+        if parser_type == "GGA":
+            for utc, lat, lon, alt, satellites, fix_quality in results:
+                try:
+                    rows.append([utc, float(lat), float(lon), float(alt), int(satellites), int(fix_quality)])
+                except ValueError:
+                    continue
+
+        elif parser_type == "GLL":
+            for utc, status, lat, lon, checksum in results:
+                rows.append([utc, status, float(lat), float(lon), checksum])
+
+        elif parser_type == "GSA":
+            for data in results:
+                rows.append(nmea_gsa.csv_row(data))
+
+        elif parser_type == "RMC":
+            for row in results:
+                rows.append([row[0], row[1], float(row[2]), float(row[3])] + row[4:])
+
+        elif parser_type == "VTG":
+            for row in results:
+                rows.append(list(row))
+
+        elif parser_type == "GSV":
+            # row: (epoch, constellation, prn, elevation, azimuth, snr), missing numbers are -1
+            for epoch, constellation, prn, elevation, azimuth, snr in results:
+                rows.append([epoch, constellation, prn] + [value if value >= 0 else '' for value in (elevation, azimuth, snr)])
+
+        return rows
+
+    def start_worker(self, worker):
+        """Run a worker's run() on a new background thread"""
+        if self.worker_thread is not None:
+            # The previous job has finished, but its thread may not have stopped yet
+            self.worker_thread.quit()
+            self.worker_thread.wait()
+        self.worker_thread = QThread()
+        self.worker = worker
+        worker.moveToThread(self.worker_thread)
+        self.worker_thread.started.connect(worker.run)
+        worker.finished.connect(self.worker_thread.quit)
+        worker.failed.connect(self.worker_thread.quit)
+        self.worker_thread.start()
+
+    def set_busy(self, busy):
+        """Disable the actions that must not run while a background job is active"""
+        self.file_button.setEnabled(not busy)
+        self.process_button.setEnabled(not busy and self.selected_file is not None)
+        self.parser_combo.setEnabled(not busy and self.selected_file is not None)
+        self.clear_button.setEnabled(not busy)
+        self.cancel_button.setEnabled(busy)
+        if busy:
+            self.save_button.setEnabled(False)
+            self.show_map_button.setEnabled(False)
+
+    def cancel_processing(self):
+        """Ask the running parse job to stop; rows decoded so far are kept"""
+        if isinstance(self.worker, ParseWorker):
+            self.worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText('Cancelling...')
 
     def process_nmea_file(self):
-        """NMEA file processing function"""
+        """NMEA file processing function, parses on a background thread"""
+        # Get selected parser
+        selected_parser = self.parser_combo.currentData()
         try:
-            # Get selected parser
-            selected_parser = self.parser_combo.currentData()
-
-            # Create a temporary copy and save as data.txt
-            temp_dir = tempfile.mkdtemp()
-            temp_data_file = os.path.join(temp_dir, 'data.txt')
-            shutil.copy2(self.selected_file, temp_data_file)
-
-            # Find the selected parser script
-            parser_script_path = os.path.join(os.path.dirname(self.selected_file), selected_parser)
-            if not os.path.exists(parser_script_path):
-                parser_script_path = os.path.join(os.path.dirname(__file__), selected_parser)
-            
-            if not os.path.exists(parser_script_path):
-                QMessageBox.critical(
-                    self, 
-                    'Error', 
-                    f'Parser file not found: {selected_parser}'
-                )
-                return
-            
-            # Copy the parser file
-            temp_parser_file = os.path.join(temp_dir, selected_parser)
-            shutil.copy2(parser_script_path, temp_parser_file)
-
-            # Run the parser
-            result = subprocess.run(
-                ['python3', selected_parser], 
-                cwd=temp_dir,
-                capture_output=True, 
-                text=True,
-                encoding='utf-8'
-            )
-            
-            output_file_mapping = {
-                'nmea_gga.py': 'nmea_gga_output.csv',
-                'nmea_gsa.py': 'nmea_gsa_output.csv',
-                'nmea_gll.py': 'nmea_gll_output.csv',
-                'nmea_rmc.py': 'nmea_rmc_output.csv',
-                'nmea_vtg.py': 'nmea_vtg_output.csv',
-                'nmea_gsv.py': 'nmea_gsv_output.csv'
-            }
-            
-            expected_output = output_file_mapping.get(selected_parser, 'output.csv')
-            csv_output_path = os.path.join(temp_dir, expected_output)
-
-            # Read the generated CSV file
-            if os.path.exists(csv_output_path):
-                valid_count = self.read_parser_csv_output(csv_output_path, selected_parser)
-
-                # Update the table
-                self.update_table()
-
-                # Update status information
-                parser_name = self.parser_combo.currentText()
-                self.status_label.setText(f'Processed: {valid_count} valid sentences ({parser_name})')
-                self.save_button.setEnabled(True)
-
-                # Enable map button only for parsers containing coordinates
-                if selected_parser in ['nmea_gga.py', 'nmea_gll.py', 'nmea_rmc.py']:
-                    self.show_map_button.setEnabled(True)
-                else:
-                    self.show_map_button.setEnabled(False)
-
-                if valid_count > 0:
-                    QMessageBox.information(
-                        self, 
-                        'Success', 
-                        f'{valid_count} valid sentences processed successfully!\n'
-                        f'Data processed using {parser_name}.'
-                    )
-                else:
-                    QMessageBox.warning(
-                        self, 
-                        'Warning', 
-                        f'No valid sentences found! ({parser_name})'
-                    )
-            else:
-                QMessageBox.warning(
-                    self, 
-                    'Warning', 
-                    f'{selected_parser} was run but the CSV file could not be created!\n'
-                    f'Script output: {result.stdout}\n'
-                    f'Error: {result.stderr}'
-                )
+            where = parse_filter(self.where_edit.text())
+        except ValueError as e:
+            QMessageBox.warning(self, 'Warning', f'Invalid selection: {e}')
+            return
+        self.processed_data = []
+        self.set_table_headers(selected_parser)
+        self.map_shown = False
+        self.follow_offset = 0
+
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.set_busy(True)
+        self.status_label.setText(f'Processing {os.path.basename(self.selected_file)}...')
+
+        # Parse the file with the selected decoder only
+        # A followed file is growing, so it is parsed from its start without the cache;
+        # the cache holds whole tables, so a selection is not cached either
+        follow = self.follow_check.isChecked()
+        self.follow_timer.stop()
+        self.follow_where = where or None
+        worker = ParseWorker(self.selected_file, selected_parser, self.profile_check.isChecked(),
+                             None if follow or where else self.parse_cache, 0 if follow else None, where or None)
+        worker.batch.connect(self.on_parse_batch)
+        worker.cached.connect(self.on_parse_cached)
+        worker.progress.connect(self.on_parse_progress)
+        worker.finished.connect(self.on_parse_finished)
+        worker.failed.connect(self.on_parse_failed)
+        self.start_worker(worker)
+
+    def on_parse_batch(self, results):
+        """Append a batch of decoded records to the table while parsing continues"""
+        self.table_model.append_rows(self.table_rows(results, self.worker.parser_type))
+
+    def on_parse_cached(self, rows):
+        """Show the table rows of an earlier parse of the same file content"""
+        self.table_model.append_rows(rows)
+
+    def on_parse_progress(self, position, sentences, total):
+        self.progress_bar.setValue(int(position * 1000 / total) if total else 1000)
+        self.status_label.setText(f'Processing: {position / 1e6:.1f} / {total / 1e6:.1f} MB, '
+                                  f'{sentences} sentences, {len(self.processed_data)} records')
+
+    def on_parse_finished(self, validator, cancelled):
+        self.progress_bar.setVisible(False)
+        self.set_busy(False)
+        selected_parser = self.worker.parser_type
+        valid_count = len(self.processed_data)
+        self.fit_table_columns()
+
+        # Update status information
+        parser_name = self.parser_combo.currentText()
+        status = f'Processed: {valid_count} valid sentences ({parser_name})'
+        if self.worker.where is not None:
+            status += f' matching {self.worker.where}'
+        if cancelled:
+            status = f'Cancelled: {valid_count} valid sentences loaded ({parser_name})'
+        elif self.worker.from_cache:
+            status += ' - from cache'
+        elif valid_count > 0 and self.worker.cache is not None:
+            # Rows are cached only if the file did not change while it was parsed
+            self.parse_cache.store(self.selected_file, selected_parser, self.processed_data, self.worker.content_hash)
+        corrupt = validator.total_corrupt()
+        if corrupt:
+            status += f' - {corrupt} with checksum mismatch'
+        profile = self.worker.profile
+        if profile is not None:
+            # Largest stages in the status line, the full table as its tooltip
+            status += f' - {profile.total():.2f} s: {profile.summary()}'
+            self.status_label.setToolTip(f'<pre>{profile.report()}</pre>')
+        else:
+            self.status_label.setToolTip('')
+        self.status_label.setText(status)
+        self.enable_result_actions(selected_parser)
 
-            # Clean up temporary files
-            shutil.rmtree(temp_dir)
-            
-        except Exception as e:
-            QMessageBox.critical(
+        if cancelled:
+            return
+        if self.worker.follow_from is not None:
+            self.follow_offset = self.worker.offset
+            self.follow_size = self.worker.size
+            self.follow_parser = selected_parser
+            self.follow_timer.start()
+        if valid_count > 0:
+            QMessageBox.information(
                 self, 
-                'Error', 
-                f'Error occurred while running parser: {str(e)}'
+                'Success', 
+                f'{valid_count} valid sentences processed successfully!\n'
+                f'Data processed using {parser_name}.'
             )
-    
+        else:
+            QMessageBox.warning(
+                self, 
+                'Warning', 
+                f'No valid sentences found! ({parser_name})'
+            )
+
+    def enable_result_actions(self, parser_type):
+        """Enable saving, and the map for parsers containing coordinates, once there are rows"""
+        valid_count = len(self.processed_data)
+        self.save_button.setEnabled(valid_count > 0)
+        self.show_map_button.setEnabled(valid_count > 0 and parser_type in ['GGA', 'GLL', 'RMC'])
+
+    def on_follow_toggled(self, checked):
+        """Start following from what was parsed (Process Data starts it for a new file)"""
+        if not checked:
+            self.follow_timer.stop()
+        elif self.selected_file and self.follow_offset:
+            self.follow_timer.start()
+
+    def follow_file(self):
+        """Parse the lines appended to the followed file since the last check"""
+        if not self.follow_check.isChecked() or not self.selected_file:
+            return
+        try:
+            size = os.path.getsize(self.selected_file)
+        except OSError:
+            self.follow_timer.start()
+            return
+        if self.worker_thread is not None and self.worker_thread.isRunning():
+            # Another job (e.g. a map) is running; check again later
+            self.follow_timer.start()
+            return
+        parser_type = self.follow_parser
+        if size < self.follow_offset:
+            # Truncated or replaced: start over
+            self.follow_offset = 0
+            self.processed_data = []
+            self.set_table_headers(parser_type)
+        elif size == self.follow_size:
+            self.follow_timer.start()
+            return
+        self.follow_size = size
+
+        self.set_busy(True)
+        worker = ParseWorker(self.selected_file, parser_type, follow_from=self.follow_offset, where=self.follow_where)
+        worker.batch.connect(self.on_parse_batch)
+        worker.finished.connect(self.on_follow_finished)
+        worker.failed.connect(self.on_parse_failed)
+        self.follow_rows = len(self.processed_data)
+        self.start_worker(worker)
+
+    def on_follow_finished(self, validator, cancelled):
+        self.set_busy(False)
+        self.follow_offset = self.worker.offset
+        parser_type = self.worker.parser_type
+        added = len(self.processed_data) - self.follow_rows
+        self.enable_result_actions(parser_type)
+        self.status_label.setText(f'Following {os.path.basename(self.selected_file)}: '
+                                  f'{len(self.processed_data)} valid sentences (+{added})')
+        if cancelled:
+            return
+        if added and self.map_shown and parser_type in ['GGA', 'GLL', 'RMC']:
+            # Rebuild the track levels with the new points; the map keeps its view
+            self.set_busy(True)
+            self.cancel_button.setEnabled(False)
+            worker = MapWorker(self.selected_file, parser_type, self.follow_where)
+            worker.finished.connect(self.on_follow_map_finished)
+            worker.failed.connect(self.on_map_failed)
+            self.start_worker(worker)
+        else:
+            self.follow_timer.start()
+
+    def on_follow_map_finished(self, levels, point_count):
+        self.set_busy(False)
+        self.enable_result_actions(self.parser_combo.currentData())
+        version = self.map_server.set_track(levels)
+        self.map_view.page().runJavaScript(f'updateTrack({version})')
+        self.follow_timer.start()
+
+    def on_parse_failed(self, message):
+        self.progress_bar.setVisible(False)
+        self.set_busy(False)
+        QMessageBox.critical(
+            self, 
+            'Error', 
+            f'Error occurred while running parser: {message}'
+        )
+
+    def apply_filter(self):
+        """Filter the table by the text of the filter box"""
+        self.table_model.set_filter(self.filter_edit.text())
+        self.status_label.setText(f'Showing {self.table_model.rowCount()} of {len(self.processed_data)} rows')
+
     def update_table(self):
         """Update table function"""
-        self.table.setRowCount(len(self.processed_data))
-        
-        for row, data in enumerate(self.processed_data):
-            for col, value in enumerate(data):
-                item = QTableWidgetItem(str(value))
-                self.table.setItem(row, col, item)
+        self.table_model.set_table(self.table_model.headers, self.processed_data)
+        self.fit_table_columns()
 
-        # Adjust column widths
+    def fit_table_columns(self):
+        """Adjust column widths to the contents"""
         self.table.resizeColumnsToContents()
 
         # Set minimum column widths
-        for col in range(self.table.columnCount()):
+        for col in range(self.table_model.columnCount()):
             current_width = self.table.columnWidth(col)
-            min_width = 100 if col == self.table.columnCount() - 1 else 150
+            min_width = 100 if col == self.table_model.columnCount() - 1 else 150
             self.table.setColumnWidth(col, max(min_width, current_width))
     
     def load_default_map(self):
-        """Load the default map"""
-        try:
-            # Create a world map
-            m = folium.Map(location=[39.9334, 32.8597], zoom_start=6)  # Centered on Turkey
-
-            # Create a temporary file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.html')
-            m.save(temp_file.name)
-
-            # Load the map into the web view
-            self.map_view.load(QUrl.fromLocalFile(temp_file.name))
-            
-        except Exception as e:
-            print(f"Error loading default map: {e}")
+        """Load the default map (an empty track) from the map server"""
+        if self.map_server is None:
+            # Serves the map page and the level-of-detail track data to the web view
+            self.map_server = MapServer()
+            self.map_view.load(QUrl(self.map_server.url))
+        else:
+            version = self.map_server.set_track(TrackLevels([]))
+            self.map_view.page().runJavaScript(f'showTrack({version})')
 
     def show_map(self):
         """Show GPS data on the map"""
@@ -561,82 +897,48 @@ class NMEAParserGUI(QMainWindow):
             return
         
         try:
-            # Determine coordinate columns based on selected parser type
-            selected_parser = self.parser_combo.currentData()
-            
-            if selected_parser == "nmea_gga.py":
-                # GGA parser: lat=1, lon=2
-                lat_col, lon_col = 1, 2
-            elif selected_parser == "nmea_gll.py":
-                # GLL parser: lat=2, lon=3
-                lat_col, lon_col = 2, 3
-            elif selected_parser == "nmea_rmc.py":
-                # RMC parser: lat=2, lon=3
-                lat_col, lon_col = 2, 3
-            else:
+            parser_type = self.parser_combo.currentData()
+            if parser_type not in MAP_COLUMNS:
                 QMessageBox.warning(self, 'Warning', 'No map support available for this parser type!')
                 return
 
-            # Extract coordinates
-            coordinates = []
-            for data in self.processed_data:
-                try:
-                    lat = float(data[lat_col])
-                    lon = float(data[lon_col])
-                    coordinates.append([lat, lon])
-                except (ValueError, IndexError):
-                    continue
-            
-            if not coordinates:
-                QMessageBox.warning(self, 'Warning', 'No valid coordinate data found!')
-                return
-
-            # Calculate the average of the coordinates (for map center)
-            avg_lat = sum(coord[0] for coord in coordinates) / len(coordinates)
-            avg_lon = sum(coord[1] for coord in coordinates) / len(coordinates)
+            # Decoding the coordinates and simplifying long tracks is slow, so both run in the background
+            self.set_busy(True)
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText(f'Creating map of {len(self.processed_data)} GPS points...')
+            worker = MapWorker(self.selected_file, parser_type, self.follow_where)
+            worker.finished.connect(self.on_map_finished)
+            worker.failed.connect(self.on_map_failed)
+            self.start_worker(worker)
 
-            # Create a map
-            m = folium.Map(location=[avg_lat, avg_lon], zoom_start=15)
-            
-            # If there is more than one point, draw a route
-            if len(coordinates) > 1:
-                folium.PolyLine(
-                    coordinates,
-                    color='blue',
-                    weight=3,
-                    opacity=1.0,
-                    popup='GPS Route'
-                ).add_to(m)
-
-            # Add a marker for each GPS point
-            for i, coord in enumerate(coordinates):
-                lat, lon = coord
-                folium.CircleMarker(
-                    [lat, lon],
-                    radius=8,
-                    color='lightblue',
-                    fill=True,
-                    fill_color='lightblue',
-                    fill_opacity=1.0,
-                    popup=f'Point {i+1}<br>Latitude: {lat}<br>Longitude: {lon}',
-                    tooltip=f'Point {i+1}'
-                ).add_to(m)
-
-            # Create a temporary file and save
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.html')
-            m.save(temp_file.name)
-
-            # Load the map into the web view
-            self.map_view.load(QUrl.fromLocalFile(temp_file.name))
-            
-            QMessageBox.information(
-                self,
-                'Success',
-                f'{len(coordinates)} GPS points displayed on the map!'
-            )
-            
         except Exception as e:
             QMessageBox.critical(self, 'Error', f'Map creation error: {str(e)}')
+
+    def on_map_finished(self, levels, point_count):
+        self.set_busy(False)
+        self.save_button.setEnabled(True)
+        self.show_map_button.setEnabled(True)
+        if not point_count:
+            QMessageBox.warning(self, 'Warning', 'No valid coordinate data found!')
+            return
+        self.status_label.setText(f'{point_count} GPS points displayed on the map')
+
+        # The page stays loaded; it zooms to the new track and fetches its detail
+        version = self.map_server.set_track(levels)
+        self.map_view.page().runJavaScript(f'showTrack({version})')
+        self.map_shown = True
+
+        QMessageBox.information(
+            self,
+            'Success',
+            f'{point_count} GPS points displayed on the map!'
+        )
+
+    def on_map_failed(self, message):
+        self.set_busy(False)
+        self.save_button.setEnabled(True)
+        self.show_map_button.setEnabled(True)
+        QMessageBox.critical(self, 'Error', f'Map creation error: {message}')
     
     def save_csv(self):
         """CSV file saving function"""
@@ -657,10 +959,7 @@ class NMEAParserGUI(QMainWindow):
                     writer = csv.writer(file)
 
                     # Write table headers
-                    headers = []
-                    for col in range(self.table.columnCount()):
-                        headers.append(self.table.horizontalHeaderItem(col).text())
-                    writer.writerow(headers)
+                    writer.writerow(self.table_model.headers)
 
                     # Write the data
                     writer.writerows(self.processed_data)
@@ -675,10 +974,24 @@ class NMEAParserGUI(QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, 'Error', f'File saving error: {str(e)}')
 
+    def closeEvent(self, event):
+        """Stop a running background job before the window closes"""
+        self.follow_timer.stop()
+        if self.worker_thread is not None and self.worker_thread.isRunning():
+            if isinstance(self.worker, ParseWorker):
+                self.worker.cancel()
+            self.worker_thread.wait()
+        if self.map_server is not None:
+            self.map_server.close()
+        super().closeEvent(event)
+
     def clear_data(self):
         """Data clearing function"""
-        self.table.setRowCount(0)
+        self.follow_timer.stop()
+        self.follow_offset = 0
+        self.map_shown = False
         self.processed_data = []
+        self.filter_edit.clear()
         self.selected_file = None
         self.file_label.setText('No file selected')
         self.process_button.setEnabled(False)
@@ -688,8 +1001,7 @@ class NMEAParserGUI(QMainWindow):
         self.status_label.setText('Cleared - Please select an NMEA file')
 
         # Reset table headers to default
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(self.default_headers)
+        self.table_model.set_table(self.default_headers, self.processed_data)
 
         # Reload default map
         self.load_default_map()
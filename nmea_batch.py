@@ -0,0 +1,284 @@
+import numpy as np
+
+from nmea_checksum import ChecksumError
+from nmea_tokens import RETURN, Tokens, iter_tokens
+
+
+# Sentence type -> number of fields (address field included) a usable sentence has
+MIN_FIELDS = {
+    "GGA": 10,
+    "RMC": 10,
+    "GLL": 7,
+}
+
+STAR, DOT, MINUS = (ord(c) for c in '*.-')
+
+# Hex digit value of every byte, -1 for non-hex bytes
+HEX = np.full(256, -1, dtype=np.int16)
+for _value, _char in enumerate('0123456789ABCDEF'):
+    HEX[ord(_char)] = HEX[ord(_char.lower())] = _value
+
+# 10**n for n = 0..18 as exact integers, indexed by digit count
+POW10 = 10 ** np.arange(19, dtype=np.int64)
+
+
+class FieldTable:
+    """Field boundaries of a block of sentences of one type, found column-wise on the raw bytes.
+    The block is raw file bytes, a list of sentence strings or a Tokens scan shared by several types.
+    When a ChecksumValidator is given, checksums are verified column-wise and
+    corrupt sentences are kept (warn), dropped (skip) or rejected (strict)."""
+
+    def __init__(self, data, sentence_type, checksum=None):
+        tokens = data if isinstance(data, Tokens) else Tokens(data)
+        self.buffer = tokens.buffer
+
+        # Keep only '$xxTTT' sentences of the requested type with enough fields
+        keep = tokens.select(sentence_type, MIN_FIELDS[sentence_type])
+
+        if checksum is not None:
+            valid, missing = self._verify(tokens.line_starts[keep], tokens.line_ends[keep])
+            corrupt = ~valid & ~missing
+            checksum.record(sentence_type, int(keep.sum()), int(corrupt.sum()), int(missing.sum()))
+            if corrupt.any():
+                if checksum.mode == "strict":
+                    raise ChecksumError(f"{int(corrupt.sum())} {sentence_type} sentences with checksum mismatch")
+                if checksum.mode == "skip":
+                    keep[np.flatnonzero(keep)[corrupt]] = False
+
+        self.lines = np.flatnonzero(keep)  # Line numbers of the kept sentences in the Tokens scan
+        self._separators = tokens.separators
+        self._first = tokens.first[keep]
+        self._line_starts = tokens.line_starts[keep]
+
+    def _verify(self, line_starts, line_ends):
+        """XOR checksum of every sentence from a running XOR over the whole buffer.
+        Returns (valid, missing) boolean masks."""
+        stars = np.flatnonzero(self.buffer == STAR)
+        last_star = np.searchsorted(stars, line_ends) - 1
+        star = stars[np.maximum(last_star, 0)] if len(stars) else np.zeros_like(line_ends)
+        # Fewer than two characters after '*' (a CR before the newline does not count) is no checksum,
+        # as in nmea_checksum.verify_checksum
+        text_ends = line_ends - (self.buffer[np.maximum(line_ends - 1, 0)] == RETURN)
+        missing = (last_star < 0) | (star <= line_starts) | (text_ends - star < 3)
+        star = np.where(missing, line_starts + 1, star)
+
+        # XOR of buffer[start + 1:star] == running[star - 1] ^ running[start]
+        running = np.bitwise_xor.accumulate(self.buffer)
+        computed = running[star - 1] ^ running[line_starts]
+        high = HEX[self.buffer[np.minimum(star + 1, len(self.buffer) - 1)]]
+        low = HEX[self.buffer[np.minimum(star + 2, len(self.buffer) - 1)]]
+        valid = (high >= 0) & (low >= 0) & (high * 16 + low == computed)
+        return valid, missing
+
+    def __len__(self):
+        return len(self._first)
+
+    def restrict(self, mask):
+        """Keeps only the sentences where mask (one boolean per kept sentence) is True"""
+        self.lines = self.lines[mask]
+        self._first = self._first[mask]
+        self._line_starts = self._line_starts[mask]
+
+    def bounds(self, field):
+        """Start and end offsets of one field in every kept sentence"""
+        ends = self._separators[self._first + field]
+        if field == 0:
+            return self._line_starts, ends
+        return self._separators[self._first + field - 1] + 1, ends
+
+    def equals(self, field, char):
+        """Boolean mask of the sentences whose field is exactly one character `char`"""
+        starts, ends = self.bounds(field)
+        return (ends - starts == 1) & (self.buffer[starts] == ord(char))
+
+    def chars(self, field):
+        """First character of a field as a 1-character string array ('' when empty)"""
+        starts, ends = self.bounds(field)
+        chars = np.where(ends > starts, self.buffer[starts], 0)
+        return chars.astype(np.uint8).view('S1').astype('U1')
+
+    def numbers(self, field):
+        """Parses a decimal field column-wise into float64 (NaN when empty or corrupt).
+        Digits are accumulated as an exact integer mantissa, so values match float()."""
+        starts, ends = self.bounds(field)
+        lengths = ends - starts
+        if not len(lengths):
+            return np.empty(0)
+        width = int(lengths.max())
+        if width == 0 or width > 15:
+            return self._numbers_slow(starts, lengths)
+
+        # Fixed format fast path (the usual receiver output): every row has the same
+        # length and the dot in the same place, so one matrix-vector product does it all
+        chars = self.buffer[starts[:, None] + np.arange(width)]
+        first = chars[0]
+        dot = np.flatnonzero(first == DOT)
+        if lengths.min() != width or len(dot) > 1:
+            return self._numbers_slow(starts, lengths)
+        digit_columns = np.ones(width, dtype=bool)
+        digit_columns[dot] = False
+        digit_chars = chars[:, digit_columns]
+        if not (((digit_chars >= ord('0')) & (digit_chars <= ord('9'))).all() and (chars[:, ~digit_columns] == DOT).all()):
+            return self._numbers_slow(starts, lengths)
+
+        weights = np.zeros(width)
+        weights[digit_columns] = 10.0 ** np.arange(digit_columns.sum() - 1, -1, -1)
+        mantissa = chars.astype(np.float64) @ weights - ord('0') * weights.sum()
+        decimals = width - 1 - dot[0] if len(dot) else 0
+        return mantissa / POW10[decimals]
+
+    def _numbers_slow(self, starts, lengths):
+        """General path for variable width fields, signs and corrupt values"""
+        last = len(self.buffer) - 1
+        mantissa = np.zeros(len(starts), dtype=np.int64)
+        decimals = np.zeros(len(starts), dtype=np.int64)
+        digits = np.zeros(len(starts), dtype=np.int64)
+        seen_dot = np.zeros(len(starts), dtype=bool)
+        corrupt = (lengths == 0) | (lengths > 18)
+        negative = (lengths > 0) & (self.buffer[np.minimum(starts, last)] == MINUS)
+
+        for position in range(min(int(lengths.max()), 18)):
+            inside = position < lengths
+            chars = self.buffer[np.minimum(starts + position, last)]
+            is_digit = inside & (chars >= ord('0')) & (chars <= ord('9'))
+            is_dot = inside & (chars == DOT)
+            mantissa = np.where(is_digit, mantissa * 10 + (chars.astype(np.int64) - ord('0')), mantissa)
+            decimals += is_digit & seen_dot
+            digits += is_digit
+            other = inside & ~is_digit & ~is_dot
+            if position == 0:
+                other &= ~negative
+            corrupt |= other | (is_dot & seen_dot)
+            seen_dot |= is_dot
+
+        values = mantissa / POW10[decimals]
+        values = np.where(negative, -values, values)
+        return np.where(corrupt | (digits == 0), np.nan, values)
+
+
+def to_degrees(values, negative):
+    """Converts DDMM.MMMM / DDDMM.MMMM values to decimal degrees, negated where `negative` (S/W)"""
+    degrees = np.floor(values / 100)
+    degrees += (values - degrees * 100) / 60
+    return np.where(negative, -degrees, degrees)
+
+
+def to_int(values, missing=-1, dtype=np.int16):
+    """Converts parsed values to integers, NaN becomes `missing`"""
+    return np.where(np.isnan(values), missing, values).astype(dtype)
+
+
+def to_milliseconds(values):
+    """Converts hhmmss.sss values to milliseconds since midnight (float64, NaN when missing)"""
+    hours = np.floor(values / 10000)
+    minutes = np.floor(values / 100) % 100
+    seconds = values % 100
+    return np.rint(((hours * 60 + minutes) * 60 + seconds) * 1000)
+
+
+def to_dates(values):
+    """Converts ddmmyy values to datetime64[D] (years 80-99 -> 19xx, 00-79 -> 20xx)"""
+    values = to_int(values, missing=0, dtype=np.int64)
+    days = values // 10000
+    months = values // 100 % 100
+    years = values % 100
+    years = np.where(years < 80, years + 2000, years + 1900)
+    month_index = (years - 1970) * 12 + (months - 1)
+    dates = month_index.astype('datetime64[M]').astype('datetime64[D]') + (days - 1)
+    dates[values == 0] = np.datetime64('NaT')
+    return dates
+
+
+def to_datetimes(times, dates):
+    """Combines hhmmss.sss values with dates (datetime64[D] array or scalar) into datetime64[ms]"""
+    milliseconds = to_milliseconds(times)
+    missing = np.isnan(milliseconds)
+    offsets = np.where(missing, 0, milliseconds).astype(np.int64).astype('timedelta64[ms]')
+    result = np.asarray(dates, dtype='datetime64[D]').astype('datetime64[ms]') + offsets
+    result[missing] = np.datetime64('NaT')
+    return result
+
+
+def decode_gga(sentences, date='1970-01-01', checksum=None, where=None):
+    """Decodes a block of GGA sentences into NumPy arrays.
+    GGA carries no date, the fix times are placed on `date`.
+    where is an optional nmea_filter.SentenceFilter applied before the fields are converted."""
+    fields = FieldTable(sentences, "GGA", checksum)
+    if where is not None:
+        where.apply(fields, "GGA")
+    return {
+        "time": to_datetimes(fields.numbers(1), date),
+        "latitude": to_degrees(fields.numbers(2), fields.equals(3, 'S')),
+        "longitude": to_degrees(fields.numbers(4), fields.equals(5, 'W')),
+        "altitude": fields.numbers(9),
+        "satellites": to_int(fields.numbers(7)),
+        "fix_quality": to_int(fields.numbers(6)),
+    }
+
+
+def decode_rmc(sentences, checksum=None, where=None):
+    """Decodes a block of RMC sentences into NumPy arrays"""
+    fields = FieldTable(sentences, "RMC", checksum)
+    if where is not None:
+        where.apply(fields, "RMC")
+    return {
+        "time": to_datetimes(fields.numbers(1), to_dates(fields.numbers(9))),
+        "status": fields.chars(2),
+        "latitude": to_degrees(fields.numbers(3), fields.equals(4, 'S')),
+        "longitude": to_degrees(fields.numbers(5), fields.equals(6, 'W')),
+        "speed": fields.numbers(7),
+        "direction": fields.numbers(8),
+    }
+
+
+def decode_gll(sentences, date='1970-01-01', checksum=None, where=None):
+    """Decodes a block of GLL sentences into NumPy arrays.
+    GLL carries no date, the fix times are placed on `date`."""
+    fields = FieldTable(sentences, "GLL", checksum)
+    if where is not None:
+        where.apply(fields, "GLL")
+    return {
+        "time": to_datetimes(fields.numbers(5), date),
+        "status": fields.chars(6),
+        "latitude": to_degrees(fields.numbers(1), fields.equals(2, 'S')),
+        "longitude": to_degrees(fields.numbers(3), fields.equals(4, 'W')),
+    }
+
+
+BATCH_DECODERS = {
+    "GGA": decode_gga,
+    "RMC": decode_rmc,
+    "GLL": decode_gll,
+}
+
+
+def iter_blocks(filename, sentence_type, block_size=1024 * 1024, checksum=None, where=None):
+    """Scans a (possibly compressed) file in byte blocks of about block_size bytes, cut on
+    line boundaries, and yields the decoded arrays of one sentence type for each block.
+    Plain files are memory-mapped, so blocks are not copied (see nmea_tokens).
+    checksum is an optional ChecksumValidator (see FieldTable), where an optional nmea_filter.SentenceFilter."""
+    decoder = BATCH_DECODERS[sentence_type]
+    try:
+        for tokens in iter_tokens(filename, block_size):
+            yield decoder(tokens, checksum=checksum, where=where)
+    except FileNotFoundError:
+        print(f"File not found: {filename}")
+
+
+def iter_type_blocks(filename, types=None, block_size=1024 * 1024, checksum=None, where=None):
+    """Like iter_blocks, but decodes several sentence types from one scan of every block.
+    Yields {type: arrays} per block."""
+    types = list(BATCH_DECODERS) if types is None else types
+    try:
+        for tokens in iter_tokens(filename, block_size):
+            yield {stype: BATCH_DECODERS[stype](tokens, checksum=checksum, where=where) for stype in types}
+    except FileNotFoundError:
+        print(f"File not found: {filename}")
+
+
+def decode_file(filename, sentence_type, block_size=1024 * 1024, checksum=None, where=None):
+    """Decodes every sentence of one type in a file into a single dict of NumPy arrays"""
+    blocks = list(iter_blocks(filename, sentence_type, block_size, checksum, where))
+    if not blocks:
+        return BATCH_DECODERS[sentence_type]([])
+    return {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
@@ -0,0 +1,209 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then not reported
+    resource = None
+
+import nmea_parser
+from nmea_cli import option
+from nmea_generator import write_log
+from nmea_io import CsvOutput, read_nmea_data
+
+
+# Sentence counts of the generated benchmark logs
+SIZES = (10_000, 1_000_000, 10_000_000)
+
+BENCHMARK_DIR = os.path.join(tempfile.gettempdir(), "nmea_benchmark")
+# Scratch directory for the files written by a case, next to the logs; removed after every case
+OUTPUT_DIR = "output"
+CSV_HEADER = ["case", "sentences", "seconds", "sentences_per_second", "peak_rss_mb"]
+
+
+# Every case is a setup function taking the log file name and returning the timed callable,
+# which returns the number of records it produced. Setup raising ImportError skips the case.
+
+def _output_directory(filename):
+    directory = os.path.join(os.path.dirname(filename), OUTPUT_DIR)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def _parser_case(filename):
+    directory = _output_directory(filename)
+    return lambda: sum(nmea_parser.stream_to_csv(filename, directory).values())
+
+
+def _decoder_case(sentence_type):
+    def setup(filename):
+        return lambda: sum(1 for _ in nmea_parser.iter_records(read_nmea_data(filename), [sentence_type]))
+    return setup
+
+
+def _projection_case(sentence_type, columns):
+    def setup(filename):
+        return lambda: sum(1 for _ in nmea_parser.iter_records(read_nmea_data(filename), [sentence_type],
+                                                               columns={sentence_type: columns}))
+    return setup
+
+
+def _batch_case(filename):
+    import nmea_batch
+    return lambda: sum(len(arrays["latitude"]) for block in nmea_batch.iter_type_blocks(filename)
+                       for arrays in block.values())
+
+
+def _parallel_case(filename):
+    import nmea_parallel
+    return lambda: sum(len(rows) for rows in nmea_parallel.parse_file_parallel(filename).values())
+
+
+def _columnar_case(filename):
+    import nmea_columnar
+    if nmea_columnar.pa is None:
+        raise ImportError("pyarrow is not installed")
+    directory = _output_directory(filename)
+    return lambda: sum(nmea_columnar.stream_to_columnar(filename, directory).values())
+
+
+def _epoch_case(filename):
+    import nmea_epoch
+    return lambda: sum(1 for _ in nmea_epoch.iter_epochs(nmea_parser.iter_records(read_nmea_data(filename))))
+
+
+def _records_case(filename):
+    import nmea_records
+    return lambda: sum(len(table) for table in nmea_records.load_file(filename).values())
+
+
+def _gui_table_case(filename):
+    """GUI parse path: ParseWorker batches -> table_rows -> NMEATableModel, then a sort and a filter"""
+    from PyQt5.QtCore import QCoreApplication
+    import gui
+    app = QCoreApplication.instance() or QCoreApplication([])
+
+    def run():
+        model = gui.NMEATableModel()
+        model.set_table(["Time of Fix(UTC)", 'Latitude', 'Longitude', 'Altitude', 'Number of Satellites',
+                         'Fix Quality'], [])
+        worker = gui.ParseWorker(filename, "GGA")
+        worker.batch.connect(lambda results: model.append_rows(gui.NMEAParserGUI.table_rows(results, "GGA")))
+        worker.failed.connect(lambda message: print(f"GUI parse failed: {message}"))
+        worker.run()
+        model.sort(3)
+        model.set_filter("17:")
+        app.processEvents()
+        return len(model.rows)
+    return run
+
+
+def _gui_map_case(filename):
+    """GUI map path (MapWorker): projected decode of every GGA position and its level-of-detail track levels"""
+    from nmea_map_server import TrackLevels
+
+    def run():
+        records = nmea_parser.iter_records(read_nmea_data(filename), ["GGA"],
+                                           columns={"GGA": ["latitude", "longitude"]})
+        coordinates = [data for _, data in records]
+        levels = TrackLevels(coordinates)
+        levels.geojson(max(levels.levels, default=0))
+        return len(coordinates)
+    return run
+
+
+CASES = {
+    "parser": _parser_case,
+    **{f"decode_{stype.lower()}": _decoder_case(stype) for stype in nmea_parser.DECODERS},
+    "project_rmc_position": _projection_case("RMC", ["latitude", "longitude"]),
+    "project_rmc_speed": _projection_case("RMC", ["utc_time", "speed"]),
+    "batch": _batch_case,
+    "parallel": _parallel_case,
+    "columnar": _columnar_case,
+    "epoch": _epoch_case,
+    "records": _records_case,
+    "gui_table": _gui_table_case,
+    "gui_map": _gui_map_case,
+}
+
+
+def log_file(count, directory=BENCHMARK_DIR, seed=0):
+    """Generated log of count sentences, reused when it already exists"""
+    os.makedirs(directory, exist_ok=True)
+    filename = os.path.join(directory, f"bench_{count}_{seed}.nmea")
+    if not os.path.exists(filename):
+        write_log(filename + ".tmp", count=count, satellites=12, corrupt=0.001, seed=seed)
+        os.replace(filename + ".tmp", filename)
+    return filename
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_case(name, filename):
+    """Runs one case; returns (records, seconds, peak RSS MB), or None when it is skipped"""
+    try:
+        run = CASES[name](filename)
+    except ImportError as e:
+        print(f"  {name}: skipped ({e})")
+        return None
+    try:
+        start = time.perf_counter()
+        records = run()
+        return records, time.perf_counter() - start, peak_rss_mb()
+    finally:
+        shutil.rmtree(os.path.join(os.path.dirname(filename), OUTPUT_DIR), ignore_errors=True)
+
+
+def benchmark(sizes=SIZES, cases=None, directory=BENCHMARK_DIR):
+    """Times every case on every log size. Each case runs in a fresh process, so its peak RSS
+    is its own. Returns a list of (case, sentences, seconds, sentences/s, peak RSS MB) rows."""
+    results = []
+    for count in sizes:
+        filename = log_file(count, directory)
+        print(f"{count} sentences ({os.path.getsize(filename) / 1e6:.1f} MB):")
+        for name in (CASES if cases is None else cases):
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(run_case, name, filename).result()
+            if result is None:
+                continue
+            _, seconds, peak = result
+            row = [name, count, round(seconds, 3), round(count / seconds) if seconds else 0,
+                   None if peak is None else round(peak, 1)]
+            results.append(row)
+            print(f"  {name:<20} {seconds:9.3f} s {row[3]:>12,} sentences/s   peak RSS "
+                  f"{'n/a' if peak is None else f'{peak:.0f} MB'}")
+    return results
+
+
+def main():
+    # Usage: nmea_benchmark.py [--sizes=10000,1000000] [--cases=parser,batch,...] [--dir=DIR] [--csv=FILE]
+    sizes = [int(size) for size in option("sizes", ','.join(map(str, SIZES))).split(',')]
+    cases = option("cases")
+    cases = cases.split(',') if cases else None
+    unknown = [name for name in cases or [] if name not in CASES]
+    if unknown:
+        print(f"Unknown cases: {', '.join(unknown)} (expected some of {', '.join(CASES)})")
+        return
+    results = benchmark(sizes, cases, option("dir", BENCHMARK_DIR))
+
+    csv_file = option("csv")
+    if csv_file:
+        with CsvOutput(csv_file, CSV_HEADER) as output:
+            for row in results:
+                output.writerow(row)
+        print(f"{output.rows} results saved to '{csv_file}'.")
+
+
+if __name__ == '__main__':
+    main()
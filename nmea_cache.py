@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import time
+import zipfile
+
+import numpy as np
+
+
+# Bump when decoders or GUI table rows change, so rows cached by older versions are not reused
+CACHE_VERSION = 1
+
+CACHE_BUDGET = 1024 * 1024 * 1024  # Bytes of cached tables kept on disk
+HASH_BLOCK = 1024 * 1024
+
+
+def default_directory():
+    """Per-user cache directory (XDG_CACHE_HOME, LOCALAPPDATA or ~/.cache)"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.environ.get('LOCALAPPDATA') \
+        or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'nmea_parser')
+
+
+def content_hash(filename):
+    """BLAKE2b digest of the raw file bytes (compressed files are hashed as stored)"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(filename, 'rb') as file:
+        while True:
+            block = file.read(HASH_BLOCK)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _column(i, values):
+    """(name, array) of one table column: 'c<i>' int64 or float64 numbers, or 't<i>' text (strings and
+    mixed columns) stored as the UTF-8 bytes of the values joined by newlines"""
+    kinds = set(map(type, values))
+    if kinds == {int}:
+        return f"c{i}", np.array(values, dtype=np.int64)
+    if kinds == {float}:
+        return f"c{i}", np.array(values, dtype=np.float64)
+    return f"t{i}", np.frombuffer('\n'.join(map(str, values)).encode('utf-8'), dtype=np.uint8)
+
+
+def _values(data, i):
+    """Python values of column i of a loaded .npz"""
+    if f"t{i}" in data.files:
+        return data[f"t{i}"].tobytes().decode('utf-8').split('\n')
+    return data[f"c{i}"].tolist()
+
+
+class ParseCache:
+    """On-disk cache of parsed table rows, one uncompressed .npz file (a typed array per column) per
+    input file content and parser type.
+
+    Entries are keyed by the BLAKE2b hash of the input; path, size and mtime map to the hash, so an
+    unchanged file is found without reading it. The least recently used entries are evicted when the
+    cached files exceed budget bytes. Cache errors never stop parsing: they only make a lookup miss."""
+
+    def __init__(self, directory=None, budget=CACHE_BUDGET):
+        self.directory = directory or default_directory()
+        self.budget = budget
+        self._index_file = os.path.join(self.directory, 'index.json')
+        self._index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self._index_file, encoding='utf-8') as file:
+                index = json.load(file)
+            if index.get("version") == CACHE_VERSION:
+                return index
+        except (OSError, ValueError):
+            pass
+        return {"version": CACHE_VERSION, "files": {}, "entries": {}}
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = self._index_file + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(self._index, file)
+        os.replace(temporary, self._index_file)
+
+    def _entry_file(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    @staticmethod
+    def _key(digest, parser_type):
+        return f"{digest}-{parser_type}"
+
+    def known_hash(self, filename):
+        """Content hash recorded for this path, if its size and mtime are unchanged"""
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        known = self._index["files"].get(os.path.abspath(filename))
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        return None
+
+    def _remember_file(self, filename, digest):
+        stat = os.stat(filename)
+        self._index["files"][os.path.abspath(filename)] = [stat.st_size, stat.st_mtime_ns, digest]
+
+    def lookup(self, filename, parser_type):
+        """Cached rows of filename parsed with parser_type, or None"""
+        try:
+            digest = self.known_hash(filename)
+            if digest is None:
+                # Changed or unknown path: the same content may still be cached (copied or touched file).
+                # The hash is remembered, so a store after parsing does not read the file again.
+                digest = content_hash(filename)
+                self._remember_file(filename, digest)
+            key = self._key(digest, parser_type)
+            entry = self._index["entries"].get(key)
+            if entry is None:
+                return None
+            with np.load(self._entry_file(key)) as data:
+                columns = [_values(data, i) for i in range(entry["columns"])]
+            entry["used"] = time.time()
+            self._save_index()
+            return [list(row) for row in zip(*columns)]
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            return None
+
+    def store(self, filename, parser_type, rows, digest=None):
+        """Caches the rows of filename. digest is the content hash the rows were parsed from (e.g. known_hash
+        before parsing); nothing is stored when the file changed since. Returns True when the rows were stored."""
+        if not rows:
+            return False
+        try:
+            known = self.known_hash(filename)
+            if digest is None:
+                digest = known or content_hash(filename)
+            elif known != digest:
+                return False
+            key = self._key(digest, parser_type)
+            os.makedirs(self.directory, exist_ok=True)
+            columns = dict(_column(i, values) for i, values in enumerate(zip(*rows)))
+            temporary = self._entry_file(key) + '.tmp'
+            with open(temporary, 'wb') as file:
+                np.savez(file, **columns)
+            os.replace(temporary, self._entry_file(key))
+            self._remember_file(filename, digest)
+            self._index["entries"][key] = {"columns": len(columns), "rows": len(rows),
+                                           "bytes": os.path.getsize(self._entry_file(key)), "used": time.time()}
+            self._evict()
+            self._save_index()
+            return key in self._index["entries"]
+        except (OSError, ValueError):
+            return False
+
+    def _evict(self):
+        """Removes least recently used entries until the cache fits the budget"""
+        entries = self._index["entries"]
+        total = sum(entry["bytes"] for entry in entries.values())
+        for key in sorted(entries, key=lambda key: entries[key]["used"]):
+            if total <= self.budget:
+                break
+            total -= entries.pop(key)["bytes"]
+            try:
+                os.remove(self._entry_file(key))
+            except OSError:
+                pass
+        # Forget paths whose content is no longer cached
+        digests = {key.rsplit('-', 1)[0] for key in entries}
+        self._index["files"] = {path: known for path, known in self._index["files"].items() if known[2] in digests}
+
+    def size(self):
+        """Bytes of cached tables"""
+        return sum(entry["bytes"] for entry in self._index["entries"].values())
+
+    def clear(self):
+        for key in list(self._index["entries"]):
+            try:
+                os.remove(self._entry_file(key))
+            except OSError:
+                pass
+        self._index = {"version": CACHE_VERSION, "files": {}, "entries": {}}
+        self._save_index()
@@ -0,0 +1,106 @@
+# Checksum modes:
+#   strict - raise ChecksumError on the first corrupt sentence
+#   warn   - keep corrupt sentences but count them (default)
+#   skip   - drop corrupt sentences and count them
+CHECKSUM_MODES = ("strict", "warn", "skip")
+
+
+class ChecksumError(ValueError):
+    """Raised in strict mode when a sentence checksum does not match"""
+
+
+# (shift, mask) pairs folding a little-endian integer in half, 512 bytes down to 1 byte
+_FOLDS = [(8 * width, (1 << (8 * width)) - 1) for width in (512, 256, 128, 64, 32, 16, 8, 4, 2, 1)]
+
+
+def xor_checksum(data):
+    """XOR of all bytes in data (bytes, bytearray or memoryview).
+    The bytes are folded as one big integer, so no per-byte Python loop runs."""
+    if len(data) > 1024:
+        return xor_checksum(data[:1024]) ^ xor_checksum(data[1024:])
+    value = int.from_bytes(data, 'little')
+    bits = value.bit_length()
+    for shift, mask in _FOLDS:
+        if bits > shift:
+            value = (value & mask) ^ (value >> shift)
+    return value
+
+
+# Hex digit (as a str character or a byte value) -> its value
+_HEX = {key: int(digit, 16) for digit in '0123456789abcdefABCDEF' for key in (digit, ord(digit))}
+
+
+def verify_checksum(sentence):
+    """Checks the *hh suffix of a '$...*hh' sentence (str or bytes).
+    Returns True/False, or None when the sentence carries no complete checksum ('*h' counts as none,
+    as in nmea_batch). A str payload is encoded once and folded by xor_checksum; bytes are folded
+    over a memoryview without a copy."""
+    text = isinstance(sentence, str)
+    star = sentence.rfind('*' if text else b'*')
+    if star == -1 or len(sentence) - star < 3:
+        return None
+    high = _HEX.get(sentence[star + 1])
+    low = _HEX.get(sentence[star + 2])
+    if high is None or low is None:
+        return False
+    # Checksum covers everything between '$' (or '!') and '*'
+    if text:
+        computed = xor_checksum(sentence[1:star].encode('ascii', 'replace'))
+    else:
+        computed = xor_checksum(memoryview(sentence)[1:star])
+    return computed == high * 16 + low
+
+
+class ChecksumValidator:
+    """Verifies sentence checksums and keeps per-type corruption statistics"""
+
+    def __init__(self, mode="warn", verbose=False):
+        if mode not in CHECKSUM_MODES:
+            raise ValueError(f"Unknown checksum mode: {mode} (expected one of {', '.join(CHECKSUM_MODES)})")
+        self.mode = mode
+        self.verbose = verbose
+        self.checked = {}
+        self.corrupt = {}
+        self.missing = {}
+
+    def check(self, sentence, sentence_type):
+        """Returns True when the sentence should be decoded"""
+        self.checked[sentence_type] = self.checked.get(sentence_type, 0) + 1
+        valid = verify_checksum(sentence)
+        if valid is None:
+            self.missing[sentence_type] = self.missing.get(sentence_type, 0) + 1
+            return True
+        if valid:
+            return True
+
+        self.corrupt[sentence_type] = self.corrupt.get(sentence_type, 0) + 1
+        if self.mode == "strict":
+            raise ChecksumError(f"Checksum mismatch in {sentence_type} sentence: {sentence}")
+        if self.verbose:
+            print(f"Checksum mismatch in {sentence_type} sentence: {sentence}")
+        return self.mode == "warn"
+
+    def record(self, sentence_type, checked, corrupt, missing):
+        """Adds counts from a bulk (batch) check"""
+        self.checked[sentence_type] = self.checked.get(sentence_type, 0) + checked
+        self.corrupt[sentence_type] = self.corrupt.get(sentence_type, 0) + corrupt
+        self.missing[sentence_type] = self.missing.get(sentence_type, 0) + missing
+
+    def total_corrupt(self):
+        return sum(self.corrupt.values())
+
+    def report(self):
+        """Per-type summary lines, e.g. 'GGA: 1000 checked, 3 corrupt, 0 without checksum'"""
+        lines = []
+        for stype in sorted(self.checked):
+            lines.append(f"{stype}: {self.checked[stype]} checked, {self.corrupt.get(stype, 0)} corrupt, "
+                         f"{self.missing.get(stype, 0)} without checksum")
+        return "\n".join(lines)
+
+
+def checksum_mode(argv):
+    """Reads --checksum=strict|warn|skip from command line arguments (default: warn)"""
+    for arg in argv:
+        if arg.startswith('--checksum='):
+            return arg.split('=', 1)[1]
+    return "warn"
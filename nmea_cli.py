@@ -0,0 +1,8 @@
+import sys
+
+
+def option(name, default=None, argv=None):
+    """Value of a --name=value command line argument (default: sys.argv[1:]), or default"""
+    if argv is None:
+        argv = sys.argv[1:]
+    return next((arg.split('=', 1)[1] for arg in argv if arg.startswith(f'--{name}=')), default)
@@ -0,0 +1,223 @@
+import os
+import sys
+
+import nmea_parser
+from nmea_checksum import ChecksumValidator, checksum_mode
+from nmea_cli import option
+from nmea_io import read_nmea_data
+from nmea_records import iter_typed_records
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency, only needed for columnar output
+    pa = ipc = pq = None
+
+
+# Output format -> file extension
+FORMATS = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+# Rows buffered before a record batch is written
+BATCH_ROWS = 64 * 1024
+
+
+def record_rows(record):
+    return [record]
+
+
+def gsv_rows(record):
+    """One row per satellite of a GSV sentence (exploded)"""
+    head = (record.talker, record.total_sentences, record.sentence_number, record.satellites_in_view)
+    return [head + satellite for satellite in record.satellites]
+
+
+# Sentence type -> (nmea_records record to typed rows converter, [(column, type name)])
+# Type names are resolved to pyarrow types in schema(), so this module imports without pyarrow.
+COLUMNS = {
+    "GGA": (record_rows, [("utc_time", "time32[ms]"), ("latitude", "float64"), ("longitude", "float64"),
+                       ("altitude", "float64"), ("satellites", "int16"), ("fix_quality", "int8")]),
+    "RMC": (record_rows, [("utc_time", "time32[ms]"), ("status", "string"), ("latitude", "float64"),
+                       ("longitude", "float64"), ("speed", "float64"), ("direction", "float64"),
+                       ("date", "date32"), ("magnetic_variation", "float64"),
+                       ("variation_direction", "string"), ("checksum", "uint8")]),
+    "GLL": (record_rows, [("utc_time", "time32[ms]"), ("status", "string"), ("latitude", "float64"),
+                       ("longitude", "float64"), ("checksum", "uint8")]),
+    "VTG": (record_rows, [("true_track", "float64"), ("magnetic_track", "float64"), ("speed_knots", "float64"),
+                       ("speed_kilometers", "float64"), ("checksum", "uint8")]),
+    "GSA": (record_rows, [("mode_1", "string"), ("mode_2", "int8"), ("satellite_ids", "list<int16>"),
+                       ("pdop", "float64"), ("hdop", "float64"), ("vdop", "float64")]),
+    "GSV": (gsv_rows, [("talker", "string"), ("total_sentences", "int8"), ("sentence_number", "int8"),
+                       ("satellites_in_view", "int16"), ("satellite_id", "int16"), ("elevation", "int16"),
+                       ("azimuth", "int16"), ("snr", "int16")]),
+}
+
+
+# Value range of the integer column types; values outside it (corrupt fields) are written as null,
+# like nmea_records.RecordArray stores them as MISSING
+INTEGER_RANGES = {
+    "int8": (-2 ** 7, 2 ** 7 - 1),
+    "int16": (-2 ** 15, 2 ** 15 - 1),
+    "uint8": (0, 2 ** 8 - 1),
+}
+
+
+def in_range(values, type_name):
+    """values of a column of type_name with the integers that do not fit it replaced by None"""
+    element_type = type_name[5:-1] if type_name.startswith("list<") else type_name
+    if element_type not in INTEGER_RANGES:
+        return values
+    low, high = INTEGER_RANGES[element_type]
+    if element_type != type_name:
+        return [None if value is None else [item if item is None or low <= item <= high else None for item in value]
+                for value in values]
+    return [value if value is None or low <= value <= high else None for value in values]
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Columnar output needs pyarrow (pip install pyarrow)")
+
+
+def schema(sentence_type):
+    """pyarrow schema of the columnar output of one sentence type"""
+    _require_pyarrow()
+    types = {
+        "string": pa.string(),
+        "float64": pa.float64(),
+        "int8": pa.int8(),
+        "int16": pa.int16(),
+        "uint8": pa.uint8(),
+        "date32": pa.date32(),
+        "time32[ms]": pa.time32('ms'),
+        "list<int16>": pa.list_(pa.int16()),
+    }
+    return pa.schema([(name, types[type_name]) for name, type_name in COLUMNS[sentence_type][1]])
+
+
+def check_format(fmt):
+    """Raises ValueError unless fmt is one of FORMATS"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown columnar format: {fmt} (expected one of {', '.join(FORMATS)})")
+
+
+def output_file(sentence_type, fmt="parquet", directory='.'):
+    """nmea_<type>_output.parquet (or .arrow) next to the CSV output"""
+    check_format(fmt)
+    base = os.path.splitext(nmea_parser.DECODERS[sentence_type].CSV_FILE)[0]
+    return os.path.join(directory, base + FORMATS[fmt])
+
+
+class ColumnarOutput:
+    """Parquet / Arrow IPC file written in record batches, created only when the first batch is flushed"""
+
+    def __init__(self, filename, sentence_type, fmt="parquet", compression="zstd"):
+        _require_pyarrow()
+        check_format(fmt)
+        self.filename = filename
+        self.sentence_type = sentence_type
+        self.fmt = fmt
+        self.compression = compression
+        self.schema = schema(sentence_type)
+        self.rows = 0
+        self._to_rows = COLUMNS[sentence_type][0]
+        self._pending = []
+        self._writer = None
+
+    def write(self, record):
+        """Adds one nmea_records typed record (a GSV record may expand to several rows)"""
+        self._pending.extend(self._to_rows(record))
+        if len(self._pending) >= BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        columns = list(zip(*self._pending))
+        rows = len(self._pending)
+        self._pending = []  # Dropped even if the batch fails, so one bad batch does not fail every later flush
+        batch = pa.record_batch([pa.array(in_range(column, type_name), type=field.type)
+                                 for column, field, (_, type_name)
+                                 in zip(columns, self.schema, COLUMNS[self.sentence_type][1])],
+                                schema=self.schema)
+        if self._writer is None:
+            if self.fmt == "parquet":
+                self._writer = pq.ParquetWriter(self.filename, self.schema, compression=self.compression)
+            else:
+                options = ipc.IpcWriteOptions(compression=self.compression)
+                self._writer = ipc.new_file(self.filename, self.schema, options=options)
+        self._writer.write_batch(batch)
+        self.rows += rows
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_columnar(tables, directory='.', fmt="parquet"):
+    """Writes each non-empty {type: typed records} table (e.g. of nmea_records.load_file) to a columnar file"""
+    check_format(fmt)
+    written = {}
+    for stype, records in tables.items():
+        if not len(records):
+            continue
+        filename = output_file(stype, fmt, directory)
+        with ColumnarOutput(filename, stype, fmt) as output:
+            for record in records:
+                output.write(record)
+        written[stype] = filename
+    return written
+
+
+def stream_to_columnar(filename, directory='.', types=None, fmt="parquet", verbose=False, checksum="warn"):
+    """Parses an NMEA file line by line into per-type columnar files, BATCH_ROWS rows at a time.
+    Returns {type: row count} (GSV counts satellites, not sentences)."""
+    check_format(fmt)  # Before anything is parsed
+    outputs = {}
+    try:
+        for stype, record in iter_typed_records(read_nmea_data(filename), types, verbose, checksum):
+            output = outputs.get(stype)
+            if output is None:
+                output = outputs[stype] = ColumnarOutput(output_file(stype, fmt, directory), stype, fmt)
+            output.write(record)
+    finally:
+        for output in outputs.values():
+            output.close()
+    return {stype: output.rows for stype, output in outputs.items()}
+
+
+def main():
+    # Usage: nmea_columnar.py [file] [--format=parquet|arrow] [--checksum=strict|warn|skip]
+    files = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    filename = files[0] if files else "data.txt"
+    fmt = option("format", "parquet")
+    try:
+        check_format(fmt)
+    except ValueError as e:
+        print(e)
+        return
+    validator = ChecksumValidator(checksum_mode(sys.argv[1:]))
+    counts = stream_to_columnar(filename, fmt=fmt, checksum=validator)
+
+    if validator.total_corrupt():
+        print(validator.report())
+
+    for stype, rows in counts.items():
+        print(f"{rows} rows of {stype} data saved to '{output_file(stype, fmt)}'.")
+    if not counts:
+        print("No valid data found to save.")
+
+
+if __name__ == '__main__':
+    main()
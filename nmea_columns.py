@@ -0,0 +1,42 @@
+def format_time(utc_time):
+    """HHMMSS(.sss) -> HH:MM:SS(.sss) as in the decoders' nmea_sentence; shorter values are returned unchanged"""
+    if '.' in utc_time:
+        time_base, milliseconds = utc_time.split('.')[:2]
+        if len(time_base) >= 6:
+            return f"{time_base[:2]}:{time_base[2:4]}:{time_base[4:]}.{milliseconds}"
+        return utc_time
+    return f"{utc_time[:2]}:{utc_time[2:4]}:{utc_time[4:]}" if len(utc_time) >= 6 else utc_time
+
+
+# Converters of a decoder's COLUMNS table: each takes the sentence split on ',' (without '*hh')
+# and the '*hh' checksum text, and returns one CSV column
+
+def field(index):
+    """Raw text of a field"""
+    return lambda fields, checksum: fields[index]
+
+
+def optional_field(index):
+    """Raw text of a trailing field that may be left out ('' then)"""
+    return lambda fields, checksum: fields[index] if len(fields) > index else ""
+
+
+def time_field(index):
+    """HHMMSS(.sss) field as HH:MM:SS(.sss)"""
+    return lambda fields, checksum: format_time(fields[index])
+
+
+def degrees_field(index, degree_digits):
+    """Coordinate field and the N/S/E/W field after it as signed decimal degrees (a float at full
+    precision, not the 6 decimal text of nmea_sentence). Converted inline: projection is used where
+    every call counts, such as the map view."""
+    def degrees(fields, checksum):
+        value = fields[index]
+        degrees = float(value[:degree_digits]) + float(value[degree_digits:]) / 60
+        return -degrees if fields[index + 1] in ('S', 'W') else degrees
+    return degrees
+
+
+def checksum_field(fields, checksum):
+    """The '*hh' checksum text"""
+    return checksum
@@ -0,0 +1,180 @@
+import sys
+
+import nmea_parser
+from nmea_checksum import ChecksumValidator, checksum_mode
+from nmea_io import CsvOutput, read_nmea_data
+
+
+# Sentence types carrying the UTC time of the fix; the others belong to the epoch they arrive in
+TIMED_TYPES = ("GGA", "RMC", "GLL")
+
+# Untimed records held for the first fix; beyond that they are emitted as an epoch without a time
+MAX_PENDING = 64
+
+EPOCH_FIELDS = [
+    "date", "utc_time", "latitude", "longitude", "altitude", "fix_quality", "satellites", "status",
+    "speed_knots", "speed_kmh", "track", "magnetic_variation", "fix_mode", "pdop", "hdop", "vdop",
+    "used_satellites", "satellites_in_view", "snr",
+]
+
+CSV_FILE = "nmea_epoch_output.csv"
+CSV_HEADER = EPOCH_FIELDS
+
+
+def new_epoch(utc_time, date=''):
+    """Empty fix record of one epoch"""
+    epoch = dict.fromkeys(EPOCH_FIELDS, '')
+    epoch["utc_time"] = utc_time
+    epoch["date"] = date
+    epoch["used_satellites"] = []
+    epoch["snr"] = {}
+    return epoch
+
+
+def rmc_date(ddmmyy):
+    """'020825' -> '2025-08-02'"""
+    if len(ddmmyy) != 6:
+        return ''
+    return f"20{ddmmyy[4:6]}-{ddmmyy[2:4]}-{ddmmyy[:2]}"
+
+
+class EpochAssembler:
+    """Groups a stream of decoded (type, result) records into one wide fix record per epoch.
+
+    An epoch starts with the first GGA/RMC/GLL of a new UTC time; GSA, GSV and VTG records are
+    added to the epoch that is open when they arrive (or to the next one, before the first fix).
+    Up to MAX_PENDING of them wait for that fix; more, or those left at the end of the stream,
+    make an epoch with an empty utc_time. The date comes from RMC and is carried over to later
+    epochs without an RMC."""
+
+    def __init__(self):
+        self._epoch = None
+        self._pending = []  # Untimed records received before the first timed one
+        self._date = ''
+        self._in_view = {}  # Talker -> satellites in view of the open epoch
+
+    def add(self, stype, data):
+        """Adds a record; returns the epoch it completed, or None"""
+        finished = None
+        if stype in TIMED_TYPES:
+            utc_time = data[0]
+            if self._epoch is None or self._epoch["utc_time"] != utc_time:
+                finished = self._epoch
+                self._epoch = new_epoch(utc_time, self._date)
+                self._in_view = {}
+                for pending in self._pending:
+                    self._merge(*pending)
+                self._pending = []
+        if self._epoch is None:
+            self._pending.append((stype, data))
+            if len(self._pending) >= MAX_PENDING:
+                finished = self._untimed_epoch()
+        else:
+            self._merge(stype, data)
+        return finished
+
+    def flush(self):
+        """Returns the open epoch (at the end of the stream), or None"""
+        if self._epoch is None:
+            return self._untimed_epoch() if self._pending else None
+        epoch, self._epoch = self._epoch, None
+        return epoch
+
+    def _untimed_epoch(self):
+        """Epoch of the pending untimed records, which are cleared"""
+        self._epoch = new_epoch('', self._date)
+        self._in_view = {}
+        for pending in self._pending:
+            self._merge(*pending)
+        self._pending = []
+        epoch, self._epoch = self._epoch, None
+        return epoch
+
+    def _merge(self, stype, data):
+        epoch = self._epoch
+        if stype == "GGA":
+            _, epoch["latitude"], epoch["longitude"], epoch["altitude"], epoch["satellites"], epoch["fix_quality"] = data
+        elif stype == "RMC":
+            _, status, latitude, longitude, speed, direction, date, variation, variation_direction, _ = data
+            epoch["status"] = status
+            epoch["speed_knots"] = speed
+            epoch["track"] = direction
+            if variation:
+                epoch["magnetic_variation"] = f"-{variation}" if variation_direction == 'W' else variation
+            if date:
+                self._date = epoch["date"] = rmc_date(date)
+            # GGA positions carry the altitude too, so they take precedence
+            if not epoch["latitude"]:
+                epoch["latitude"], epoch["longitude"] = latitude, longitude
+        elif stype == "GLL":
+            _, status, latitude, longitude, _ = data
+            if not epoch["latitude"]:
+                epoch["latitude"], epoch["longitude"] = latitude, longitude
+            if not epoch["status"]:
+                epoch["status"] = status
+        elif stype == "VTG":
+            true_track, _, speed_knots, speed_kmh, _ = data
+            epoch["speed_kmh"] = speed_kmh
+            if not epoch["speed_knots"]:
+                epoch["speed_knots"] = speed_knots
+            if not epoch["track"]:
+                epoch["track"] = true_track
+        elif stype == "GSA":
+            # Multi-constellation receivers send one GSA per system in the same epoch
+            epoch["fix_mode"] = data["Mode 2"]
+            epoch["pdop"], epoch["hdop"], epoch["vdop"] = data["PDOP"], data["HDOP"], data["VDOP"]
+            epoch["used_satellites"].extend(sat_id for sat_id in data["Satellite IDs"] if sat_id)
+        elif stype == "GSV":
+            # Every constellation has its own GSV group, each repeating its own in-view count
+            talker = data[0][:2]
+            if data[3].isdigit():
+                self._in_view[talker] = int(data[3])
+                epoch["satellites_in_view"] = sum(self._in_view.values())
+            fields = data[4:-1]
+            for i in range(0, len(fields) - 3, 4):
+                sat_id, _, _, snr = fields[i:i + 4]
+                if sat_id:
+                    # PRNs are only unique within a constellation
+                    epoch["snr"][talker, sat_id] = snr
+
+
+def iter_epochs(records):
+    """Yields one fix record per epoch from (type, result) records such as nmea_parser.iter_records"""
+    assembler = EpochAssembler()
+    for stype, data in records:
+        epoch = assembler.add(stype, data)
+        if epoch is not None:
+            yield epoch
+    epoch = assembler.flush()
+    if epoch is not None:
+        yield epoch
+
+
+def epoch_row(epoch):
+    """Converts a fix record into a CSV row (satellite list as '01,02', SNRs by talker and PRN as 'GP01:45;GL65:41')"""
+    row = [epoch[field] for field in EPOCH_FIELDS]
+    row[EPOCH_FIELDS.index("used_satellites")] = ','.join(epoch["used_satellites"])
+    row[EPOCH_FIELDS.index("snr")] = ';'.join(f"{talker}{sat_id}:{snr}"
+                                              for (talker, sat_id), snr in epoch["snr"].items())
+    return row
+
+
+def main(filename="data.txt", checksum="warn"):
+    validator = ChecksumValidator(checksum)
+    records = nmea_parser.iter_records(read_nmea_data(filename), checksum=validator)
+    with CsvOutput(CSV_FILE, CSV_HEADER) as output:
+        for epoch in iter_epochs(records):
+            output.writerow(epoch_row(epoch))
+
+    if validator.total_corrupt():
+        print(validator.report())
+    if output.rows:
+        print(f"{output.rows} epochs saved to '{CSV_FILE}'.")
+    else:
+        print("No valid data found to save.")
+
+
+if __name__ == '__main__':
+    # Usage: nmea_epoch.py [file] [--checksum=strict|warn|skip]
+    files = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    main(files[0] if files else "data.txt", checksum_mode(sys.argv[1:]))
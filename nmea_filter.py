@@ -0,0 +1,214 @@
+# Fields the conditions read, per sentence type (field 0 is the address)
+TIME_FIELDS = {"GGA": 1, "RMC": 1, "GLL": 5}
+POSITION_FIELDS = {"GGA": (2, 3, 4, 5), "RMC": (3, 4, 5, 6), "GLL": (1, 2, 3, 4)}  # lat, N/S, lon, E/W
+STATUS_FIELDS = {"RMC": 2, "GLL": 6}
+FIX_QUALITY_FIELDS = {"GGA": 6}
+
+
+def _milliseconds(text):
+    """'HH:MM' or 'HH:MM:SS(.sss)' -> milliseconds since midnight"""
+    parts = text.split(':')
+    if not 2 <= len(parts) <= 3:
+        raise ValueError(f"Invalid time: {text} (expected HH:MM or HH:MM:SS)")
+    seconds = float(parts[2]) if len(parts) == 3 else 0.0
+    return round(((int(parts[0]) * 60 + int(parts[1])) * 60 + seconds) * 1000)
+
+
+def _degrees(value, hemisphere):
+    """DDMM.MMMM text and N/S/E/W -> signed decimal degrees"""
+    value = float(value)
+    degrees = value // 100
+    degrees += (value - degrees * 100) / 60
+    return -degrees if hemisphere in ('S', 'W') else degrees
+
+
+class SentenceFilter:
+    """Selection of sentences applied before decoding: a UTC time window, a latitude/longitude box,
+    a minimum GGA fix quality and an RMC/GLL status.
+
+    Each condition applies to the sentence types carrying its field (fix quality only to GGA, status
+    only to RMC and GLL). Sentences none of the conditions applies to (GSA, GSV, VTG, or GGA when only
+    the status is filtered) follow their epoch: the GGA/RMC/GLL sentences with the same UTC time and
+    the untimed sentences after them. They are held until a sentence of the epoch is decided, and take
+    the verdict of the decided sentences so far; an epoch nothing could be decided for is kept.
+    The cheap one-character checks run first and only the fields of a condition are converted,
+    so rejected lines are never decoded.
+
+    start and end are milliseconds since midnight; a window with start > end runs past midnight.
+    box is (south, west, north, east) in decimal degrees."""
+
+    def __init__(self, start=None, end=None, box=None, min_fix_quality=None, status=None):
+        self.start = start
+        self.end = end
+        self.box = box
+        self.min_fix_quality = min_fix_quality
+        self.status = status
+
+    def __bool__(self):
+        return any(value is not None for value in (self.start, self.end, self.box, self.min_fix_quality,
+                                                   self.status))
+
+    def __str__(self):
+        terms = []
+        if self.start is not None or self.end is not None:
+            terms.append(f"time={_clock(self.start)}-{_clock(self.end)}")
+        if self.box is not None:
+            terms.append("box=" + ','.join(f"{value:g}" for value in self.box))
+        if self.min_fix_quality is not None:
+            terms.append(f"fix>={self.min_fix_quality}")
+        if self.status is not None:
+            terms.append(f"status={self.status}")
+        return ' '.join(terms)
+
+    def _in_window(self, milliseconds):
+        if self.start is not None and self.end is not None and self.start > self.end:
+            return (milliseconds >= self.start) | (milliseconds <= self.end)
+        inside = True
+        if self.start is not None:
+            inside = inside & (milliseconds >= self.start)
+        if self.end is not None:
+            inside = inside & (milliseconds <= self.end)
+        return inside
+
+    def accepts(self, fields, sentence_type):
+        """Verdict for one sentence split on ',' (the last field still carries '*hh'), or None when
+        no condition applies to its type. Corrupt or empty filtered fields reject the sentence."""
+        applies = False
+        try:
+            if self.status is not None and sentence_type in STATUS_FIELDS:
+                applies = True
+                if fields[STATUS_FIELDS[sentence_type]].split('*')[0] != self.status:
+                    return False
+            if self.min_fix_quality is not None and sentence_type in FIX_QUALITY_FIELDS:
+                applies = True
+                if int(fields[FIX_QUALITY_FIELDS[sentence_type]]) < self.min_fix_quality:
+                    return False
+            if (self.start is not None or self.end is not None) and sentence_type in TIME_FIELDS:
+                applies = True
+                value = float(fields[TIME_FIELDS[sentence_type]].split('*')[0])
+                milliseconds = round(((value // 10000 * 60 + value // 100 % 100) * 60 + value % 100) * 1000)
+                if not self._in_window(milliseconds):
+                    return False
+            if self.box is not None and sentence_type in POSITION_FIELDS:
+                applies = True
+                lat, ns, lon, ew = (fields[i] for i in POSITION_FIELDS[sentence_type])
+                south, west, north, east = self.box
+                if not south <= _degrees(lat, ns) <= north or not west <= _degrees(lon, ew) <= east:
+                    return False
+        except (ValueError, IndexError):
+            return False
+        return True if applies else None
+
+    def select(self, sentences, types=None):
+        """Yields the sentences of the given types (all when None) that pass the filter, in input order.
+        Sentences of other types are only looked at when they are GGA/RMC/GLL (they time and decide epochs).
+        Undecided sentences wait for the rest of their epoch, so output may lag the input by one epoch."""
+        epoch_time = None
+        epoch = None    # Verdict of the current epoch (None: nothing decided yet)
+        pending = []    # Wanted sentences of the current epoch waiting for its verdict
+        for sentence in sentences:
+            end = sentence.find(',')
+            if end < 6 or not sentence.startswith('$'):
+                continue
+            stype = sentence[end - 3:end]
+            wanted = types is None or stype in types
+            timed = stype in TIME_FIELDS
+            if not wanted and not timed:
+                continue
+            fields = sentence.split(',')
+            if timed:
+                field = TIME_FIELDS[stype]
+                utc_time = fields[field].split('*')[0] if len(fields) > field else ''
+                if utc_time != epoch_time:
+                    # A new epoch: whatever is still undecided in the previous one is kept
+                    if epoch is not False:
+                        yield from pending
+                    pending = []
+                    epoch_time = utc_time
+                    epoch = None
+            verdict = self.accepts(fields, stype)
+            if verdict is None:
+                if epoch is None:
+                    if wanted:
+                        pending.append(sentence)
+                    continue
+                verdict = epoch
+            else:
+                epoch = verdict if epoch is None else epoch and verdict
+                if pending:
+                    if epoch:
+                        yield from pending
+                    pending = []
+            if wanted and verdict:
+                yield sentence
+        if epoch is not False:
+            yield from pending
+
+    def apply(self, table, sentence_type):
+        """Drops the rejected sentences of a nmea_batch.FieldTable in place, one condition at a time,
+        so every field is converted only for the sentences that passed the cheaper checks before it.
+        Blocks are filtered per type, without epoch verdicts: only the conditions on fields of the type apply."""
+        from nmea_batch import to_degrees, to_milliseconds  # NumPy is only needed by the batch path
+        if self.status is not None and sentence_type in STATUS_FIELDS:
+            table.restrict(table.equals(STATUS_FIELDS[sentence_type], self.status))
+        if self.min_fix_quality is not None and sentence_type in FIX_QUALITY_FIELDS:
+            table.restrict(table.numbers(FIX_QUALITY_FIELDS[sentence_type]) >= self.min_fix_quality)
+        if (self.start is not None or self.end is not None) and sentence_type in TIME_FIELDS:
+            table.restrict(self._in_window(to_milliseconds(table.numbers(TIME_FIELDS[sentence_type]))))
+        if self.box is not None and sentence_type in POSITION_FIELDS:
+            lat, ns, lon, ew = POSITION_FIELDS[sentence_type]
+            south, west, north, east = self.box
+            latitude = to_degrees(table.numbers(lat), table.equals(ns, 'S'))
+            table.restrict((latitude >= south) & (latitude <= north))
+            longitude = to_degrees(table.numbers(lon), table.equals(ew, 'W'))
+            table.restrict((longitude >= west) & (longitude <= east))
+        return table
+
+
+def _clock(milliseconds):
+    if milliseconds is None:
+        return ''
+    seconds, milliseconds = divmod(int(milliseconds), 1000)
+    text = f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}"
+    if seconds % 60 or milliseconds:
+        text += f":{seconds % 60:02d}" + (f".{milliseconds:03d}" if milliseconds else '')
+    return text
+
+
+def parse_filter(text):
+    """SentenceFilter from a specification like 'time=12:00-12:05 box=39.9,32.7,40.1,33.0 fix>=4 status=A'.
+    Either end of the time window may be left out ('time=12:00-'). Raises ValueError for unknown terms."""
+    where = SentenceFilter()
+    for term in text.split():
+        name, _, value = term.partition('>=' if term.startswith('fix>=') else '=')
+        if not value:
+            raise ValueError(f"Invalid filter term: {term}")
+        if name == "time":
+            start, separator, end = value.partition('-')
+            if not separator:
+                raise ValueError(f"Invalid time window: {value} (expected HH:MM-HH:MM)")
+            where.start = _milliseconds(start) if start else None
+            where.end = _milliseconds(end) if end else None
+        elif name == "box":
+            try:
+                lat1, lon1, lat2, lon2 = (float(v) for v in value.split(','))
+            except ValueError:
+                raise ValueError(f"Invalid box: {value} (expected lat1,lon1,lat2,lon2)") from None
+            where.box = (min(lat1, lat2), min(lon1, lon2), max(lat1, lat2), max(lon1, lon2))
+        elif name == "fix":
+            where.min_fix_quality = int(value)
+        elif name == "status":
+            if len(value) != 1:
+                raise ValueError(f"Invalid status: {value} (expected one character, e.g. A)")
+            where.status = value.upper()
+        else:
+            raise ValueError(f"Unknown filter term: {term} (expected time=, box=, fix>= or status=)")
+    return where
+
+
+def filter_option(argv):
+    """Reads --where='...' from command line arguments (None when absent)"""
+    for arg in argv:
+        if arg.startswith('--where='):
+            return parse_filter(arg.split('=', 1)[1])
+    return None
@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import time
+
+import nmea_parser
+from nmea_checksum import ChecksumValidator, checksum_mode
+from nmea_cli import option
+from nmea_io import COMPRESSED_OPENERS
+
+
+# Offsets reached in followed files, kept next to the CSV outputs they were appended to
+STATE_FILE = "nmea_follow_state.json"
+
+# Seconds between checks for appended data
+FOLLOW_INTERVAL = 2.0
+
+
+class AppendedLines:
+    """Iterates the complete lines of a file after a byte offset; offset moves past every line read.
+
+    A last line without its newline is still being written by the receiver: it is not read, and
+    offset stays at its start, so the next read picks up the whole line."""
+
+    def __init__(self, filename, offset=0):
+        self.filename = filename
+        self.offset = offset
+
+    def __iter__(self):
+        with open(self.filename, 'rb') as file:
+            if any(file.read(6).startswith(signature) for signature, _ in COMPRESSED_OPENERS):
+                raise ValueError(f"Compressed logs cannot be followed: {self.filename}")
+            file.seek(self.offset)
+            for raw in file:
+                if not raw.endswith(b'\n'):
+                    return
+                self.offset += len(raw)
+                line = raw.strip()
+                if line:
+                    yield line.decode('utf-8', errors='replace')
+
+
+class FollowState:
+    """Byte offset reached in each followed file, saved as JSON so the next run continues from it.
+    A file that got shorter or was replaced (new inode) is read again from the start."""
+
+    def __init__(self, state_file=STATE_FILE):
+        self.state_file = state_file
+        try:
+            with open(state_file, encoding='utf-8') as file:
+                self.files = json.load(file)
+        except (OSError, ValueError):
+            self.files = {}
+
+    def offset(self, filename):
+        known = self.files.get(os.path.abspath(filename))
+        if known is None:
+            return 0
+        stat = os.stat(filename)
+        if stat.st_ino != known["inode"] or stat.st_size < known["offset"]:
+            return 0
+        return known["offset"]
+
+    def update(self, filename, offset):
+        self.files[os.path.abspath(filename)] = {"offset": offset, "inode": os.stat(filename).st_ino}
+
+    def save(self):
+        temporary = self.state_file + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(self.files, file)
+        os.replace(temporary, self.state_file)
+
+
+def follow_once(filename, directory='.', types=None, verbose=False, checksum="warn", state=None):
+    """Parses the lines appended to filename since the previous call (or run) and appends their records
+    to the nmea_<type>_output.csv files. The first run, or a run after the file was truncated or
+    replaced, parses the whole file and starts the CSV files anew. Returns {type: new row count}."""
+    state = state or FollowState(os.path.join(directory, STATE_FILE))
+    start = state.offset(filename)
+    lines = AppendedLines(filename, start)
+    records = nmea_parser.iter_records(lines, types, verbose, checksum)
+    counts = nmea_parser.records_to_csv(records, directory, append=start > 0)
+    state.update(filename, lines.offset)
+    state.save()
+    return counts
+
+
+def follow(filename, directory='.', types=None, interval=FOLLOW_INTERVAL, verbose=False, checksum="warn"):
+    """Keeps appending the records of newly written lines to the CSV files until interrupted"""
+    state = FollowState(os.path.join(directory, STATE_FILE))
+    while True:
+        counts = follow_once(filename, directory, types, verbose, checksum, state)
+        if counts:
+            print(', '.join(f"+{rows} {stype}" for stype, rows in counts.items()))
+        time.sleep(interval)
+
+
+def main():
+    # Usage: nmea_follow.py [file] [--once] [--interval=SECONDS] [--checksum=strict|warn|skip]
+    files = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    filename = files[0] if files else "data.txt"
+    interval = float(option("interval", FOLLOW_INTERVAL))
+    validator = ChecksumValidator(checksum_mode(sys.argv[1:]))
+    try:
+        if '--once' in sys.argv[1:]:
+            counts = follow_once(filename, checksum=validator)
+            for stype, rows in counts.items():
+                print(f"{rows} new rows of {stype} data appended to '{nmea_parser.DECODERS[stype].CSV_FILE}'.")
+            if not counts:
+                print("No new data.")
+        else:
+            print(f"Following '{filename}' (Ctrl+C to stop)...")
+            follow(filename, interval=interval, checksum=validator)
+    except KeyboardInterrupt:
+        pass
+    if validator.total_corrupt():
+        print(validator.report())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+import datetime
+import math
+import random
+import sys
+
+from nmea_checksum import xor_checksum
+from nmea_cli import option
+
+
+# Start of every generated log (same fix as the examples/ sample files)
+START_TIME = datetime.datetime(2025, 8, 2, 17, 1, 41, 751000)
+START_POSITION = (39.986100, 32.840967)
+
+METERS_PER_DEGREE = 111320.0
+KNOTS_TO_KMH = 1.852
+
+# GPS PRNs 1-32, further satellites are GLONASS (PRN 65+)
+GPS_SATELLITES = 32
+
+
+def nmea_line(body):
+    """'$' + body + '*hh' with the XOR checksum of body"""
+    return f"${body}*{xor_checksum(body.encode('ascii')):02X}"
+
+
+def _coordinate(value, degree_digits, positive, negative):
+    """Decimal degrees -> ('ddmm.mmmm', hemisphere)"""
+    hemisphere = positive if value >= 0 else negative
+    value = abs(value)
+    degrees = int(value)
+    minutes = (value - degrees) * 60
+    return f"{degrees:0{degree_digits}d}{minutes:07.4f}", hemisphere
+
+
+class Satellite:
+    __slots__ = ("talker", "prn", "elevation", "azimuth", "snr")
+
+    def __init__(self, talker, prn, elevation, azimuth, snr):
+        self.talker = talker
+        self.prn = prn
+        self.elevation = elevation
+        self.azimuth = azimuth
+        self.snr = snr
+
+
+class LogGenerator:
+    """Deterministic source of realistic mixed NMEA epochs: a vehicle driving a random walk
+    (speed and heading drift), seen by a set of slowly moving satellites.
+
+    Every epoch is GGA, GSA, a GSV group per constellation, RMC, VTG and GLL with valid checksums.
+    With corrupt > 0 that fraction of sentences gets one digit changed after the checksum was computed,
+    so the checksum no longer matches. The same seed always gives the same log."""
+
+    def __init__(self, rate=1.0, satellites=12, corrupt=0.0, seed=0, start=START_TIME, position=START_POSITION):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.corrupt = corrupt
+        self.random = random.Random(seed)
+        self.time = start
+        self.latitude, self.longitude = position
+        self.speed = 10.0   # knots
+        self.heading = self.random.uniform(0, 360)
+        self.altitude = 850.0
+        self.satellites = []
+        for i in range(satellites):
+            talker, prn = ("GP", i + 1) if i < GPS_SATELLITES else ("GL", 65 + i - GPS_SATELLITES)
+            self.satellites.append(Satellite(talker, prn, self.random.uniform(5, 85), self.random.uniform(0, 360),
+                                             self.random.randint(25, 50)))
+
+    def _move(self):
+        step = 1 / self.rate
+        r = self.random
+        self.speed = min(max(self.speed + r.gauss(0, 0.5 * step), 0.0), 60.0)
+        self.heading = (self.heading + r.gauss(0, 5 * step)) % 360
+        self.altitude += r.gauss(0, 0.2 * step)
+        distance = self.speed * KNOTS_TO_KMH / 3.6 * step
+        heading = math.radians(self.heading)
+        self.latitude += distance * math.cos(heading) / METERS_PER_DEGREE
+        self.longitude += distance * math.sin(heading) / (METERS_PER_DEGREE * math.cos(math.radians(self.latitude)))
+        for satellite in self.satellites:
+            satellite.azimuth = (satellite.azimuth + 0.008 * step) % 360
+            satellite.snr = min(max(satellite.snr + r.choice((-1, 0, 0, 0, 1)), 20), 55)
+        self.time += datetime.timedelta(seconds=step)
+
+    def _corrupt(self, line):
+        """Replaces one digit between '$' and '*' by another digit"""
+        r = self.random
+        digits = [i for i in range(1, line.rfind('*')) if line[i].isdigit()]
+        if not digits:
+            return line
+        i = r.choice(digits)
+        return line[:i] + r.choice([d for d in "0123456789" if d != line[i]]) + line[i + 1:]
+
+    def epoch(self):
+        """Sentences of the next epoch"""
+        utc = self.time.strftime("%H%M%S.") + f"{self.time.microsecond // 1000:03d}"
+        date = self.time.strftime("%d%m%y")
+        lat, ns = _coordinate(self.latitude, 2, 'N', 'S')
+        lon, ew = _coordinate(self.longitude, 3, 'E', 'W')
+        used = [s for s in self.satellites if s.elevation > 10][:12]
+        hdop = round(0.6 + 6.0 / max(len(used), 1), 1)
+        fix = 1 if len(used) >= 4 else 0
+        kmh = self.speed * KNOTS_TO_KMH
+
+        bodies = [
+            f"GPGGA,{utc},{lat},{ns},{lon},{ew},{fix},{len(used):02d},{hdop:.1f},{self.altitude:.1f},M,36.0,M,,",
+            f"GPGSA,A,{3 if fix else 1},{','.join(f'{s.prn:02d}' for s in used)}{',' * (12 - len(used))},"
+            f"{hdop * 1.6:.1f},{hdop:.1f},{hdop * 1.3:.1f}",
+        ]
+        for talker in ("GP", "GL"):
+            in_view = [s for s in self.satellites if s.talker == talker]
+            total = math.ceil(len(in_view) / 4)
+            for number in range(total):
+                group = in_view[number * 4:number * 4 + 4]
+                fields = ','.join(f"{s.prn:02d},{s.elevation:02.0f},{s.azimuth:03.0f},{s.snr:02d}" for s in group)
+                bodies.append(f"{talker}GSV,{total},{number + 1},{len(in_view):02d},{fields}")
+        status = 'A' if fix else 'V'
+        bodies += [
+            f"GPRMC,{utc},{status},{lat},{ns},{lon},{ew},{self.speed:.1f},{self.heading:.1f},{date},005.3,E",
+            f"GPVTG,{self.heading:.2f},T,{(self.heading - 5.3) % 360:.2f},M,{self.speed:.2f},N,{kmh:.2f},K",
+            f"GPGLL,{lat},{ns},{lon},{ew},{utc},{status}",
+        ]
+        self._move()
+
+        lines = [nmea_line(body) for body in bodies]
+        if self.corrupt > 0:
+            lines = [self._corrupt(line) if self.random.random() < self.corrupt else line for line in lines]
+        return lines
+
+
+def generate_sentences(count=None, duration=None, rate=1.0, satellites=12, corrupt=0.0, seed=0):
+    """Yields generated sentences until count sentences or duration seconds of log time
+    (endless when both are None)"""
+    generator = LogGenerator(rate, satellites, corrupt, seed)
+    epochs = None if duration is None else math.ceil(duration * rate)
+    produced = 0
+    epoch = 0
+    while epochs is None or epoch < epochs:
+        for line in generator.epoch():
+            if count is not None and produced >= count:
+                return
+            produced += 1
+            yield line
+        epoch += 1
+
+
+def write_log(filename, count=None, duration=None, rate=1.0, satellites=12, corrupt=0.0, seed=0):
+    """Writes a generated log (one sentence per line); returns the number of sentences"""
+    if count is None and duration is None:
+        raise ValueError("Either count or duration is needed for a log file")
+    written = 0
+    with open(filename, 'w', encoding='ascii', newline='\n') as file:
+        lines = []
+        for line in generate_sentences(count, duration, rate, satellites, corrupt, seed):
+            lines.append(line)
+            if len(lines) == 10000:
+                file.write('\n'.join(lines) + '\n')
+                written += len(lines)
+                lines = []
+        if lines:
+            file.write('\n'.join(lines) + '\n')
+            written += len(lines)
+    return written
+
+
+def main():
+    # Usage: nmea_generator.py [output] [--sentences=N | --duration=SECONDS] [--rate=HZ]
+    #                          [--satellites=N] [--corrupt=RATIO] [--seed=N]
+    files = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    filename = files[0] if files else "generated.nmea"
+    duration = option("duration")
+    count = option("sentences", None if duration else "10000")
+    written = write_log(filename,
+                        count=int(count) if count else None,
+                        duration=float(duration) if duration else None,
+                        rate=float(option("rate", "1")),
+                        satellites=int(option("satellites", "12")),
+                        corrupt=float(option("corrupt", "0")),
+                        seed=int(option("seed", "0")))
+    print(f"{written} sentences written to '{filename}'.")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,10 @@
 import csv
+import sys
 
+from nmea_checksum import ChecksumValidator, checksum_mode
+from nmea_columns import degrees_field, field, time_field
+from nmea_io import CsvOutput, read_nmea_data
 
-def read_nmea_data(filename):
-    """Reads NMEA data from txt file and returns as list"""
-    sentences = []
-    try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            for line in file:
-                line = line.strip()  
-                if line: 
-                    sentences.append(line)
-    except FileNotFoundError:
-        print(f"File not found: {filename}")
-        return []
-    return sentences
 
 components = [
     "NMEA Sentence",
@@ -30,18 +21,35 @@ components = [
     "Geoidal separation",
     "Geoidal separation units",
     "Age of differential GPS data (if applicable)",
+    "Differential reference station ID",
     "Checksum (optional)"
 ]
-def nmea_sentence(sentence):
+def nmea_sentence(sentence, verbose=False, profile=None, columns=None):
+    """Parses a single GGA sentence. Set verbose=True to print every component (debug mode).
+    profile is an optional nmea_profile.StageProfile timing the decoding stages.
+    columns is an optional list of CSV_HEADER names: only those fields are converted and returned, in that order"""
 
     if not sentence.startswith('$'):
         raise ValueError("NMEA sentence must start with '$'")
     sentence = sentence[1:]  
-    split_sentence = sentence.split(',')
+
+    if '*' in sentence:
+        sentence_part, checksum = sentence.split('*')
+        checksum = f"*{checksum}"
+    else:
+        sentence_part = sentence
+        checksum = ""
+
+    split_sentence = sentence_part.split(',')
+    if profile is not None:
+        profile.lap("split", "GGA")
 
     if not split_sentence[0].endswith("GGA"):
-        print("This is not a GGA sentence, skipping.")
+        if verbose:
+            print("This is not a GGA sentence, skipping.")
         return None
+    if columns is not None:
+        return [COLUMNS[column](split_sentence, checksum) for column in columns]
 
     utc_time = split_sentence[1]
     latitude = split_sentence[2]
@@ -72,6 +80,9 @@ def nmea_sentence(sentence):
     split_sentence[2] = lat_degrees_formatted
     split_sentence[4] = lon_degrees_formatted
 
+    if profile is not None:
+        profile.lap("coordinates", "GGA")
+
     # UTC zamanını formatla (örnek: 170141.751 -> 17:01:41.751)
     if '.' in utc_time:
         # Nokta varsa, saat:dakika:saniye.milisaniye formatına çevir
@@ -87,37 +98,68 @@ def nmea_sentence(sentence):
         utc_time_formatted = f"{utc_time[:2]}:{utc_time[2:4]}:{utc_time[4:]}" if len(utc_time) >= 6 else utc_time
 
     split_sentence[1] = utc_time_formatted
+    if profile is not None:
+        profile.lap("time", "GGA")
+
+    split_sentence.append(checksum)
 
-    print("GGA Sentence Components:")
-    for i in range(len(split_sentence)):
-        print(f" {components[i]}: {split_sentence[i]}")
+    if verbose:
+        print("GGA Sentence Components:")
+        for i in range(len(split_sentence)):
+            component_name = components[i] if i < len(components) else f"Field {i}"
+            print(f" {component_name}: {split_sentence[i]}")
+        if profile is not None:
+            profile.lap("print", "GGA")
 
     # utc_time_formatted, lat, lon, altitude, satellites, fix_quality values
     return [utc_time_formatted, lat_degrees_formatted, lon_degrees_formatted, altitude, satellites, fix_quality]
 
-# Read NMEA data from txt file
-nmea_sentences = read_nmea_data("data.txt")
-
-# List to collect all data
-all_data = []
-
-# Process each NMEA sentence
-for i, sentence in enumerate(nmea_sentences):
-    print(f"\n--- NMEA GGA Sentence {i+1} ---")
-    result = nmea_sentence(sentence)
-    if result:  # If valid result returned, add to list
-        all_data.append(result)
-
-
-if all_data:
-    csv_file = "nmea_gga_output.csv"
+CSV_FILE = "nmea_gga_output.csv"
+CSV_HEADER = ["utc_time_formatted", "latitude", "longitude", "altitude",  "satellites", "fix_quality"]
+
+# CSV column -> its value from the split sentence and checksum, for column projection (nmea_sentence columns=...)
+COLUMNS = {
+    "utc_time_formatted": time_field(1),
+    "latitude": degrees_field(2, 2),
+    "longitude": degrees_field(4, 3),
+    "altitude": field(9),
+    "satellites": field(7),
+    "fix_quality": field(6),
+}
+
+def write_csv(all_data, csv_file=CSV_FILE):
+    """Writes parsed GGA rows to a CSV file"""
     with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
         writer = csv.writer(file)
-        writer.writerow(["utc_time_formatted", "latitude", "longitude", "altitude",  "satellites", "fix_quality"])
+        writer.writerow(CSV_HEADER)
         writer.writerows(all_data)
-    print(f"\n{len(all_data)} rows of data saved to '{csv_file}'.")
-else:
-    print("No valid data found to save.")
 
+def main(verbose=False, checksum="warn"):
+    validator = ChecksumValidator(checksum, verbose)
+    # Rows are written as they are parsed, the input is read one line at a time
+    with CsvOutput(CSV_FILE, CSV_HEADER) as output:
+        # Process each NMEA sentence
+        for i, sentence in enumerate(read_nmea_data("data.txt")):
+            is_gga = sentence.startswith('$') and sentence.split(',', 1)[0].endswith("GGA")
+            # The checksum is verified before anything is decoded or printed
+            if is_gga and not validator.check(sentence, "GGA"):
+                continue
+            if verbose:
+                print(f"\n--- NMEA GGA Sentence {i+1} ---")
+            result = nmea_sentence(sentence, verbose)
+            if result:  # If valid result returned, write it
+                output.writerow(result)
+
+    if validator.total_corrupt():
+        print(validator.report())
+
+    if output.rows:
+        print(f"\n{output.rows} rows of data saved to '{CSV_FILE}'.")
+    else:
+        print("No valid data found to save.")
 
 
+if __name__ == '__main__':
+    # --verbose prints every sentence component (debug mode)
+    # --checksum=strict|warn|skip selects how corrupt sentences are handled
+    main(verbose='--verbose' in sys.argv[1:], checksum=checksum_mode(sys.argv[1:]))
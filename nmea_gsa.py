@@ -1,19 +1,9 @@
 import csv
+import sys
 
+from nmea_checksum import ChecksumError, ChecksumValidator, checksum_mode
+from nmea_io import CsvOutput, read_nmea_data
 
-def read_nmea_data(filename):
-    """Reads NMEA data from txt file and returns as list"""
-    sentences = []
-    try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            for line in file:
-                line = line.strip()  
-                if line: 
-                    sentences.append(line)
-    except FileNotFoundError:
-        print(f"File not found: {filename}")
-        return []
-    return sentences
 
 components = [
     "NMEA Sentence",  # Index 0: GPGSA
@@ -37,7 +27,9 @@ components = [
     "Checksum"      # Index 18: Checksum (optional)
 ]
 
-def nmea_sentence(sentence):
+def nmea_sentence(sentence, verbose=False, profile=None):
+    """Parses a single GSA sentence. Set verbose=True to print every component (debug mode).
+    profile is an optional nmea_profile.StageProfile timing the decoding stages"""
     if not sentence.startswith('$'):
         raise ValueError("NMEA sentence must start with '$'")
     sentence = sentence[1:]  
@@ -50,6 +42,8 @@ def nmea_sentence(sentence):
         checksum = ""
 
     split_sentence = sentence_part.split(',')
+    if profile is not None:
+        profile.lap("split", "GSA")
     if not split_sentence[0].endswith("GSA"):
         return None
 
@@ -63,10 +57,13 @@ def nmea_sentence(sentence):
     # Checksum'ı split_sentence'ın sonuna ekle
     split_sentence.append(checksum)
 
-    print("GSA Sentence Components:")
-    for i in range(len(split_sentence)):
-        component_name = components[i] if i < len(components) else f"Field {i}"
-        print(f" {component_name}: {split_sentence[i]}")
+    if verbose:
+        print("GSA Sentence Components:")
+        for i in range(len(split_sentence)):
+            component_name = components[i] if i < len(components) else f"Field {i}"
+            print(f" {component_name}: {split_sentence[i]}")
+        if profile is not None:
+            profile.lap("print", "GSA")
 
     # Dictionary formatında data oluştur (önceki format)
     data_dict = {
@@ -85,42 +82,65 @@ def nmea_sentence(sentence):
     # CSV yazma için dictionary return et, GUI için ise list olacak şekilde ayarla
     return data_dict
 
-nmea_sentences = read_nmea_data("data.txt")
-
-all_data = []
-gsa_sentence_count = 0
-
-for sentence in nmea_sentences:
-    try:
-        if sentence.startswith('$') and sentence[1:].split(',')[0].endswith("GSA"):
-            gsa_sentence_count += 1
-            print(f"\n--- NMEA GSA Sentence {gsa_sentence_count} ---")
-        
-        data = nmea_sentence(sentence)
-        if data:
-            all_data.append(data)
-    except ValueError as e:
-        print(f"Error processing sentence: {e}")
-
-if all_data:
-    csv_file = "nmea_gsa_output.csv"
+CSV_FILE = "nmea_gsa_output.csv"
+CSV_HEADER = ["Mode 1", "Mode 2", "Satellite IDs", "PDOP", "HDOP", "VDOP"]
+
+def csv_row(data):
+    """Converts a parsed GSA dictionary into a CSV row"""
+    # Dictionary'den değerleri çıkar ve CSV formatına dönüştür
+    satellite_ids_str = ','.join(data["Satellite IDs"])  # Liste olarak birleştir
+    return [
+        data["Mode 1"],
+        data["Mode 2"], 
+        satellite_ids_str,
+        data["PDOP"],
+        data["HDOP"],
+        data["VDOP"]
+    ]
+
+def write_csv(all_data, csv_file=CSV_FILE):
+    """Writes parsed GSA dictionaries to a CSV file"""
     with open(csv_file, 'w', newline='', encoding='utf-8') as file:
         writer = csv.writer(file)
-        writer.writerow(["Mode 1", "Mode 2", "Satellite IDs", "PDOP", "HDOP", "VDOP"])
-        
+        writer.writerow(CSV_HEADER)
+
         for data in all_data:
-            # Dictionary'den değerleri çıkar ve CSV formatına dönüştür
-            satellite_ids_str = ','.join(data["Satellite IDs"])  # Liste olarak birleştir
-            row = [
-                data["Mode 1"],
-                data["Mode 2"], 
-                satellite_ids_str,
-                data["PDOP"],
-                data["HDOP"],
-                data["VDOP"]
-            ]
-            writer.writerow(row)
+            writer.writerow(csv_row(data))
+
+def main(verbose=False, checksum="warn"):
+    validator = ChecksumValidator(checksum, verbose)
+    gsa_sentence_count = 0
+
+    # Rows are written as they are parsed, the input is read one line at a time
+    with CsvOutput(CSV_FILE, CSV_HEADER) as output:
+        for sentence in read_nmea_data("data.txt"):
+            try:
+                is_gsa = sentence.startswith('$') and sentence.split(',', 1)[0].endswith("GSA")
+                # The checksum is verified before anything is decoded or printed
+                if is_gsa and not validator.check(sentence, "GSA"):
+                    continue
+                if verbose and is_gsa:
+                    gsa_sentence_count += 1
+                    print(f"\n--- NMEA GSA Sentence {gsa_sentence_count} ---")
             
-    print(f"\nProcessed {gsa_sentence_count} GSA sentences. Data saved to '{csv_file}'.")
-else:
-    print("No valid GSA sentences found.")
\ No newline at end of file
+                data = nmea_sentence(sentence, verbose)
+                if data:
+                    output.writerow(csv_row(data))
+            except ChecksumError:
+                raise
+            except ValueError as e:
+                print(f"Error processing sentence: {e}")
+
+    if validator.total_corrupt():
+        print(validator.report())
+
+    if output.rows:
+        print(f"\nProcessed {output.rows} GSA sentences. Data saved to '{CSV_FILE}'.")
+    else:
+        print("No valid GSA sentences found.")
+
+
+if __name__ == '__main__':
+    # --verbose prints every sentence component (debug mode)
+    # --checksum=strict|warn|skip selects how corrupt sentences are handled
+    main(verbose='--verbose' in sys.argv[1:], checksum=checksum_mode(sys.argv[1:]))
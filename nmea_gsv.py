@@ -1,37 +1,12 @@
 import csv
+import sys
 
+from nmea_checksum import ChecksumError, ChecksumValidator, checksum_mode
+from nmea_io import CsvOutput, read_nmea_data
 
-def read_nmea_data(filename):
-    """Reads NMEA data from txt file and returns as list"""
-    sentences = []
-    try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            for line in file:
-                line = line.strip()  
-                if line: 
-                    sentences.append(line)
-    except FileNotFoundError:
-        print(f"File not found: {filename}")
-        return []
-    return sentences
-
-def nmea_sentence(sentence):
-    if not sentence.startswith('$'):
-        raise ValueError("NMEA sentence must start with '$'")
-    sentence = sentence[1:]  # Remove the leading '$'
 
-    if '*' in sentence:
-        sentence_part, checksum = sentence.split('*')
-        checksum = f"*{checksum}"
-    else:
-        sentence_part = sentence
-        checksum = ""
-
-    split_sentence = sentence_part.split(',')
-    if not split_sentence[0].endswith("GSV"):
-        print("This is not a GSV sentence, skipping.")
-        return None
-    
+def component_names(field_count):
+    """Builds the component names for a GSV sentence with field_count fields (checksum excluded)"""
     # GSV sentence'ın temel componentleri
     base_components = [
         "NMEA Sentence",           # Index 0: GPGSV
@@ -46,7 +21,7 @@ def nmea_sentence(sentence):
     satellite_components = []
     
     # Uydu sayısını hesapla (checksum hariç, ilk 4 field hariç)
-    available_fields = len(split_sentence) - 4  # İlk 4 field: sentence, total, number, sat_count
+    available_fields = field_count - 4  # İlk 4 field: sentence, total, number, sat_count
     satellite_count = available_fields // 4  # Her uydu 4 field kullanır
     
     for i in range(satellite_count):
@@ -67,70 +42,250 @@ def nmea_sentence(sentence):
             satellite_components.append(f"Satellite {satellite_num} {field_names[i]}")
     
     # Tüm componentleri birleştir
-    components = base_components + satellite_components + ["Checksum"]
+    return base_components + satellite_components + ["Checksum"]
+
+def nmea_sentence(sentence, verbose=False, profile=None):
+    """Parses a single GSV sentence. Set verbose=True to print every component (debug mode).
+    profile is an optional nmea_profile.StageProfile timing the decoding stages"""
+    if not sentence.startswith('$'):
+        raise ValueError("NMEA sentence must start with '$'")
+    sentence = sentence[1:]  # Remove the leading '$'
+
+    if '*' in sentence:
+        sentence_part, checksum = sentence.split('*')
+        checksum = f"*{checksum}"
+    else:
+        sentence_part = sentence
+        checksum = ""
+
+    split_sentence = sentence_part.split(',')
+    if profile is not None:
+        profile.lap("split", "GSV")
+    if not split_sentence[0].endswith("GSV"):
+        if verbose:
+            print("This is not a GSV sentence, skipping.")
+        return None
     
     # Checksum'ı split_sentence'ın sonuna ekle
     split_sentence.append(checksum)
 
-    print("GSV Sentence Components:")
-    for i in range(len(split_sentence)):
-        if i < len(components):
-            print(f" {components[i]}: {split_sentence[i]}")
-        else:
-            print(f" Index {i}: {split_sentence[i]}")
+    if verbose:
+        components = component_names(len(split_sentence) - 1)
+        print("GSV Sentence Components:")
+        for i in range(len(split_sentence)):
+            if i < len(components):
+                print(f" {components[i]}: {split_sentence[i]}")
+            else:
+                print(f" Index {i}: {split_sentence[i]}")
+        if profile is not None:
+            profile.lap("print", "GSV")
     
     # Return için tüm verileri topla
     return split_sentence
 
-# Read NMEA data from txt file
-nmea_sentences = read_nmea_data("data.txt")
+CSV_FILE = "nmea_gsv_output.csv"
 
-all_data = []
-gsv_sentence_count = 0
+def csv_header(max_fields):
+    """Builds the GSV CSV header for rows of up to max_fields fields"""
+    header = []
+    header.extend(["NMEA_Sentence", "Total_GSV_Sentences", "Sentence_Number", "Satellites_in_View"])
+    
+    # Dinamik uydu field'larını ekle
+    satellite_count = (max_fields - 5) // 4  # 4 temel field + checksum = 5
+    for i in range(satellite_count):
+        sat_num = i + 1
+        header.extend([f"Sat_{sat_num}_ID", f"Sat_{sat_num}_Elevation", f"Sat_{sat_num}_Azimuth", f"Sat_{sat_num}_SNR"])
+    
+    # Kalan field'lar için
+    remaining = (max_fields - 5) % 4
+    if remaining > 0:
+        sat_num = satellite_count + 1
+        field_names = ["ID", "Elevation", "Azimuth", "SNR"]
+        for i in range(remaining):
+            header.append(f"Sat_{sat_num}_{field_names[i]}")
+    
+    header.append("Checksum")
+    return header
 
-for sentence in nmea_sentences:
-    try:
-        if sentence.startswith('$') and sentence[1:].split(',')[0].endswith("GSV"):
-            gsv_sentence_count += 1
-            print(f"\n--- NMEA GSV Sentence {gsv_sentence_count} ---")
-
-        data = nmea_sentence(sentence)
-        if data:
-            all_data.append(data)
-    except ValueError as e:
-        print(f"Error processing sentence: {e}")
-    except Exception as e:
-        print(f"Unexpected error: {e}")
-
-# CSV'ye kaydet
-if all_data:
-    csv_file = "nmea_gsv_output.csv"
+# A GSV sentence carries at most 4 satellites: 4 base fields + 4 x 4 satellite fields + checksum.
+# Used when rows are streamed and the longest row is not known in advance.
+CSV_HEADER = csv_header(21)
+
+def write_csv(all_data, csv_file=CSV_FILE):
+    """Writes parsed GSV rows to a CSV file"""
     with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
         writer = csv.writer(file)
-        
         # Header oluştur - en uzun satırın field sayısını bul
-        max_fields = max(len(row) for row in all_data) if all_data else 0
-        header = []
-        header.extend(["NMEA_Sentence", "Total_GSV_Sentences", "Sentence_Number", "Satellites_in_View"])
-        
-        # Dinamik uydu field'larını ekle
-        satellite_count = (max_fields - 5) // 4  # 4 temel field + checksum = 5
-        for i in range(satellite_count):
-            sat_num = i + 1
-            header.extend([f"Sat_{sat_num}_ID", f"Sat_{sat_num}_Elevation", f"Sat_{sat_num}_Azimuth", f"Sat_{sat_num}_SNR"])
-        
-        # Kalan field'lar için
-        remaining = (max_fields - 5) % 4
-        if remaining > 0:
-            sat_num = satellite_count + 1
-            field_names = ["ID", "Elevation", "Azimuth", "SNR"]
-            for i in range(remaining):
-                header.append(f"Sat_{sat_num}_{field_names[i]}")
-        
-        header.append("Checksum")
-        
-        writer.writerow(header)
+        writer.writerow(csv_header(max(len(row) for row in all_data)))
         writer.writerows(all_data)
-    print(f"\n{len(all_data)} rows of GSV data saved to '{csv_file}'.")
-else:
-    print("No valid GSV data found to save.")
\ No newline at end of file
+
+# Talker ID -> constellation of the satellites in a GSV sentence
+CONSTELLATIONS = {
+    "GP": "GPS",
+    "GL": "GLONASS",
+    "GA": "Galileo",
+    "GB": "BeiDou",
+    "BD": "BeiDou",
+    "GQ": "QZSS",
+    "GI": "NavIC",
+    "GN": "GNSS",
+}
+
+# Sentence types needed for satellite rows: GSV plus the fix time from GGA/RMC
+SKY_VIEW_TYPES = ("GSV", "GGA", "RMC")
+
+SATELLITE_FIELDS = ["epoch", "constellation", "prn", "elevation", "azimuth", "snr"]
+SATELLITE_CSV_FILE = "nmea_gsv_satellites.csv"
+
+
+def _int(value, missing=-1):
+    try:
+        return int(value) if value else missing
+    except ValueError:
+        return missing
+
+
+class SkyViewAssembler:
+    """Reassembles the 'sentence n of total' GSV groups of every constellation into complete sky views.
+
+    State is one open group per talker. A group is evicted (dropped) when a sentence is missing or
+    out of order, when a new group starts before it completes, or when the epoch changes."""
+
+    def __init__(self):
+        self.completed = 0
+        self.evicted = 0
+        self._groups = {}  # talker -> [epoch, total, next sentence number, satellites]
+
+    def add(self, data, epoch=''):
+        """Adds a parsed GSV sentence; returns the (epoch, constellation, prn, elevation, azimuth, snr)
+        rows of the sky view it completed, or an empty list"""
+        talker = data[0][:2]
+        total = _int(data[1])
+        number = _int(data[2])
+        group = self._groups.get(talker)
+        if group is not None and (number != group[2] or total != group[1] or epoch != group[0]):
+            del self._groups[talker]
+            self.evicted += 1
+            group = None
+        if group is None:
+            if number != 1 or total < 1:
+                return []  # Rest of a group whose start was lost
+            group = self._groups[talker] = [epoch, total, 1, []]
+
+        fields = data[4:-1]
+        constellation = CONSTELLATIONS.get(talker, talker)
+        for i in range(0, len(fields) - 3, 4):
+            prn, elevation, azimuth, snr = fields[i:i + 4]
+            if prn:
+                group[3].append((epoch, constellation, _int(prn), _int(elevation), _int(azimuth), _int(snr)))
+
+        if number < total:
+            group[2] = number + 1
+            return []
+        del self._groups[talker]
+        self.completed += 1
+        return group[3]
+
+
+def iter_satellites(records):
+    """Yields one (epoch, constellation, prn, elevation, azimuth, snr) row per satellite of every complete
+    sky view from decoded (type, result) records; the epoch is the UTC time of the last GGA/RMC.
+    Missing numbers are -1."""
+    assembler = SkyViewAssembler()
+    epoch = ''
+    for stype, data in records:
+        if stype == "GSV":
+            yield from assembler.add(data, epoch)
+        elif stype in ("GGA", "RMC"):
+            epoch = data[0]
+
+
+def satellite_arrays(rows):
+    """Packs satellite rows into compact typed NumPy columns (epoch as milliseconds of the day)"""
+    import numpy as np  # Only needed for the array output
+
+    def milliseconds(utc_time):
+        parts = utc_time.split(':')
+        if len(parts) != 3:
+            return -1
+        return round((int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])) * 1000)
+
+    rows = list(rows)
+    columns = list(zip(*rows)) if rows else [()] * len(SATELLITE_FIELDS)
+    return {
+        "epoch": np.array([milliseconds(epoch) for epoch in columns[0]], dtype=np.int32),
+        "constellation": np.array(columns[1], dtype='U7'),
+        "prn": np.array(columns[2], dtype=np.int16),
+        "elevation": np.array(columns[3], dtype=np.int8),
+        "azimuth": np.array(columns[4], dtype=np.int16),
+        "snr": np.array(columns[5], dtype=np.int8),
+    }
+
+
+def write_satellites_csv(rows, csv_file=SATELLITE_CSV_FILE):
+    """Writes satellite rows to a CSV file, returns the row count"""
+    with CsvOutput(csv_file, SATELLITE_FIELDS) as output:
+        for row in rows:
+            output.writerow(row)
+    return output.rows
+
+
+def main(verbose=False, checksum="warn"):
+    validator = ChecksumValidator(checksum, verbose)
+    gsv_sentence_count = 0
+
+    # Rows are written as they are parsed, the input is read one line at a time
+    with CsvOutput(CSV_FILE, CSV_HEADER) as output:
+        for sentence in read_nmea_data("data.txt"):
+            try:
+                is_gsv = sentence.startswith('$') and sentence.split(',', 1)[0].endswith("GSV")
+                # The checksum is verified before anything is decoded or printed
+                if is_gsv and not validator.check(sentence, "GSV"):
+                    continue
+                if verbose and is_gsv:
+                    gsv_sentence_count += 1
+                    print(f"\n--- NMEA GSV Sentence {gsv_sentence_count} ---")
+
+                data = nmea_sentence(sentence, verbose)
+                if data:
+                    output.writerow(data)
+            except ChecksumError:
+                raise
+            except ValueError as e:
+                print(f"Error processing sentence: {e}")
+            except Exception as e:
+                print(f"Unexpected error: {e}")
+
+    if validator.total_corrupt():
+        print(validator.report())
+
+    if output.rows:
+        print(f"\n{output.rows} rows of GSV data saved to '{CSV_FILE}'.")
+    else:
+        print("No valid GSV data found to save.")
+
+
+def main_satellites(checksum="warn"):
+    """Writes the reassembled satellite-per-row table of data.txt"""
+    import nmea_parser  # nmea_parser imports this module, so it is imported on use
+
+    validator = ChecksumValidator(checksum)
+    records = nmea_parser.iter_records(read_nmea_data("data.txt"), SKY_VIEW_TYPES, checksum=validator)
+    rows = write_satellites_csv(iter_satellites(records))
+
+    if validator.total_corrupt():
+        print(validator.report())
+    if rows:
+        print(f"{rows} satellite rows saved to '{SATELLITE_CSV_FILE}'.")
+    else:
+        print("No complete GSV sky view found to save.")
+
+
+if __name__ == '__main__':
+    # --verbose prints every sentence component (debug mode)
+    # --checksum=strict|warn|skip selects how corrupt sentences are handled
+    # --satellites writes one row per satellite of every complete sky view instead
+    if '--satellites' in sys.argv[1:]:
+        main_satellites(checksum=checksum_mode(sys.argv[1:]))
+    else:
+        main(verbose='--verbose' in sys.argv[1:], checksum=checksum_mode(sys.argv[1:]))
@@ -0,0 +1,313 @@
+import os
+import sys
+
+import numpy as np
+
+import nmea_parser
+from nmea_batch import FieldTable, to_dates, to_milliseconds
+from nmea_checksum import ChecksumValidator, checksum_mode, verify_checksum
+from nmea_cli import option
+from nmea_io import COMPRESSED_OPENERS
+from nmea_tokens import iter_tokens
+
+
+# Bump when the index layout changes, so older sidecar files are rebuilt
+INDEX_VERSION = 2
+
+# Lines between two checkpoints: a query decodes at most this many lines before its slice starts
+INDEX_INTERVAL = 1000
+
+# Sidecar file next to the log: <log>.idx
+INDEX_SUFFIX = ".idx"
+
+# Sentence type -> field holding its UTC time (hhmmss.sss); RMC also carries the date (ddmmyy)
+TIME_FIELDS = {
+    "GGA": 1,
+    "RMC": 1,
+    "GLL": 5,
+}
+DATE_FIELD = 9
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+def index_file(filename):
+    return filename + INDEX_SUFFIX
+
+
+def parse_time(text):
+    """'HH:MM', 'HH:MM:SS(.sss)' or NMEA 'hhmmss(.sss)' -> milliseconds since midnight"""
+    if ':' in text:
+        parts = text.split(':')
+        if not 2 <= len(parts) <= 3:
+            raise ValueError(f"Invalid time: {text}")
+        hours, minutes = int(parts[0]), int(parts[1])
+        seconds = float(parts[2]) if len(parts) == 3 else 0.0
+        return round(((hours * 60 + minutes) * 60 + seconds) * 1000)
+    return _milliseconds(text)
+
+
+def parse_date(text):
+    """NMEA 'ddmmyy' -> days since 1970-01-01"""
+    if len(text) != 6 or not text.isdigit():
+        raise ValueError(f"Invalid date: {text} (expected ddmmyy)")
+    return int(to_dates(np.array([float(text)]))[0].astype(np.int64))
+
+
+def _milliseconds(field):
+    """hhmmss.sss field -> milliseconds since midnight (same arithmetic as nmea_batch.to_milliseconds)"""
+    value = float(field)
+    hours = value // 10000
+    minutes = value // 100 % 100
+    seconds = value % 100
+    return round(((hours * 60 + minutes) * 60 + seconds) * 1000)
+
+
+def _keys(times, days):
+    """Sort keys of (time, date) states: milliseconds since 1970 when a date is given, else since midnight.
+    Unknown states (NaN) come first."""
+    if days is None:
+        keys = times.astype(np.float64)
+    else:
+        keys = days.astype(np.float64) * DAY_MS + times
+    return np.where(np.isnan(keys), -np.inf, keys)
+
+
+class LogIndex:
+    """Checkpoints every `interval` lines of a plain NMEA log: the byte offset of the line, the UTC time and
+    date seen last before it (time from GGA/RMC/GLL, date from RMC) and the count of every sentence type
+    before it.
+
+    Built in one vectorized pass over the memory-mapped file (sentences with bad checksums are ignored for
+    times and dates) and saved as an .npz sidecar next to the log. A query seeks to the last checkpoint
+    before its start time and decodes lines only until the log passes its end time, so the log is
+    expected to run forward in time, as receivers write it."""
+
+    def __init__(self, filename, offsets, lines, times, days, counts, totals, interval=INDEX_INTERVAL):
+        self.filename = filename
+        self.offsets = offsets    # Byte offset of every checkpoint line
+        self.lines = lines        # Line number of every checkpoint
+        self.times = times        # Milliseconds since midnight of the last timed sentence before it (NaN: none)
+        self.days = days          # Days since 1970 of the last RMC date before it (NaN: none)
+        self.counts = counts      # checkpoints x types: sentences of each type before it
+        self.totals = totals      # Sentences of each type in the whole log
+        self.interval = interval
+
+    @classmethod
+    def build(cls, filename, interval=INDEX_INTERVAL, block_size=16 * 1024 * 1024):
+        with open(filename, 'rb') as file:
+            if any(file.read(6).startswith(signature) for signature, _ in COMPRESSED_OPENERS):
+                raise ValueError(f"Compressed logs cannot be indexed (no random access): {filename}")
+
+        codes = np.array([stype.encode('ascii') for stype in nmea_parser.DECODERS])
+        offsets, lines, times, days, counts = [], [], [], [], []
+        totals = np.zeros(len(codes), dtype=np.int64)
+        last_time = last_day = last_day_time = np.nan
+        line_base = byte_base = 0
+        validator = ChecksumValidator("skip")
+
+        for tokens in iter_tokens(filename, block_size):
+            tables = {stype: FieldTable(tokens, stype, validator) for stype in TIME_FIELDS}
+            timed_lines = np.concatenate([table.lines for table in tables.values()])
+            timed = np.concatenate([to_milliseconds(table.numbers(TIME_FIELDS[stype]))
+                                    for stype, table in tables.items()])
+            known = ~np.isnan(timed)
+            order = np.argsort(timed_lines[known], kind='stable')
+            timed_lines, timed = timed_lines[known][order], timed[known][order]
+
+            rmc = tables["RMC"]
+            dated = to_dates(rmc.numbers(DATE_FIELD))
+            dated_times = to_milliseconds(rmc.numbers(TIME_FIELDS["RMC"]))
+            known = ~np.isnat(dated) & ~np.isnan(dated_times)
+            dated_lines, dated = rmc.lines[known], dated[known].astype(np.int64).astype(np.float64)
+            dated_times = dated_times[known]
+
+            # Checkpoints falling in this block, as local line numbers
+            first = -line_base % interval
+            checkpoints = np.arange(first, len(tokens), interval)
+
+            before = np.searchsorted(timed_lines, checkpoints) - 1
+            times.append(np.where(before >= 0, timed[np.maximum(before, 0)] if len(timed) else 0, last_time))
+            before = np.searchsorted(dated_lines, checkpoints) - 1
+            day = np.where(before >= 0, dated[np.maximum(before, 0)] if len(dated) else 0, last_day)
+            day_time = np.where(before >= 0, dated_times[np.maximum(before, 0)] if len(dated) else 0, last_day_time)
+            # Past midnight but before the first RMC of the new day, the last date is one day behind
+            days.append(day + (times[-1] < day_time - DAY_MS // 2))
+
+            types = tokens.types()
+            running = np.zeros((len(tokens) + 1, len(codes)), dtype=np.int64)
+            for i, code in enumerate(codes):
+                np.cumsum(types == code, out=running[1:, i])
+            counts.append(totals + running[checkpoints])
+            totals = totals + running[-1]
+
+            offsets.append(byte_base + tokens.line_starts[checkpoints])
+            lines.append(line_base + checkpoints)
+            if len(timed):
+                last_time = timed[-1]
+            if len(dated):
+                last_day, last_day_time = dated[-1], dated_times[-1]
+            line_base += len(tokens)
+            byte_base += int(tokens.line_ends[-1]) + 1 if len(tokens) else 0
+
+        if not offsets:
+            return cls(filename, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0),
+                       np.zeros(0), np.zeros((0, len(codes)), dtype=np.int64), totals, interval)
+        return cls(filename, np.concatenate(offsets).astype(np.int64), np.concatenate(lines).astype(np.int64),
+                   np.concatenate(times), np.concatenate(days), np.concatenate(counts), totals, interval)
+
+    def save(self):
+        """Writes the sidecar file, stamped with the log size and mtime to detect a changed log"""
+        stat = os.stat(self.filename)
+        header = np.array([INDEX_VERSION, self.interval, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+        temporary = index_file(self.filename) + '.tmp'
+        with open(temporary, 'wb') as file:
+            np.savez(file, header=header, offsets=self.offsets, lines=self.lines, times=self.times,
+                     days=self.days, counts=self.counts, totals=self.totals,
+                     types=np.array([stype.encode('ascii') for stype in nmea_parser.DECODERS]))
+        os.replace(temporary, index_file(self.filename))
+
+    @classmethod
+    def load(cls, filename):
+        """Index from the sidecar file, or None when it is missing, outdated or the log changed since"""
+        try:
+            stat = os.stat(filename)
+            with np.load(index_file(filename)) as data:
+                version, interval, size, mtime = data["header"].tolist()
+                types = [code.decode('ascii') for code in data["types"]]
+                if (version, size, mtime) != (INDEX_VERSION, stat.st_size, stat.st_mtime_ns) \
+                        or types != list(nmea_parser.DECODERS):
+                    return None
+                return cls(filename, data["offsets"], data["lines"], data["times"], data["days"],
+                           data["counts"], data["totals"], interval)
+        except (OSError, ValueError, KeyError, EOFError):
+            return None
+
+    def count(self, sentence_type):
+        """Sentences of one type in the whole log"""
+        return int(self.totals[list(nmea_parser.DECODERS).index(sentence_type)])
+
+    def seek(self, start=None, date=None):
+        """Byte offset of the last checkpoint before `start` (milliseconds since midnight, on `date`
+        in days since 1970 when given)"""
+        if start is None or not len(self.offsets):
+            return 0
+        if date is None:
+            keys, target = _keys(self.times, None), start
+        else:
+            keys, target = _keys(self.times, self.days), date * DAY_MS + start
+        # Running maximum: a stretch where time goes backwards (receiver reset, midnight without
+        # a date) can only move the start earlier, never past sentences of the slice
+        keys = np.maximum.accumulate(keys)
+        checkpoint = int(np.searchsorted(keys, target, side='left')) - 1
+        return int(self.offsets[max(checkpoint, 0)])
+
+    def sentences(self, types=None, start=None, end=None, date=None):
+        """Yields the sentences of the given types whose time lies in [start, end] (milliseconds since
+        midnight, on `date` in days since 1970 when given). Untimed sentences (GSA, GSV, VTG) take the time
+        of the timed sentence before them. Reading stops at the first valid timed sentence after end, so without
+        a date only the first stretch of the log in the time range is found.
+        With a date, the day is known from the first RMC after the seek point: the sentences before it are held
+        (up to one index interval) and dated from that RMC, a time later than its own being from the day before.
+        Likewise a time earlier than the last RMC's (by more than half a day) is already on the next day."""
+        wanted = None if types is None else set(types)
+        low = -np.inf if start is None else start if date is None else date * DAY_MS + start
+        high = np.inf if end is None else end if date is None else date * DAY_MS + end
+        key = -np.inf
+        day = rmc_time = None
+        pending = []  # (sentence, type, time) read before the day is known
+        with open(self.filename, 'rb') as file:
+            file.seek(self.seek(start, date))
+            for raw in file:
+                sentence = raw.strip().decode('utf-8', errors='replace')
+                stype = nmea_parser.sentence_type(sentence)
+                if stype is None:
+                    continue
+                time = None
+                field = TIME_FIELDS.get(stype)
+                if field is not None and verify_checksum(sentence) is not False:
+                    fields = sentence.split(',')
+                    try:
+                        time = _milliseconds(fields[field].split('*')[0])
+                        if stype == "RMC" and date is not None:
+                            day, rmc_time = parse_date(fields[DATE_FIELD]), time
+                    except (ValueError, IndexError):
+                        time = None
+                if date is not None and day is None:
+                    if len(pending) < self.interval:  # Farther from an RMC, sentences cannot be dated
+                        pending.append((sentence, stype, time))
+                    continue
+                if pending:
+                    # This RMC dates the sentences before it
+                    for held, held_type, held_time in pending:
+                        if held_time is not None:
+                            key = (day - 1 if held_time > time + DAY_MS // 2 else day) * DAY_MS + held_time
+                            if key > high:
+                                return
+                        if key >= low and (wanted is None or held_type in wanted):
+                            yield held
+                    pending = []
+                if time is not None:
+                    if date is None:
+                        key = time
+                    else:
+                        key = (day + 1 if time < rmc_time - DAY_MS // 2 else day) * DAY_MS + time
+                    if key > high:
+                        return
+                if key >= low and (wanted is None or stype in wanted):
+                    yield sentence
+
+    def query(self, types=None, start=None, end=None, date=None, verbose=False, checksum="warn"):
+        """Decoded (type, result) records of sentences(types, start, end, date)"""
+        return nmea_parser.iter_records(self.sentences(types, start, end, date), types, verbose, checksum)
+
+
+def open_index(filename, interval=INDEX_INTERVAL, rebuild=False):
+    """Index of a log from its sidecar file, built (and saved, when the directory is writable) if needed"""
+    index = None if rebuild else LogIndex.load(filename)
+    if index is None:
+        index = LogIndex.build(filename, interval)
+        try:
+            index.save()
+        except OSError:
+            pass
+    return index
+
+
+def main():
+    # Usage: nmea_index.py [file] [--type=RMC,GGA] [--from=12:00] [--to=12:05] [--date=ddmmyy]
+    #                      [--interval=LINES] [--rebuild] [--checksum=strict|warn|skip]
+    files = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    filename = files[0] if files else "data.txt"
+    try:
+        index = open_index(filename, int(option("interval", INDEX_INTERVAL)), '--rebuild' in sys.argv[1:])
+    except (OSError, ValueError) as e:
+        print(e)
+        return
+    print(f"{len(index.offsets)} checkpoints in '{index_file(filename)}': " +
+          ', '.join(f"{index.count(stype)} {stype}" for stype in nmea_parser.DECODERS if index.count(stype)))
+
+    types = option("type")
+    start, end, date = option("from"), option("to"), option("date")
+    if not (types or start or end or date):
+        return
+    try:
+        start = None if start is None else parse_time(start)
+        end = None if end is None else parse_time(end)
+        date = None if date is None else parse_date(date)
+    except ValueError as e:
+        print(e)
+        return
+    validator = ChecksumValidator(checksum_mode(sys.argv[1:]))
+    records = index.query(types.split(',') if types else None, start, end, date, checksum=validator)
+    counts = nmea_parser.records_to_csv(records)
+    if validator.total_corrupt():
+        print(validator.report())
+    for stype, rows in counts.items():
+        print(f"{rows} rows of {stype} data saved to '{nmea_parser.DECODERS[stype].CSV_FILE}'.")
+    if not counts:
+        print("No sentences in that range.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import bz2
+import csv
+import gzip
+import io
+import lzma
+import os
+
+
+# Magic bytes -> opener for compressed NMEA logs
+COMPRESSED_OPENERS = [
+    (b'\x1f\x8b', gzip.open),
+    (b'BZh', bz2.open),
+    (b'\xfd7zXZ\x00', lzma.open),
+]
+
+
+def open_nmea(filename, binary=False):
+    """Opens a plain, gzip, bz2 or xz NMEA file for text (or raw bytes) reading"""
+    with open(filename, 'rb') as file:
+        magic = file.read(6)
+    for signature, opener in COMPRESSED_OPENERS:
+        if magic.startswith(signature):
+            if binary:
+                return opener(filename, 'rb')
+            return opener(filename, 'rt', encoding='utf-8', errors='replace')
+    if binary:
+        return open(filename, 'rb')
+    return open(filename, 'r', encoding='utf-8', errors='replace')
+
+
+def read_nmea_progress(filename):
+    """Like read_nmea_data, but yields (sentence, bytes read from disk so far) for progress reporting.
+    For compressed files the position counts compressed bytes, so it still ends at the file size."""
+    with open(filename, 'rb') as raw:
+        magic = raw.read(6)
+        raw.seek(0)
+        stream = None
+        for signature, opener in COMPRESSED_OPENERS:
+            if magic.startswith(signature):
+                stream = opener(raw, 'rt', encoding='utf-8', errors='replace')
+                break
+        if stream is None:
+            stream = io.TextIOWrapper(raw, encoding='utf-8', errors='replace')
+        with stream:
+            for line in stream:
+                line = line.strip()
+                if line:
+                    yield line, raw.tell()
+
+
+def read_nmea_data(filename):
+    """Yields NMEA sentences from a txt (or compressed) file one line at a time"""
+    try:
+        with open_nmea(filename) as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    yield line
+    except FileNotFoundError:
+        print(f"File not found: {filename}")
+
+
+class CsvOutput:
+    """CSV file written row by row, created only when the first row arrives.
+    With append=True rows are added to an existing file; the header is written only to a new one."""
+
+    def __init__(self, csv_file, header, append=False):
+        self.csv_file = csv_file
+        self.header = header
+        self.append = append
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+    def writerow(self, row):
+        if self._writer is None:
+            new = not (self.append and os.path.exists(self.csv_file) and os.path.getsize(self.csv_file))
+            self._file = open(self.csv_file, mode='a' if self.append else 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            if new:
+                self._writer.writerow(self.header)
+        self._writer.writerow(row)
+        self.rows += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
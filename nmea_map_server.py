@@ -0,0 +1,213 @@
+import json
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+import nmea_track
+
+
+# Zoom levels with a precomputed simplified track; above the last one the raw points are served
+LEVEL_ZOOMS = (4, 6, 8, 10, 12, 14, 16)
+
+# Points one level may keep, and points one viewport response may contain
+MAX_LEVEL_POINTS = 20000
+MAX_RESPONSE_POINTS = 20000
+
+# Zoom from which sampled point markers are sent along with the route
+MARKER_ZOOM = 15
+
+
+def meters_per_pixel(zoom, latitude):
+    """Ground resolution of a web mercator map at a zoom level"""
+    return 156543.03392 * math.cos(math.radians(latitude)) / 2 ** zoom
+
+
+class TrackLevels:
+    """Multi-resolution copies of one track, from the raw points down to a few hundred.
+    Each level is simplified to half a pixel at its zoom, starting from the finer level."""
+
+    def __init__(self, coordinates):
+        self.points = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+        self.levels = {}  # zoom -> indices into self.points
+        if not len(self.points):
+            return
+        latitude = float(self.points[:, 0].mean())
+        indices = np.arange(len(self.points))
+        for zoom in sorted(LEVEL_ZOOMS, reverse=True):
+            tolerance = meters_per_pixel(zoom, latitude) / 2
+            kept = nmea_track.simplify_indices(self.points[indices], tolerance, MAX_LEVEL_POINTS)
+            indices = indices[kept]
+            self.levels[zoom] = indices
+
+    def bounds(self):
+        """[[south, west], [north, east]] of the whole track"""
+        if not len(self.points):
+            return None
+        south, west = self.points.min(axis=0)
+        north, east = self.points.max(axis=0)
+        return [[float(south), float(west)], [float(north), float(east)]]
+
+    def level(self, zoom):
+        """Point indices to draw at a zoom level"""
+        coarser = [level for level in LEVEL_ZOOMS if level <= zoom]
+        if zoom > LEVEL_ZOOMS[-1] or not self.levels:
+            return np.arange(len(self.points))
+        return self.levels[coarser[-1] if coarser else LEVEL_ZOOMS[0]]
+
+    def geojson(self, zoom, bbox=None):
+        """GeoJSON FeatureCollection of the route inside bbox (west, south, east, north) at a zoom level.
+        Contains MultiLineString parts of consecutive visible points and, zoomed in, sampled point markers."""
+        level = self.level(zoom)
+        positions = np.arange(len(level))
+        if bbox is not None and len(level):
+            west, south, east, north = bbox
+            points = self.points[level]
+            inside = ((points[:, 0] >= south) & (points[:, 0] <= north) &
+                      (points[:, 1] >= west) & (points[:, 1] <= east))
+            # Keep the neighbours of visible points so lines crossing the viewport edge are drawn
+            inside[1:] |= inside[:-1].copy()
+            inside[:-1] |= inside[1:].copy()
+            positions = positions[inside]
+        # Route parts: runs of consecutive points of the level that are visible
+        parts = np.concatenate([[0], np.cumsum(np.diff(positions) > 1)]) if len(positions) else positions
+        if len(positions) > MAX_RESPONSE_POINTS:
+            sample = nmea_track.sample_indices(len(positions), MAX_RESPONSE_POINTS)
+            positions, parts = positions[sample], parts[sample]
+        indices = level[positions]
+
+        features = []
+        if len(indices):
+            breaks = np.flatnonzero(np.diff(parts)) + 1
+            lines = [[[float(lon), float(lat)] for lat, lon in self.points[part]]
+                     for part in np.split(indices, breaks) if len(part) > 1]
+            features.append({"type": "Feature", "properties": {"kind": "route"},
+                             "geometry": {"type": "MultiLineString", "coordinates": lines}})
+        if zoom >= MARKER_ZOOM:
+            for i in indices[nmea_track.sample_indices(len(indices))]:
+                lat, lon = self.points[i]
+                features.append({"type": "Feature", "properties": {"kind": "point", "index": int(i) + 1},
+                                 "geometry": {"type": "Point", "coordinates": [float(lon), float(lat)]}})
+        return {"type": "FeatureCollection", "features": features}
+
+
+MAP_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.css"/>
+<script src="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.js"></script>
+<style>html, body, #map { height: 100%; margin: 0; }</style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+var map = L.map('map').setView([39.9334, 32.8597], 6);
+L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+    maxZoom: 19, attribution: '&copy; OpenStreetMap contributors'
+}).addTo(map);
+var layer = L.geoJSON(null, {
+    style: {color: 'blue', weight: 3, opacity: 1.0},
+    pointToLayer: function (feature, latlng) {
+        return L.circleMarker(latlng, {radius: 8, color: 'lightblue', fillColor: 'lightblue', fillOpacity: 1.0});
+    },
+    onEachFeature: function (feature, item) {
+        if (feature.properties.kind === 'point') {
+            var p = item.getLatLng();
+            item.bindPopup('Point ' + feature.properties.index + '<br>Latitude: ' + p.lat + '<br>Longitude: ' + p.lng);
+            item.bindTooltip('Point ' + feature.properties.index);
+        }
+    }
+}).addTo(map);
+var version = 0, request = 0;
+
+// Fetch only the detail of the current zoom and viewport
+function refresh() {
+    var b = map.getBounds(), current = ++request;
+    var url = '/track?v=' + version + '&zoom=' + map.getZoom() + '&bbox=' +
+        [b.getWest(), b.getSouth(), b.getEast(), b.getNorth()].join(',');
+    fetch(url).then(function (r) { return r.json(); }).then(function (data) {
+        if (current !== request) { return; }  // A newer view was requested meanwhile
+        layer.clearLayers();
+        layer.addData(data);
+    });
+}
+
+// Called by the GUI after a new track was published
+function showTrack(newVersion) {
+    version = newVersion;
+    fetch('/bounds?v=' + version).then(function (r) { return r.json(); }).then(function (bounds) {
+        if (bounds) { map.fitBounds(bounds); }
+        refresh();
+    });
+}
+
+// Called by the GUI when the track grew (follow mode): new detail, same view
+function updateTrack(newVersion) {
+    version = newVersion;
+    refresh();
+}
+
+map.on('moveend', refresh);
+showTrack(0);
+</script>
+</body>
+</html>
+"""
+
+
+class MapServer:
+    """In-process HTTP server feeding the map page with level-of-detail GeoJSON of the current track"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.levels = TrackLevels([])
+        self.version = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                levels = server.levels  # Swapped atomically by set_track
+                if url.path == '/':
+                    self._send(MAP_PAGE.encode('utf-8'), 'text/html; charset=utf-8')
+                elif url.path == '/bounds':
+                    self._send(json.dumps(levels.bounds()).encode(), 'application/json')
+                elif url.path == '/track':
+                    zoom = int(float(query.get('zoom', ['0'])[0]))
+                    bbox = [float(value) for value in query['bbox'][0].split(',')] if 'bbox' in query else None
+                    self._send(json.dumps(levels.geojson(zoom, bbox)).encode(), 'application/json')
+                else:
+                    self.send_error(404)
+
+            def _send(self, body, content_type):
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # No request logging on the console
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def set_track(self, levels):
+        """Publishes a new TrackLevels; returns its version number for the page's showTrack()"""
+        self.levels = levels
+        self.version += 1
+        return self.version
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
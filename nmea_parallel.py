@@ -0,0 +1,97 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import nmea_parser
+from nmea_checksum import ChecksumValidator, checksum_mode
+from nmea_io import COMPRESSED_OPENERS
+
+
+CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def is_compressed(filename):
+    """True when the file starts with a gzip/bz2/xz signature (not splittable by byte offset)"""
+    with open(filename, 'rb') as file:
+        magic = file.read(6)
+    return any(magic.startswith(signature) for signature, _ in COMPRESSED_OPENERS)
+
+
+def chunk_ranges(filename, chunk_size=CHUNK_SIZE):
+    """Splits a file into (start, end) byte ranges of about chunk_size bytes.
+    Every range starts right after a newline, so no sentence is cut in half."""
+    size = os.path.getsize(filename)
+    ranges = []
+    start = 0
+    with open(filename, 'rb') as file:
+        while start < size:
+            end = start + chunk_size
+            if end >= size:
+                end = size
+            else:
+                file.seek(end)
+                file.readline()  # Move the boundary to the start of the next line
+                end = file.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_range(filename, start, end, types=None, checksum="warn"):
+    """Parses the sentences in one byte range of a file with the nmea_sentence decoders.
+    Returns the per-type results and the (checked, corrupt, missing) checksum counts."""
+    with open(filename, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    validator = ChecksumValidator(checksum)
+    results = nmea_parser.parse_sentences((line.strip() for line in lines if line.strip()), types, checksum=validator)
+    return results, (validator.checked, validator.corrupt, validator.missing)
+
+
+def _parse_range(args):
+    return parse_range(*args)
+
+
+def parse_file_parallel(filename, types=None, processes=None, chunk_size=CHUNK_SIZE, checksum="warn"):
+    """Parses an NMEA file in a process pool, one byte range per task, and merges the
+    per-type result tables back in original file order.
+    checksum is a mode (strict/warn/skip) or a ChecksumValidator collecting the merged counts."""
+    validator = checksum if isinstance(checksum, ChecksumValidator) else ChecksumValidator(checksum)
+    if not os.path.exists(filename):
+        print(f"File not found: {filename}")
+        return {stype: [] for stype in (nmea_parser.DECODERS.keys() if types is None else types)}
+    if is_compressed(filename):
+        # Compressed streams can not be split by byte offset
+        return nmea_parser.parse_file(filename, types, checksum=validator)
+
+    results = {stype: [] for stype in (nmea_parser.DECODERS.keys() if types is None else types)}
+    tasks = [(filename, start, end, types, validator.mode) for start, end in chunk_ranges(filename, chunk_size)]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        # map() returns the chunk results in submission order
+        for chunk_results, (checked, corrupt, missing) in executor.map(_parse_range, tasks):
+            for stype, data in chunk_results.items():
+                results[stype].extend(data)
+            for stype in checked:
+                validator.record(stype, checked[stype], corrupt.get(stype, 0), missing.get(stype, 0))
+    return results
+
+
+def main():
+    # Usage: nmea_parallel.py [file] [--checksum=strict|warn|skip]
+    files = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    filename = files[0] if files else "data.txt"
+    validator = ChecksumValidator(checksum_mode(sys.argv[1:]))
+    results = parse_file_parallel(filename, checksum=validator)
+    written = nmea_parser.write_outputs(results)
+
+    for stype, csv_file in written.items():
+        print(f"{len(results[stype])} rows of {stype} data saved to '{csv_file}'.")
+    if not written:
+        print("No valid data found to save.")
+    if validator.total_corrupt():
+        print(validator.report())
+
+
+if __name__ == '__main__':
+    main()
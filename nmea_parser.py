@@ -0,0 +1,189 @@
+import os
+import sys
+
+import nmea_gga
+import nmea_gll
+import nmea_gsa
+import nmea_gsv
+import nmea_rmc
+import nmea_vtg
+from nmea_checksum import ChecksumValidator, checksum_mode
+from nmea_filter import filter_option
+from nmea_io import CsvOutput, read_nmea_data
+from nmea_profile import StageProfile
+
+
+# Sentence type -> parser module (nmea_sentence decoder + CSV writer)
+DECODERS = {
+    "GGA": nmea_gga,
+    "GSA": nmea_gsa,
+    "GLL": nmea_gll,
+    "RMC": nmea_rmc,
+    "VTG": nmea_vtg,
+    "GSV": nmea_gsv,
+}
+
+# Decoders whose result is not already a CSV row
+CSV_ROWS = {
+    "GSA": nmea_gsa.csv_row,
+}
+
+
+def sentence_type(sentence):
+    """Returns the sentence type of an NMEA sentence (e.g. 'GGA' for $GPGGA), or None"""
+    if not sentence.startswith('$'):
+        return None
+    end = sentence.find(',')
+    if end < 6:
+        return None
+    # Address field: 2 character talker ID (GP, GN, GL...) + 3 character sentence type
+    return sentence[end - 3:end]
+
+
+def iter_records(sentences, types=None, verbose=False, checksum="warn", profile=None, where=None, columns=None):
+    """Dispatches each sentence to its decoder and yields (type, result) one at a time.
+    Silent by default; verbose=True prints decoder components and errors (debug mode).
+    checksum is a mode (strict/warn/skip) or a ChecksumValidator collecting corruption counts.
+    profile is an optional nmea_profile.StageProfile collecting time per stage and sentence type.
+    where is an optional nmea_filter.SentenceFilter: rejected sentences are dropped before their
+    checksum is verified or anything is decoded (and are not in the checksum counts).
+    columns is an optional {type: [CSV_HEADER names]} projection for decoders with COLUMNS (GGA, RMC, GLL,
+    VTG): their results hold only those columns, and fields outside them are not converted."""
+    wanted = DECODERS.keys() if types is None else set(types)
+    if where:
+        sentences = where.select(sentences, wanted)
+    validator = checksum if isinstance(checksum, ChecksumValidator) else ChecksumValidator(checksum, verbose)
+    if columns is not None:
+        unknown = [f"{stype}.{column}" for stype, names in columns.items()
+                   for column in names
+                   if stype not in DECODERS or column not in getattr(DECODERS[stype], 'COLUMNS', {})]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    if profile is not None:
+        yield from _iter_records_profiled(sentences, wanted, verbose, validator, profile, columns)
+        return
+
+    for sentence in sentences:
+        stype = sentence_type(sentence)
+        if stype not in wanted or not validator.check(sentence, stype):
+            continue
+        try:
+            projection = None if columns is None else columns.get(stype)
+            if projection is None:
+                data = DECODERS[stype].nmea_sentence(sentence, verbose)
+            else:
+                data = DECODERS[stype].nmea_sentence(sentence, verbose, columns=projection)
+        except (ValueError, IndexError) as e:
+            if verbose:
+                print(f"Error processing {stype} sentence: {e}")
+            continue
+        if data:
+            yield stype, data
+
+
+def _iter_records_profiled(sentences, wanted, verbose, validator, profile, columns=None):
+    """iter_records with a lap at every stage boundary (kept apart so the plain loop has no checks)"""
+    profile.start()
+    for sentence in sentences:
+        profile.lap("read")
+        stype = sentence_type(sentence)
+        profile.lap("dispatch", stype or '')
+        if stype not in wanted:
+            continue
+        valid = validator.check(sentence, stype)
+        profile.lap("checksum", stype)
+        if not valid:
+            continue
+        try:
+            if columns is None or stype not in columns:
+                data = DECODERS[stype].nmea_sentence(sentence, verbose, profile)
+            else:
+                data = DECODERS[stype].nmea_sentence(sentence, verbose, profile, columns[stype])
+        except (ValueError, IndexError) as e:
+            if verbose:
+                print(f"Error processing {stype} sentence: {e}")
+            profile.lap("decode", stype)
+            continue
+        profile.lap("decode", stype)
+        if data:
+            yield stype, data
+            # Whatever the consumer did with the record before asking for the next one
+            profile.lap("output", stype)
+
+
+def parse_sentences(sentences, types=None, verbose=False, checksum="warn", profile=None, where=None):
+    """Dispatches each sentence to its decoder and returns {type: [results]}"""
+    results = {stype: [] for stype in (DECODERS.keys() if types is None else types)}
+    for stype, data in iter_records(sentences, types, verbose, checksum, profile, where):
+        results[stype].append(data)
+    return results
+
+
+def parse_file(filename, types=None, verbose=False, checksum="warn", profile=None, where=None):
+    """Reads an NMEA file once and returns per-type result tables"""
+    return parse_sentences(read_nmea_data(filename), types, verbose, checksum, profile, where)
+
+
+def write_outputs(results, directory='.'):
+    """Writes each non-empty result table to its nmea_<type>_output.csv file"""
+    written = {}
+    for stype, all_data in results.items():
+        if not all_data:
+            continue
+        module = DECODERS[stype]
+        csv_file = os.path.join(directory, module.CSV_FILE)
+        module.write_csv(all_data, csv_file)
+        written[stype] = csv_file
+    return written
+
+
+def records_to_csv(records, directory='.', append=False):
+    """Writes (type, result) records to their nmea_<type>_output.csv files as they arrive.
+    append=True adds the rows to existing files. Returns {type: row count}."""
+    outputs = {}
+    try:
+        for stype, data in records:
+            output = outputs.get(stype)
+            if output is None:
+                module = DECODERS[stype]
+                output = outputs[stype] = CsvOutput(os.path.join(directory, module.CSV_FILE), module.CSV_HEADER,
+                                                    append)
+            to_row = CSV_ROWS.get(stype)
+            output.writerow(to_row(data) if to_row else data)
+    finally:
+        for output in outputs.values():
+            output.close()
+    return {stype: output.rows for stype, output in outputs.items()}
+
+
+def stream_to_csv(filename, directory='.', types=None, verbose=False, checksum="warn", profile=None, where=None):
+    """Parses an NMEA file line by line, appending each record to its CSV as it is decoded.
+    Memory use does not depend on the file size. Returns {type: row count}.
+    With a profile, CSV writing is timed as the "output" stage."""
+    return records_to_csv(iter_records(read_nmea_data(filename), types, verbose, checksum, profile, where),
+                          directory)
+
+
+def main(verbose=False, checksum="warn", profile=False, where=None):
+    validator = ChecksumValidator(checksum, verbose)
+    stage_profile = StageProfile() if profile else None
+    counts = stream_to_csv("data.txt", verbose=verbose, checksum=validator, profile=stage_profile, where=where)
+
+    if validator.total_corrupt():
+        print(validator.report())
+
+    for stype, rows in counts.items():
+        print(f"{rows} rows of {stype} data saved to '{DECODERS[stype].CSV_FILE}'.")
+    if not counts:
+        print("No valid data found to save.")
+    if stage_profile is not None:
+        print(stage_profile.report())
+
+
+if __name__ == '__main__':
+    # --verbose prints every sentence component (debug mode)
+    # --checksum=strict|warn|skip selects how corrupt sentences are handled
+    # --profile prints the time spent per parse stage and sentence type
+    # --where='time=12:00-12:05 box=lat1,lon1,lat2,lon2 fix>=4 status=A' decodes only the matching sentences
+    main(verbose='--verbose' in sys.argv[1:], checksum=checksum_mode(sys.argv[1:]),
+         profile='--profile' in sys.argv[1:], where=filter_option(sys.argv[1:]))
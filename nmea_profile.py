@@ -0,0 +1,73 @@
+import time
+from collections import defaultdict
+
+
+# Parse stages in pipeline order:
+#   read        - waiting for the next line of the input (file reading, decompression)
+#   dispatch    - finding the sentence type
+#   checksum    - checksum validation
+#   split       - splitting the sentence into fields (inside the decoder)
+#   coordinates - DDMM.MMMM -> decimal degree conversion and formatting
+#   time        - HHMMSS.sss -> HH:MM:SS.sss formatting
+#   print       - printing components (verbose mode)
+#   decode      - rest of the decoder (field selection, result building, errors)
+#   output      - the consumer of the records (CSV writing, table rows...)
+STAGES = ("read", "dispatch", "checksum", "split", "coordinates", "time", "print", "decode", "output")
+
+
+class StageProfile:
+    """Cumulative time and call counts per parse stage and sentence type.
+
+    Timing works in laps: lap(stage) charges the time since the previous lap to that stage,
+    so consecutive laps cover the whole run without gaps and the stage times add up to the total.
+    Passing no profile to the parse functions skips every lap call."""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)  # (stage, sentence type) -> seconds
+        self.counts = defaultdict(int)     # (stage, sentence type) -> laps
+        self._last = time.perf_counter()
+
+    def start(self):
+        """Starts timing from now (time before it is not charged to any stage)"""
+        self._last = time.perf_counter()
+
+    def lap(self, stage, sentence_type=''):
+        now = time.perf_counter()
+        key = (stage, sentence_type)
+        self.seconds[key] += now - self._last
+        self.counts[key] += 1
+        self._last = now
+
+    def stage_seconds(self):
+        """{stage: seconds} summed over sentence types, in pipeline order"""
+        totals = defaultdict(float)
+        for (stage, _), seconds in self.seconds.items():
+            totals[stage] += seconds
+        return {stage: totals[stage] for stage in sorted(totals, key=_stage_order)}
+
+    def total(self):
+        return sum(self.seconds.values())
+
+    def report(self):
+        """Table of every stage and sentence type: laps, seconds, share of the total, microseconds per lap"""
+        total = self.total() or 1.0
+        lines = [f"{'Stage':<12} {'Type':<5} {'Count':>10} {'Seconds':>9} {'Share':>7} {'us/call':>9}"]
+        for stage, sentence_type in sorted(self.seconds, key=lambda key: (_stage_order(key[0]), key[1])):
+            seconds = self.seconds[stage, sentence_type]
+            count = self.counts[stage, sentence_type]
+            lines.append(f"{stage:<12} {sentence_type:<5} {count:>10} {seconds:>9.3f} {seconds / total:>7.1%} "
+                         f"{seconds / count * 1e6:>9.2f}")
+        lines.append(f"{'total':<12} {'':<5} {'':>10} {self.total():>9.3f}")
+        return '\n'.join(lines)
+
+    def summary(self, stages=4):
+        """One line with the largest stages, e.g. 'decode 41%, read 22%, output 18%, checksum 9%'"""
+        total = self.total()
+        if not total:
+            return "no stages timed"
+        largest = sorted(self.stage_seconds().items(), key=lambda item: item[1], reverse=True)[:stages]
+        return ', '.join(f"{stage} {seconds / total:.0%}" for stage, seconds in largest)
+
+
+def _stage_order(stage):
+    return STAGES.index(stage) if stage in STAGES else len(STAGES)
@@ -0,0 +1,317 @@
+import array
+import datetime
+import math
+from typing import NamedTuple, Optional, Tuple
+
+import nmea_parser
+from nmea_checksum import ChecksumValidator
+from nmea_io import read_nmea_data
+
+
+def _float(value):
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _int(value):
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def _time_ms(value):
+    """Milliseconds since midnight of a 'HHMMSS(.sss)' UTC time field"""
+    if len(value) < 6:
+        return None
+    try:
+        return round((int(value[:2]) * 3600 + int(value[2:4]) * 60 + float(value[4:])) * 1000)
+    except ValueError:
+        return None
+
+
+def _formatted_time_ms(value):
+    """Milliseconds since midnight of a formatted 'HH:MM:SS.sss' time"""
+    parts = value.split(':')
+    if len(parts) != 3:
+        return None
+    try:
+        return round((int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])) * 1000)
+    except ValueError:
+        return None
+
+
+def _coordinate(value, hemisphere, degree_digits):
+    """Signed decimal degrees of a DDMM.MMMM (degree_digits=2) or DDDMM.MMMM (3) field, at full precision"""
+    try:
+        degrees = float(value[:degree_digits]) + float(value[degree_digits:]) / 60
+    except ValueError:
+        return None
+    return -degrees if hemisphere in ('S', 'W') else degrees
+
+
+def _date(value):
+    """date of a 'ddmmyy' RMC date field (yy < 80 is 20yy, as in nmea_batch.to_dates)"""
+    try:
+        year = int(value[4:6])
+        return datetime.date(year + (2000 if year < 80 else 1900), int(value[2:4]), int(value[:2]))
+    except ValueError:
+        return None
+
+
+def _checksum(value):
+    """Byte value of a '*hh' checksum field"""
+    try:
+        return int(value[1:], 16) if value else None
+    except ValueError:
+        return None
+
+
+def split_sentence(sentence):
+    """'$GPGGA,...*hh' -> (fields split on ',' with the address first, '*hh' checksum text or '')"""
+    body, separator, checksum = sentence[1:].partition('*')
+    return body.split(','), separator + checksum
+
+
+# Typed records: times are milliseconds since midnight, missing values are None
+
+class GGARecord(NamedTuple):
+    utc_time: Optional[int]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    altitude: Optional[float]
+    satellites: Optional[int]
+    fix_quality: Optional[int]
+
+
+class RMCRecord(NamedTuple):
+    utc_time: Optional[int]
+    status: str
+    latitude: Optional[float]
+    longitude: Optional[float]
+    speed: Optional[float]
+    direction: Optional[float]
+    date: Optional[datetime.date]
+    magnetic_variation: Optional[float]
+    variation_direction: Optional[str]
+    checksum: Optional[int]
+
+
+class GLLRecord(NamedTuple):
+    utc_time: Optional[int]
+    status: str
+    latitude: Optional[float]
+    longitude: Optional[float]
+    checksum: Optional[int]
+
+
+class VTGRecord(NamedTuple):
+    true_track: Optional[float]
+    magnetic_track: Optional[float]
+    speed_knots: Optional[float]
+    speed_kilometers: Optional[float]
+    checksum: Optional[int]
+
+
+class GSARecord(NamedTuple):
+    mode_1: str
+    mode_2: Optional[int]
+    satellite_ids: Tuple[int, ...]
+    pdop: Optional[float]
+    hdop: Optional[float]
+    vdop: Optional[float]
+
+
+class SatelliteRecord(NamedTuple):
+    prn: Optional[int]
+    elevation: Optional[int]
+    azimuth: Optional[int]
+    snr: Optional[int]
+
+
+class GSVRecord(NamedTuple):
+    talker: str
+    total_sentences: Optional[int]
+    sentence_number: Optional[int]
+    satellites_in_view: Optional[int]
+    satellites: Tuple[SatelliteRecord, ...]
+
+
+# Converters from the fields of split_sentence: every field is converted once, straight from its text
+
+def gga_record(fields, checksum):
+    return GGARecord(_time_ms(fields[1]), _coordinate(fields[2], fields[3], 2), _coordinate(fields[4], fields[5], 3),
+                     _float(fields[9]), _int(fields[7]), _int(fields[6]))
+
+
+def rmc_record(fields, checksum):
+    variation = fields[10] if len(fields) > 10 else ""
+    variation_direction = fields[11] if len(fields) > 11 else ""
+    return RMCRecord(_time_ms(fields[1]), fields[2], _coordinate(fields[3], fields[4], 2),
+                     _coordinate(fields[5], fields[6], 3), _float(fields[7]), _float(fields[8]), _date(fields[9]),
+                     _float(variation), variation_direction or None, _checksum(checksum))
+
+
+def gll_record(fields, checksum):
+    return GLLRecord(_time_ms(fields[5]), fields[6], _coordinate(fields[1], fields[2], 2),
+                     _coordinate(fields[3], fields[4], 3), _checksum(checksum))
+
+
+def vtg_record(fields, checksum):
+    return VTGRecord(_float(fields[1]), _float(fields[3]), _float(fields[5]), _float(fields[7]), _checksum(checksum))
+
+
+def gsa_record(fields, checksum):
+    satellite_ids = tuple(_int(sat_id) for sat_id in fields[3:15] if sat_id)
+    pdop, hdop, vdop = (fields[i] if len(fields) > i else "" for i in (15, 16, 17))
+    return GSARecord(fields[1], _int(fields[2]), satellite_ids, _float(pdop), _float(hdop), _float(vdop))
+
+
+def gsv_record(fields, checksum):
+    satellite_fields = fields[4:]
+    satellites = tuple(SatelliteRecord(*(_int(value) for value in satellite_fields[i:i + 4]),
+                                       *(None,) * (4 - len(satellite_fields[i:i + 4])))
+                       for i in range(0, len(satellite_fields), 4))
+    return GSVRecord(fields[0][:2], _int(fields[1]), _int(fields[2]), _int(fields[3]), satellites)
+
+
+# Sentence type -> (record class, converter from split_sentence fields)
+RECORD_TYPES = {
+    "GGA": (GGARecord, gga_record),
+    "RMC": (RMCRecord, rmc_record),
+    "GLL": (GLLRecord, gll_record),
+    "VTG": (VTGRecord, vtg_record),
+    "GSA": (GSARecord, gsa_record),
+    "GSV": (GSVRecord, gsv_record),
+}
+
+# Storage of every record field in a RecordArray: array typecode, or None for a Python list
+FIELD_STORAGE = {
+    GGARecord: ('i', 'd', 'd', 'd', 'h', 'b'),
+    RMCRecord: ('i', None, 'd', 'd', 'd', 'd', 'date', 'd', None, 'h'),
+    GLLRecord: ('i', None, 'd', 'd', 'h'),
+    VTGRecord: ('d', 'd', 'd', 'd', 'h'),
+    GSARecord: (None, 'b', None, 'd', 'd', 'd'),
+    GSVRecord: (None, 'b', 'b', 'h', None),
+}
+
+# Stored in place of None in integer arrays (floats use NaN)
+MISSING = -1
+
+# Largest value of each integer typecode; values that do not fit (corrupt fields) are stored as MISSING
+INTEGER_LIMITS = {'b': 2 ** 7 - 1, 'h': 2 ** 15 - 1, 'i': 2 ** 31 - 1}
+
+
+def to_record(sentence_type, sentence):
+    """Typed record of one sentence of the given type. Raises ValueError or IndexError when it is malformed."""
+    return RECORD_TYPES[sentence_type][1](*split_sentence(sentence))
+
+
+def from_data(sentence_type, data):
+    """Typed record of an nmea_sentence result, for callers that only have the decoded text
+    (e.g. the ingest server's records). Coordinates keep only its 6 decimals; prefer to_record."""
+    if sentence_type == "GGA":
+        utc, lat, lon, altitude, satellites, fix_quality = data
+        return GGARecord(_formatted_time_ms(utc), _float(lat), _float(lon), _float(altitude), _int(satellites),
+                         _int(fix_quality))
+    if sentence_type == "RMC":
+        utc, status, lat, lon, speed, direction, date, variation, variation_direction, checksum = data
+        return RMCRecord(_formatted_time_ms(utc), status, _float(lat), _float(lon), _float(speed), _float(direction),
+                         _date(date), _float(variation), variation_direction or None, _checksum(checksum))
+    if sentence_type == "GLL":
+        utc, status, lat, lon, checksum = data
+        return GLLRecord(_formatted_time_ms(utc), status, _float(lat), _float(lon), _checksum(checksum))
+    if sentence_type == "GSA":
+        return GSARecord(data["Mode 1"], _int(data["Mode 2"]), tuple(_int(sat_id) for sat_id in data["Satellite IDs"]),
+                         _float(data["PDOP"]), _float(data["HDOP"]), _float(data["VDOP"]))
+    if sentence_type == "VTG":
+        true_track, magnetic_track, speed_knots, speed_kilometers, checksum = data
+        return VTGRecord(_float(true_track), _float(magnetic_track), _float(speed_knots), _float(speed_kilometers),
+                         _checksum(checksum))
+    return gsv_record(data[:-1], data[-1])  # GSV results are the split fields and the checksum
+
+
+class RecordArray:
+    """Many records of one type stored as parallel columns: numbers in compact typed arrays
+    (array module), text and nested values in lists. Indexing rebuilds the record."""
+
+    def __init__(self, record_type):
+        self.record_type = record_type
+        self._storage = FIELD_STORAGE[record_type]
+        self.columns = [list() if code is None else array.array('i' if code == 'date' else code)
+                        for code in self._storage]
+
+    def append(self, record):
+        for column, code, value in zip(self.columns, self._storage, record):
+            if code is None:
+                column.append(value)
+            elif code == 'd':
+                column.append(math.nan if value is None else value)
+            elif code == 'date':
+                column.append(MISSING if value is None else value.toordinal())
+            else:
+                limit = INTEGER_LIMITS[code]
+                column.append(MISSING if value is None or not -limit <= value <= limit else value)
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def __getitem__(self, index):
+        values = []
+        for column, code in zip(self.columns, self._storage):
+            value = column[index]
+            if code == 'd':
+                value = None if math.isnan(value) else value
+            elif code == 'date':
+                value = None if value == MISSING else datetime.date.fromordinal(value)
+            elif code is not None and value == MISSING:
+                value = None
+            values.append(value)
+        return self.record_type(*values)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def column(self, name):
+        """Raw storage of one field (array or list), e.g. column('latitude')"""
+        return self.columns[self.record_type._fields.index(name)]
+
+    def nbytes(self):
+        """Memory of the typed array columns (list columns not included)"""
+        return sum(column.itemsize * len(column) for column in self.columns if isinstance(column, array.array))
+
+
+def iter_typed_records(sentences, types=None, verbose=False, checksum="warn", where=None):
+    """Like nmea_parser.iter_records, but yields (type, typed record) converted straight from the
+    sentence fields, without going through the decoders' formatted text"""
+    wanted = RECORD_TYPES.keys() if types is None else set(types)
+    if where:
+        sentences = where.select(sentences, wanted)
+    validator = checksum if isinstance(checksum, ChecksumValidator) else ChecksumValidator(checksum, verbose)
+    for sentence in sentences:
+        stype = nmea_parser.sentence_type(sentence)
+        if stype not in wanted or not validator.check(sentence, stype):
+            continue
+        try:
+            record = to_record(stype, sentence)
+        except (ValueError, IndexError) as e:
+            if verbose:
+                print(f"Error processing {stype} sentence: {e}")
+            continue
+        yield stype, record
+
+
+def load_file(filename, types=None, verbose=False, checksum="warn"):
+    """Reads an NMEA file once into {type: RecordArray}"""
+    tables = {stype: RecordArray(RECORD_TYPES[stype][0])
+              for stype in (nmea_parser.DECODERS.keys() if types is None else types)}
+    for stype, record in iter_typed_records(read_nmea_data(filename), types, verbose, checksum):
+        tables[stype].append(record)
+    return tables
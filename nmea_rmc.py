@@ -1,19 +1,10 @@
 import csv
+import sys
 
+from nmea_checksum import ChecksumError, ChecksumValidator, checksum_mode
+from nmea_columns import checksum_field, degrees_field, field, optional_field, time_field
+from nmea_io import CsvOutput, read_nmea_data
 
-def read_nmea_data(filename):
-    """Reads NMEA data from txt file and returns as list"""
-    sentences = []
-    try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            for line in file:
-                line = line.strip()  
-                if line: 
-                    sentences.append(line)
-    except FileNotFoundError:
-        print(f"File not found: {filename}")
-        return []
-    return sentences
 
 components = [
     "NMEA Sentence",        # Index 0: GPRMC
@@ -31,7 +22,10 @@ components = [
     "Checksum"             # Index 12: Checksum
 ]
 
-def nmea_sentence(sentence):
+def nmea_sentence(sentence, verbose=False, profile=None, columns=None):
+    """Parses a single RMC sentence. Set verbose=True to print every component (debug mode).
+    profile is an optional nmea_profile.StageProfile timing the decoding stages.
+    columns is an optional list of CSV_HEADER names: only those fields are converted and returned, in that order"""
     if not sentence.startswith('$'):
         raise ValueError('NMEA sentence must start with "$"')
     sentence = sentence[1:]  # Remove the leading '$'
@@ -44,9 +38,14 @@ def nmea_sentence(sentence):
         checksum = ""
     
     split_sentence = sentence_part.split(',')
+    if profile is not None:
+        profile.lap("split", "RMC")
     if not split_sentence[0].endswith("RMC"):
-        print("This is not a RMC sentence, skipping.")
+        if verbose:
+            print("This is not a RMC sentence, skipping.")
         return None
+    if columns is not None:
+        return [COLUMNS[column](split_sentence, checksum) for column in columns]
     
     utc_time = split_sentence[1]  # UTC time
     status = split_sentence[2]  # A=active, V=void
@@ -79,6 +78,9 @@ def nmea_sentence(sentence):
     split_sentence[3] = lat_degrees_formatted
     split_sentence[5] = lon_degrees_formatted
 
+    if profile is not None:
+        profile.lap("coordinates", "RMC")
+
     if '.' in utc_time:
         time_parts = utc_time.split('.')
         time_base = time_parts[0]
@@ -91,43 +93,81 @@ def nmea_sentence(sentence):
         utc_time_formatted = f"{utc_time[:2]}:{utc_time[2:4]}:{utc_time[4:]}" if len(utc_time) >= 6 else utc_time
 
     split_sentence[1] = utc_time_formatted
+    if profile is not None:
+        profile.lap("time", "RMC")
 
     split_sentence.append(checksum)
 
-    print("RMC Sentence Components:")
-    for i in range(len(split_sentence)):
-        if i < len(components):
-            print(f" {components[i]}: {split_sentence[i]}")
-        else:
-            print(f" Index {i}: {split_sentence[i]}")
+    if verbose:
+        print("RMC Sentence Components:")
+        for i in range(len(split_sentence)):
+            if i < len(components):
+                print(f" {components[i]}: {split_sentence[i]}")
+            else:
+                print(f" Index {i}: {split_sentence[i]}")
+        if profile is not None:
+            profile.lap("print", "RMC")
 
     return [utc_time_formatted, status, lat_degrees_formatted, lon_degrees_formatted, speed, direction, date, magnetic_variation, variation_direction, checksum]
 
-nmea_sentences = read_nmea_data("data.txt")
-
-all_data = []
-rmc_sentence_count = 0
-
-for sentence in nmea_sentences:
-    try:
-        if sentence.startswith('$') and sentence[1:].split(',')[0].endswith("RMC"):
-            rmc_sentence_count += 1
-            print(f"\n--- NMEA RMC Sentence {rmc_sentence_count} ---")
-
-        data = nmea_sentence(sentence)
-        if data:
-            all_data.append(data)
-    except ValueError as e:
-        print(f"Error processing sentence: {e}")
-
-# CSV'ye kaydet
-if all_data:
-    csv_file = "nmea_rmc_output.csv"
+CSV_FILE = "nmea_rmc_output.csv"
+CSV_HEADER = ["utc_time", "status", "latitude", "longitude", "speed", "direction", "date", "magnetic_variation", "variation_direction", "checksum"]
+
+# CSV column -> its value from the split sentence and checksum, for column projection (nmea_sentence columns=...)
+COLUMNS = {
+    "utc_time": time_field(1),
+    "status": field(2),
+    "latitude": degrees_field(3, 2),
+    "longitude": degrees_field(5, 3),
+    "speed": field(7),
+    "direction": field(8),
+    "date": field(9),
+    "magnetic_variation": optional_field(10),
+    "variation_direction": optional_field(11),
+    "checksum": checksum_field,
+}
+
+def write_csv(all_data, csv_file=CSV_FILE):
+    """Writes parsed RMC rows to a CSV file"""
     with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
         writer = csv.writer(file)
-        writer.writerow(["utc_time", "status", "latitude", "longitude", "speed", "direction", "date", "magnetic_variation", "variation_direction", "checksum"])
+        writer.writerow(CSV_HEADER)
         writer.writerows(all_data)
-    print(f"\n{len(all_data)} rows of RMC data saved to '{csv_file}'.")
-else:
-    print("No valid RMC data found to save.")
 
+def main(verbose=False, checksum="warn"):
+    validator = ChecksumValidator(checksum, verbose)
+    rmc_sentence_count = 0
+
+    # Rows are written as they are parsed, the input is read one line at a time
+    with CsvOutput(CSV_FILE, CSV_HEADER) as output:
+        for sentence in read_nmea_data("data.txt"):
+            try:
+                is_rmc = sentence.startswith('$') and sentence.split(',', 1)[0].endswith("RMC")
+                # The checksum is verified before anything is decoded or printed
+                if is_rmc and not validator.check(sentence, "RMC"):
+                    continue
+                if verbose and is_rmc:
+                    rmc_sentence_count += 1
+                    print(f"\n--- NMEA RMC Sentence {rmc_sentence_count} ---")
+
+                data = nmea_sentence(sentence, verbose)
+                if data:
+                    output.writerow(data)
+            except ChecksumError:
+                raise
+            except ValueError as e:
+                print(f"Error processing sentence: {e}")
+
+    if validator.total_corrupt():
+        print(validator.report())
+
+    if output.rows:
+        print(f"\n{output.rows} rows of RMC data saved to '{CSV_FILE}'.")
+    else:
+        print("No valid RMC data found to save.")
+
+
+if __name__ == '__main__':
+    # --verbose prints every sentence component (debug mode)
+    # --checksum=strict|warn|skip selects how corrupt sentences are handled
+    main(verbose='--verbose' in sys.argv[1:], checksum=checksum_mode(sys.argv[1:]))
@@ -0,0 +1,400 @@
+import asyncio
+import collections
+import json
+import os
+import re
+import sys
+import time
+
+import nmea_parser
+import nmea_records
+from nmea_checksum import ChecksumError, ChecksumValidator, checksum_mode
+from nmea_cli import option
+from nmea_io import CsvOutput
+from nmea_stream import READ_SIZE, SentenceAssembler
+
+
+# Records waiting for the sinks; a full queue pauses TCP readers (backpressure)
+QUEUE_SIZE = 10000
+
+# Bytes a slow socket sink client may lag behind before it is disconnected
+CLIENT_BUFFER_LIMIT = 1024 * 1024
+
+# Seconds without a datagram after which a UDP source is closed (UDP has no disconnect)
+UDP_IDLE_TIMEOUT = 60.0
+
+
+class SourceMetrics:
+    """Counters of one receiver feed"""
+
+    def __init__(self, source):
+        self.source = source
+        self.bytes = 0
+        self.sentences = 0
+        self.records = 0
+        self.dropped = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.connections = 0  # Open TCP connections of this source
+        self.last_seen = time.time()
+
+    def as_dict(self, validator):
+        return {
+            "bytes": self.bytes,
+            "sentences": self.sentences,
+            "records": self.records,
+            "dropped": self.dropped,
+            "corrupt": validator.total_corrupt(),
+            "lag_ms": round(self.lag * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+            "connected": self.connections > 0,
+            "idle_s": round(time.time() - self.last_seen, 1),
+        }
+
+
+def _safe_name(source):
+    """Directory name for a source ID such as 'tcp:10.0.0.5:40312'"""
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', source)
+
+
+class CsvSink:
+    """Per-source, per-type CSV files: <directory>/<source>/nmea_<type>_output.csv.
+    A source that reconnects under the same ID (see IngestServer.sticky_sources) appends to the files of
+    its earlier connections."""
+
+    def __init__(self, directory='.'):
+        self.directory = directory
+        self._outputs = {}
+        self._opened = set()  # (source, type) files created by this run
+
+    async def write(self, source, stype, data, received):
+        output = self._outputs.get((source, stype))
+        if output is None:
+            folder = os.path.join(self.directory, _safe_name(source))
+            os.makedirs(folder, exist_ok=True)
+            module = nmea_parser.DECODERS[stype]
+            output = self._outputs[(source, stype)] = CsvOutput(os.path.join(folder, module.CSV_FILE), module.CSV_HEADER,
+                                                                append=(source, stype) in self._opened)
+            self._opened.add((source, stype))
+        to_row = nmea_parser.CSV_ROWS.get(stype)
+        output.writerow(to_row(data) if to_row else data)
+
+    def close_source(self, source):
+        for key in [key for key in self._outputs if key[0] == source]:
+            self._outputs.pop(key).close()
+
+    def close(self):
+        for output in self._outputs.values():
+            output.close()
+        self._outputs.clear()
+
+
+class ColumnarSink:
+    """Per-source, per-type Parquet / Arrow IPC files (see nmea_columnar).
+    Columnar files cannot be appended to, so every reconnection of a source starts a numbered part file
+    (nmea_gga_output.1.parquet, ...)."""
+
+    def __init__(self, directory='.', fmt="parquet"):
+        import nmea_columnar  # Needs pyarrow, only imported when the sink is used
+        self._columnar = nmea_columnar
+        nmea_columnar.check_format(fmt)  # Fail at startup, not on the first record
+        self.directory = directory
+        self.fmt = fmt
+        self._outputs = {}
+        self._parts = collections.Counter()  # (source, type) -> files created by this run
+
+    async def write(self, source, stype, data, received):
+        output = self._outputs.get((source, stype))
+        if output is None:
+            folder = os.path.join(self.directory, _safe_name(source))
+            os.makedirs(folder, exist_ok=True)
+            filename = self._columnar.output_file(stype, self.fmt, folder)
+            part = self._parts[source, stype]
+            if part:
+                base, extension = os.path.splitext(filename)
+                filename = f"{base}.{part}{extension}"
+            self._parts[source, stype] += 1
+            output = self._outputs[(source, stype)] = self._columnar.ColumnarOutput(filename, stype, self.fmt)
+        output.write(nmea_records.from_data(stype, data))
+
+    def close_source(self, source):
+        for key in [key for key in self._outputs if key[0] == source]:
+            self._outputs.pop(key).close()
+
+    def close(self):
+        for output in self._outputs.values():
+            output.close()
+        self._outputs.clear()
+
+
+class RingBufferSink:
+    """Keeps the latest records in memory as (source, type, data, received) tuples"""
+
+    def __init__(self, size=10000):
+        self.records = collections.deque(maxlen=size)
+
+    async def write(self, source, stype, data, received):
+        self.records.append((source, stype, data, received))
+
+    def close_source(self, source):
+        pass
+
+    def close(self):
+        pass
+
+
+class SocketSink:
+    """Re-publishes records as JSON lines to every client connected to a local TCP port"""
+
+    def __init__(self, host='127.0.0.1', port=10111):
+        self.host = host
+        self.port = port
+        self._clients = set()
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._accept, self.host, self.port)
+
+    async def _accept(self, reader, writer):
+        self._clients.add(writer)
+
+    async def write(self, source, stype, data, received):
+        if not self._clients:
+            return
+        line = (json.dumps({"source": source, "type": stype, "data": data, "received": received}) + "\n").encode()
+        for writer in list(self._clients):
+            if writer.is_closing() or writer.transport.get_write_buffer_size() > CLIENT_BUFFER_LIMIT:
+                # A slow consumer must not hold back the receivers
+                self._clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(line)
+
+    def close_source(self, source):
+        pass
+
+    def close(self):
+        for writer in self._clients:
+            writer.close()
+        self._clients.clear()
+        if self._server is not None:
+            self._server.close()
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        source = self.server.source_id('udp', addr)
+        try:
+            self.server.feed(source, data if data.endswith(b'\n') else data + b'\n', block=False)
+        except ChecksumError as e:
+            # Strict mode: the datagram is dropped, the endpoint keeps serving
+            print(f"{source}: {e}")
+
+
+class IngestServer:
+    """Accepts many TCP and UDP NMEA feeds on one event loop, tags every decoded record
+    with its source ID and fans the records out to the sinks.
+
+    The source ID is the protocol and peer address ('tcp:10.0.0.5:40312'), so receivers behind one
+    NAT stay apart. With sticky_sources it is the peer host only ('tcp:10.0.0.5'): a receiver that
+    reconnects from a new port then keeps its ID and output files. A source's state (metrics, checksum
+    counts, open sink files) is released when its last TCP connection ends, or after UDP_IDLE_TIMEOUT
+    without datagrams.
+
+    TCP feeds are paused while the record queue is full; UDP has no flow control,
+    so records arriving at a full queue are dropped and counted per source."""
+
+    def __init__(self, sinks, host='0.0.0.0', tcp_port=None, udp_port=None, types=None, checksum="warn",
+                 queue_size=QUEUE_SIZE, sticky_sources=False):
+        self.sinks = sinks
+        self.host = host
+        self.tcp_port = tcp_port
+        self.udp_port = udp_port
+        self.types = types
+        self.checksum = checksum
+        self.sticky_sources = sticky_sources
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.sources = {}
+        self._assemblers = {}  # UDP sources only; every TCP connection has its own
+        self._validators = {}
+        self._started = time.time()
+        self._dispatched = 0
+        self._servers = []
+        self._tasks = []
+
+    def source_id(self, protocol, peer):
+        """'udp:10.0.0.5:40312', or 'udp:10.0.0.5' with sticky_sources"""
+        if self.sticky_sources:
+            return f"{protocol}:{peer[0]}"
+        return f"{protocol}:{peer[0]}:{peer[1]}"
+
+    def _source(self, source):
+        metrics = self.sources.get(source)
+        if metrics is None:
+            metrics = self.sources[source] = SourceMetrics(source)
+            self._validators[source] = ChecksumValidator(self.checksum)
+        return metrics
+
+    def feed(self, source, chunk, block=True, assembler=None):
+        """Decodes a byte chunk of one source (split into sentences by assembler, by default the
+        source's own). Returns the records to enqueue when block is True, otherwise enqueues
+        them right away, dropping what does not fit."""
+        metrics = self._source(source)
+        metrics.bytes += len(chunk)
+        metrics.last_seen = time.time()
+        if assembler is None:
+            assembler = self._assemblers.get(source)
+            if assembler is None:
+                assembler = self._assemblers[source] = SentenceAssembler()
+        sentences = assembler.feed(chunk)
+        metrics.sentences += len(sentences)
+        received = time.time()
+        records = [(source, stype, data, received)
+                   for stype, data in nmea_parser.iter_records(sentences, self.types, checksum=self._validators[source])]
+        if block:
+            return records
+        for record in records:
+            try:
+                self.queue.put_nowait(record)
+            except asyncio.QueueFull:
+                metrics.dropped += 1
+        return []
+
+    async def _handle_tcp(self, reader, writer):
+        peer = writer.get_extra_info('peername')
+        source = self.source_id('tcp', peer)
+        metrics = self._source(source)
+        metrics.connections += 1
+        # A partial line of one connection must not be joined with the data of another
+        assembler = SentenceAssembler()
+        try:
+            while True:
+                chunk = await reader.read(READ_SIZE)
+                if not chunk:
+                    break
+                for record in self.feed(source, chunk, assembler=assembler):
+                    await self.queue.put(record)  # Waits (and stops reading) while the sinks are behind
+        except ConnectionError:
+            pass
+        except ChecksumError as e:
+            # Strict mode: a corrupt sentence ends this feed, not the server
+            print(f"{source}: {e}")
+        finally:
+            metrics.connections -= 1
+            writer.close()
+            if metrics.connections == 0:
+                await self.queue.put((source, None, None, time.time()))
+
+    def _release(self, source):
+        """Closes the sink files of a source and forgets its state (after its queued records were written)"""
+        metrics = self.sources.get(source)
+        if metrics is None or metrics.connections > 0 or (source.startswith('udp:') and
+                                                          time.time() - metrics.last_seen < UDP_IDLE_TIMEOUT):
+            return  # Reconnected (or sent data again) in the meantime
+        for sink in self.sinks:
+            try:
+                sink.close_source(source)
+            except Exception as e:
+                print(f"{type(sink).__name__} failed to close {source}: {e}")
+        del self.sources[source]
+        del self._validators[source]
+        self._assemblers.pop(source, None)
+
+    async def _expire_udp(self):
+        while True:
+            await asyncio.sleep(UDP_IDLE_TIMEOUT / 2)
+            now = time.time()
+            for source, metrics in list(self.sources.items()):
+                if source.startswith('udp:') and now - metrics.last_seen >= UDP_IDLE_TIMEOUT:
+                    await self.queue.put((source, None, None, now))
+
+    async def _dispatch(self):
+        while True:
+            source, stype, data, received = await self.queue.get()
+            try:
+                if stype is None:
+                    # End of a source, queued behind its last records
+                    self._release(source)
+                    continue
+                for sink in self.sinks:
+                    try:
+                        await sink.write(source, stype, data, received)
+                    except Exception as e:
+                        # One failing record or sink must not stop the consumer: the queue would fill
+                        # up and block every TCP reader
+                        print(f"{type(sink).__name__} failed on a {stype} record of {source}: {e}")
+                metrics = self.sources.get(source)
+                if metrics is not None:
+                    metrics.records += 1
+                    metrics.lag = time.time() - received
+                    metrics.max_lag = max(metrics.max_lag, metrics.lag)
+                self._dispatched += 1
+            finally:
+                self.queue.task_done()
+
+    async def start(self):
+        for sink in self.sinks:
+            if hasattr(sink, 'start'):
+                await sink.start()
+        if self.tcp_port is not None:
+            self._servers.append(await asyncio.start_server(self._handle_tcp, self.host, self.tcp_port))
+        if self.udp_port is not None:
+            loop = asyncio.get_running_loop()
+            transport, _ = await loop.create_datagram_endpoint(lambda: _UdpProtocol(self),
+                                                               local_addr=(self.host, self.udp_port))
+            self._servers.append(transport)
+            self._tasks.append(asyncio.create_task(self._expire_udp()))
+        self._tasks.append(asyncio.create_task(self._dispatch()))
+
+    async def stop(self):
+        """Stops accepting data, drains the queue and closes the sinks"""
+        for server in self._servers:
+            server.close()
+        await self.queue.join()
+        for task in self._tasks:
+            task.cancel()
+        for sink in self.sinks:
+            sink.close()
+
+    def metrics(self):
+        """Throughput and per-source counters/lag as a dict"""
+        elapsed = max(time.time() - self._started, 1e-9)
+        return {
+            "records": self._dispatched,
+            "records_per_s": round(self._dispatched / elapsed, 1),
+            "queued": self.queue.qsize(),
+            "sources": {source: metrics.as_dict(self._validators[source]) for source, metrics in self.sources.items()},
+        }
+
+
+async def serve():
+    # Usage: nmea_server.py [--tcp=10110] [--udp=10110] [--out=received] [--format=csv|parquet|arrow]
+    #        [--sink-port=10111] [--checksum=strict|warn|skip] [--source-by-host]
+    out = option('out', 'received')
+    fmt = option('format', 'csv')
+    sinks = [CsvSink(out) if fmt == 'csv' else ColumnarSink(out, fmt)]
+    if option('sink-port'):
+        sinks.append(SocketSink(port=int(option('sink-port'))))
+
+    tcp_port = option('tcp', '10110')
+    udp_port = option('udp')
+    server = IngestServer(sinks, tcp_port=int(tcp_port), udp_port=int(udp_port) if udp_port else None,
+                          checksum=checksum_mode(sys.argv[1:]), sticky_sources='--source-by-host' in sys.argv[1:])
+    await server.start()
+    print(f"Listening on TCP {tcp_port}" + (f" and UDP {udp_port}" if udp_port else ""))
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(json.dumps(server.metrics()))
+    finally:
+        await server.stop()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
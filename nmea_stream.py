@@ -0,0 +1,166 @@
+import os
+import socket
+import sys
+import time
+from urllib.parse import parse_qs, urlparse
+
+import nmea_parser
+from nmea_checksum import ChecksumValidator, checksum_mode
+
+try:
+    import serial  # pyserial, optional: used for serial ports when installed
+except ImportError:
+    serial = None
+
+try:
+    import termios
+    import tty
+except ImportError:  # Not available on Windows
+    termios = None
+
+
+# Standard NMEA sentences are at most 82 characters; longer runs without a newline are noise
+MAX_SENTENCE = 1024
+
+READ_SIZE = 4096
+
+
+class SentenceAssembler:
+    """Reassembles NMEA sentences from arbitrary byte chunks (partial reads, several sentences per read)"""
+
+    def __init__(self, max_sentence=MAX_SENTENCE):
+        self.max_sentence = max_sentence
+        self._buffer = b''
+
+    def feed(self, chunk):
+        """Returns the sentences completed by this chunk"""
+        data = self._buffer + chunk
+        lines = data.split(b'\n')
+        self._buffer = lines.pop()
+        if len(self._buffer) > self.max_sentence:
+            # Keep only a plausible sentence tail after the last sentence start
+            start = self._buffer.rfind(b'$')
+            tail = self._buffer[start:] if start != -1 else b''
+            self._buffer = tail if len(tail) <= self.max_sentence else b''
+
+        sentences = []
+        for line in lines:
+            # Skip anything received before the sentence start (line noise, a half sentence on connect)
+            start = line.find(b'$')
+            if start == -1:
+                continue
+            sentence = line[start:].strip().decode('ascii', errors='replace')
+            if sentence:
+                sentences.append(sentence)
+        return sentences
+
+
+def termios_speed(baudrate):
+    """termios speed constant of a baud rate; ValueError listing the supported rates for any other"""
+    speed = getattr(termios, f"B{baudrate}", None)
+    if speed is None:
+        # B0 is not a speed: it hangs the line up
+        rates = sorted(int(name[1:]) for name in dir(termios) if name.startswith('B') and name[1:].isdigit() and name != 'B0')
+        raise ValueError(f"Unsupported baud rate: {baudrate} (supported: {', '.join(map(str, rates))})")
+    return speed
+
+
+def serial_chunks(device, baudrate=4800):
+    """Yields byte chunks from a serial device (or a pty) as soon as they arrive"""
+    if serial is not None:
+        with serial.Serial(device, baudrate, timeout=1) as port:
+            while True:
+                chunk = port.read(port.in_waiting or 1)
+                if chunk:
+                    yield chunk
+        return
+
+    speed = termios_speed(baudrate) if termios is not None else None
+    fd = os.open(device, os.O_RDONLY | os.O_NOCTTY)
+    try:
+        if termios is not None and os.isatty(fd):
+            tty.setraw(fd)
+            attributes = termios.tcgetattr(fd)
+            attributes[4] = attributes[5] = speed  # Input and output speed
+            termios.tcsetattr(fd, termios.TCSANOW, attributes)
+        while True:
+            try:
+                chunk = os.read(fd, READ_SIZE)
+            except OSError:  # pty closed by the other side
+                return
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        os.close(fd)
+
+
+def tcp_chunks(host, port):
+    """Yields byte chunks from a TCP NMEA server until it closes the connection"""
+    with socket.create_connection((host, port)) as connection:
+        # Small sentences must not wait for Nagle / delayed ACK
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        while True:
+            chunk = connection.recv(READ_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def udp_chunks(host, port):
+    """Yields UDP datagrams received on host:port (each datagram holds one or more sentences)"""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        while True:
+            datagram, _ = sock.recvfrom(65535)
+            # Sentences may arrive without a trailing newline, one per datagram
+            yield datagram if datagram.endswith(b'\n') else datagram + b'\n'
+
+
+def open_source(url):
+    """Byte chunk iterator for a source URL:
+    serial:///dev/ttyUSB0?baud=4800, tcp://host:port or udp://host:port (udp://:10110 listens on all interfaces)"""
+    parsed = urlparse(url)
+    if parsed.scheme == 'serial':
+        baudrate = int(parse_qs(parsed.query).get('baud', ['4800'])[0])
+        return serial_chunks(parsed.path, baudrate)
+    if parsed.scheme == 'tcp':
+        return tcp_chunks(parsed.hostname, parsed.port)
+    if parsed.scheme == 'udp':
+        return udp_chunks(parsed.hostname or '0.0.0.0', parsed.port)
+    raise ValueError(f"Unknown source: {url} (expected serial://, tcp:// or udp://)")
+
+
+def iter_sentences(chunks):
+    """Yields complete sentences from a byte chunk iterator, each one as soon as its newline arrives"""
+    assembler = SentenceAssembler()
+    for chunk in chunks:
+        yield from assembler.feed(chunk)
+
+
+def stream_records(source, types=None, verbose=False, checksum="warn"):
+    """Decodes a live source (URL or byte chunk iterator) and yields (type, result) per sentence"""
+    chunks = open_source(source) if isinstance(source, str) else source
+    return nmea_parser.iter_records(iter_sentences(chunks), types, verbose, checksum)
+
+
+def main():
+    # Usage: nmea_stream.py tcp://host:port|udp://host:port|serial:///dev/ttyUSB0?baud=4800 [--verbose]
+    #        [--checksum=strict|warn|skip]
+    sources = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if not sources:
+        print("Usage: nmea_stream.py <tcp://host:port | udp://host:port | serial:///dev/ttyUSB0?baud=4800>")
+        return
+    validator = ChecksumValidator(checksum_mode(sys.argv[1:]))
+    try:
+        for stype, data in stream_records(sources[0], verbose='--verbose' in sys.argv[1:], checksum=validator):
+            print(f"{time.strftime('%H:%M:%S')} {stype}: {data}")
+    except KeyboardInterrupt:
+        pass
+    if validator.total_corrupt():
+        print(validator.report())
+
+
+if __name__ == '__main__':
+    main()
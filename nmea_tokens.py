@@ -0,0 +1,136 @@
+import mmap
+
+import numpy as np
+
+from nmea_io import COMPRESSED_OPENERS, open_nmea
+
+
+COMMA, STAR, NEWLINE, RETURN, DOLLAR = (ord(c) for c in ',*\n\r$')
+
+
+class Tokens:
+    """Field offsets of every line in a byte buffer, found with one vectorized scan for ',', '*', CR and LF.
+
+    The buffer (bytes, mmap or memoryview) is shared, not copied: fields stay byte ranges until a
+    decoder asks for them as text or numbers. Field 0 is the address ('$GPGGA'), the field after
+    the last ',' ends at '*' and the checksum digits follow as one more field."""
+
+    def __init__(self, data):
+        if isinstance(data, (list, tuple)):
+            data = ('\n'.join(data) + '\n').encode('ascii', 'replace')
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        if len(buffer) and buffer[-1] != NEWLINE:
+            buffer = np.append(buffer, np.uint8(NEWLINE))  # Copies, but only a block without a final newline
+        self.buffer = buffer
+
+        is_separator = buffer == COMMA
+        is_separator |= buffer == STAR
+        is_separator |= buffer == NEWLINE
+        is_separator |= buffer == RETURN
+        self.separators = np.flatnonzero(is_separator)
+        newlines = np.flatnonzero(buffer[self.separators] == NEWLINE)
+
+        # Per line: index of its first separator, field count, first and newline byte offsets
+        self.first = np.concatenate(([0], newlines[:-1] + 1)) if len(newlines) else newlines
+        self.count = newlines - self.first + 1
+        self.line_starts = np.concatenate(([0], self.separators[newlines[:-1]] + 1)) if len(newlines) else newlines
+        self.line_ends = self.separators[newlines]
+        self._types = None
+
+    def __len__(self):
+        return len(self.first)
+
+    def types(self):
+        """Sentence type of every line as a bytes array (b'GGA'; b'' for lines that are not '$xxTTT,' sentences)"""
+        if self._types is None:
+            address_end = self.separators[self.first] if len(self) else self.first
+            valid = (address_end - self.line_starts >= 6) & (self.buffer[self.line_starts] == DOLLAR)
+            codes = self.buffer[np.maximum(address_end[:, None] - np.arange(3, 0, -1), 0)]
+            types = np.ascontiguousarray(codes).view('S3').ravel()
+            self._types = np.where(valid, types, b'')
+        return self._types
+
+    def select(self, sentence_type, min_fields=0):
+        """Boolean mask of the lines of one sentence type with at least min_fields fields"""
+        return (self.types() == sentence_type.encode('ascii')) & (self.count >= min_fields)
+
+    def bounds(self, line, field):
+        """Start and end byte offsets of one field of one line"""
+        end = int(self.separators[self.first[line] + field])
+        if field == 0:
+            return int(self.line_starts[line]), end
+        return int(self.separators[self.first[line] + field - 1]) + 1, end
+
+    def field(self, line, field):
+        """One field as a zero-copy memoryview of the buffer"""
+        start, end = self.bounds(line, field)
+        return memoryview(self.buffer)[start:end]
+
+    def text(self, line, field):
+        return bytes(self.field(line, field)).decode('ascii', errors='replace')
+
+    def number(self, line, field):
+        """One field as a float, or None when it is empty or not a number"""
+        try:
+            return float(self.field(line, field)) if self.count[line] > field else None
+        except ValueError:
+            return None
+
+    def sentence(self, line):
+        """Whole line as text (without CR LF)"""
+        start, end = int(self.line_starts[line]), int(self.line_ends[line])
+        return bytes(memoryview(self.buffer)[start:end]).decode('ascii', errors='replace').rstrip('\r')
+
+
+def map_file(filename):
+    """Read-only memory map of a plain file, or None for compressed and empty files"""
+    with open(filename, 'rb') as file:
+        magic = file.read(6)
+        if not magic or any(magic.startswith(signature) for signature, _ in COMPRESSED_OPENERS):
+            return None
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def iter_tokens(filename, block_size=1024 * 1024):
+    """Yields Tokens for consecutive blocks of about block_size bytes, cut after a newline.
+
+    Plain files are memory-mapped and every block is a view of the mapping, so no line is copied;
+    compressed files are decompressed block by block."""
+    mapped = map_file(filename)
+    if mapped is None:
+        yield from _iter_compressed_tokens(filename, block_size)
+        return
+    try:
+        size = len(mapped)
+        start = 0
+        while start < size:
+            end = min(start + block_size, size)
+            if end < size:
+                cut = mapped.rfind(b'\n', start, end)
+                if cut == -1:  # A line longer than the block
+                    cut = mapped.find(b'\n', end)
+                end = size if cut == -1 else cut + 1
+            yield Tokens(memoryview(mapped)[start:end])
+            start = end
+    finally:
+        try:
+            mapped.close()
+        except BufferError:
+            pass  # A consumer still holds a view; the mapping is closed when it is released
+
+
+def _iter_compressed_tokens(filename, block_size):
+    with open_nmea(filename, binary=True) as file:
+        remainder = b''
+        while True:
+            chunk = file.read(block_size)
+            if not chunk:
+                break
+            cut = chunk.rfind(b'\n') + 1
+            if cut == 0:
+                remainder += chunk
+                continue
+            yield Tokens(remainder + chunk[:cut])
+            remainder = chunk[cut:]
+        if remainder:
+            yield Tokens(remainder)
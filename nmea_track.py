@@ -0,0 +1,77 @@
+import heapq
+
+import numpy as np
+
+
+# Upper bounds keeping the drawn map small whatever the track length
+MAX_TRACK_POINTS = 5000
+MAX_MARKERS = 300
+
+EARTH_RADIUS = 6371000.0
+
+
+def to_meters(coordinates):
+    """Projects [[lat, lon], ...] to x/y meters (equirectangular around the mean latitude).
+    Accurate enough for distances within a track."""
+    points = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+    lat = np.radians(points[:, 0])
+    lon = np.radians(points[:, 1])
+    x = lon * np.cos(lat.mean()) * EARTH_RADIUS if len(points) else lon
+    y = lat * EARTH_RADIUS
+    return np.column_stack([x, y])
+
+
+def _segment_error(xy, start, end):
+    """Index and distance (m) of the point between start and end farthest from the start-end chord"""
+    points = xy[start + 1:end]
+    chord = xy[end] - xy[start]
+    offsets = points - xy[start]
+    length = np.hypot(chord[0], chord[1])
+    if length == 0:
+        distances = np.hypot(offsets[:, 0], offsets[:, 1])
+    else:
+        distances = np.abs(chord[0] * offsets[:, 1] - chord[1] * offsets[:, 0]) / length
+    farthest = int(np.argmax(distances))
+    return start + 1 + farthest, float(distances[farthest])
+
+
+def simplify_indices(coordinates, tolerance=0.0, max_points=MAX_TRACK_POINTS):
+    """Douglas-Peucker simplification; returns the indices of the kept points in track order.
+
+    Segments are split in order of largest error first, so the result stops either when no point
+    is farther than tolerance (meters) from the simplified line or when max_points are kept.
+    Every split scans its whole segment (one vectorized pass in _segment_error), so the work is
+    O(n log n) for typical tracks and O(n^2) in the worst case, when each split peels off a single point."""
+    count = len(coordinates)
+    if count <= 2 or (max_points is not None and count <= max_points and tolerance <= 0):
+        return np.arange(count)
+    xy = to_meters(coordinates)
+    max_points = max(2, count if max_points is None else max_points)
+
+    kept = [0, count - 1]
+    heap = []  # (-error, start, end, split index)
+    if count > 2:
+        split, error = _segment_error(xy, 0, count - 1)
+        heap.append((-error, 0, count - 1, split))
+    while heap and len(kept) < max_points:
+        negative_error, start, end, split = heapq.heappop(heap)
+        if -negative_error <= tolerance:
+            break
+        kept.append(split)
+        for segment_start, segment_end in ((start, split), (split, end)):
+            if segment_end - segment_start > 1:
+                sub_split, error = _segment_error(xy, segment_start, segment_end)
+                heapq.heappush(heap, (-error, segment_start, segment_end, sub_split))
+    return np.sort(np.array(kept))
+
+
+def simplify_track(coordinates, tolerance=0.0, max_points=MAX_TRACK_POINTS):
+    """Simplified [[lat, lon], ...] track (see simplify_indices)"""
+    return [coordinates[i] for i in simplify_indices(coordinates, tolerance, max_points)]
+
+
+def sample_indices(count, max_samples=MAX_MARKERS):
+    """At most max_samples evenly spread indices of count items, first and last included"""
+    if count <= max_samples:
+        return np.arange(count)
+    return np.unique(np.linspace(0, count - 1, max_samples).round().astype(int))
@@ -1,19 +1,10 @@
 import csv
+import sys
 
+from nmea_checksum import ChecksumError, ChecksumValidator, checksum_mode
+from nmea_columns import checksum_field, field
+from nmea_io import CsvOutput, read_nmea_data
 
-def read_nmea_data(filename):
-    """Reads NMEA data from txt file and returns as list"""
-    sentences = []
-    try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            for line in file:
-                line = line.strip()  
-                if line: 
-                    sentences.append(line)
-    except FileNotFoundError:
-        print(f"File not found: {filename}")
-        return []
-    return sentences
 
 components = [
     "VTG Sentence",        # Index 0: GPVTG
@@ -28,7 +19,10 @@ components = [
     "Checksum"              # Index 9: Checksum
 ]
 
-def nmea_sentence(sentence):
+def nmea_sentence(sentence, verbose=False, profile=None, columns=None):
+    """Parses a single VTG sentence. Set verbose=True to print every component (debug mode).
+    profile is an optional nmea_profile.StageProfile timing the decoding stages.
+    columns is an optional list of CSV_HEADER names: only those fields are converted and returned, in that order"""
     if not sentence.startswith('$'):
         raise ValueError("NMEA sentence must start with '$'")
     sentence = sentence[1:]  # Remove the leading '$'
@@ -41,9 +35,14 @@ def nmea_sentence(sentence):
         checksum = ""
 
     split_sentence = sentence_part.split(',')
+    if profile is not None:
+        profile.lap("split", "VTG")
     if not split_sentence[0].endswith("VTG"):
-        print("This is not a VTG sentence, skipping.")
+        if verbose:
+            print("This is not a VTG sentence, skipping.")
         return None
+    if columns is not None:
+        return [COLUMNS[column](split_sentence, checksum) for column in columns]
     
     true_track = split_sentence[1]  # True track angle in degrees
     true_track_indicator = split_sentence[2]  # True track direction indicator
@@ -56,36 +55,69 @@ def nmea_sentence(sentence):
 
     split_sentence.append(checksum)  # Append checksum to the end of the split sentence
 
-    print("VTG Sentence Components:")
-    for i in range(len(split_sentence)):
-        component_name = components[i] if i < len(components) else f"Field {i}"
-        print(f" {component_name}: {split_sentence[i]}")
+    if verbose:
+        print("VTG Sentence Components:")
+        for i in range(len(split_sentence)):
+            component_name = components[i] if i < len(components) else f"Field {i}"
+            print(f" {component_name}: {split_sentence[i]}")
+        if profile is not None:
+            profile.lap("print", "VTG")
 
     return [true_track, magnetic_track, speed_knots, speed_kilometers, checksum]
 
-nmea_sentences = read_nmea_data("data.txt")
+CSV_FILE = "nmea_vtg_output.csv"
+CSV_HEADER = ["true_track", "magnetic_track", "speed_knots", "speed_kilometers", "checksum"]
 
-all_data = []
-vtg_sentence_count = 0
+# CSV column -> its value from the split sentence and checksum, for column projection (nmea_sentence columns=...)
+COLUMNS = {
+    "true_track": field(1),
+    "magnetic_track": field(3),
+    "speed_knots": field(5),
+    "speed_kilometers": field(7),
+    "checksum": checksum_field,
+}
 
-for sentence in nmea_sentences:
-    try:
-        if sentence.startswith('$') and sentence[1:].split(',')[0].endswith("VTG"):
-            vtg_sentence_count += 1
-            print(f"\n--- NMEA VTG Sentence {vtg_sentence_count} ---")
-
-        data = nmea_sentence(sentence)
-        if data:
-            all_data.append(data)
-    except ValueError as e:
-        print(f"Error processing sentence: {e}")
-
-if all_data:
-    csv_file = "nmea_vtg_output.csv"
+def write_csv(all_data, csv_file=CSV_FILE):
+    """Writes parsed VTG rows to a CSV file"""
     with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
         writer = csv.writer(file)
-        writer.writerow(["true_track", "magnetic_track", "speed_knots", "speed_kilometers", "checksum"])
+        writer.writerow(CSV_HEADER)
         writer.writerows(all_data)
-    print(f"\n{len(all_data)} rows of VTG data saved to '{csv_file}'.")
-else:
-    print("No valid VTG data found to save.")
+
+def main(verbose=False, checksum="warn"):
+    validator = ChecksumValidator(checksum, verbose)
+    vtg_sentence_count = 0
+
+    # Rows are written as they are parsed, the input is read one line at a time
+    with CsvOutput(CSV_FILE, CSV_HEADER) as output:
+        for sentence in read_nmea_data("data.txt"):
+            try:
+                is_vtg = sentence.startswith('$') and sentence.split(',', 1)[0].endswith("VTG")
+                # The checksum is verified before anything is decoded or printed
+                if is_vtg and not validator.check(sentence, "VTG"):
+                    continue
+                if verbose and is_vtg:
+                    vtg_sentence_count += 1
+                    print(f"\n--- NMEA VTG Sentence {vtg_sentence_count} ---")
+
+                data = nmea_sentence(sentence, verbose)
+                if data:
+                    output.writerow(data)
+            except ChecksumError:
+                raise
+            except ValueError as e:
+                print(f"Error processing sentence: {e}")
+
+    if validator.total_corrupt():
+        print(validator.report())
+
+    if output.rows:
+        print(f"\n{output.rows} rows of VTG data saved to '{CSV_FILE}'.")
+    else:
+        print("No valid VTG data found to save.")
+
+
+if __name__ == '__main__':
+    # --verbose prints every sentence component (debug mode)
+    # --checksum=strict|warn|skip selects how corrupt sentences are handled
+    main(verbose='--verbose' in sys.argv[1:], checksum=checksum_mode(sys.argv[1:]))
@@ -0,0 +1,35 @@
+import pytest
+
+import nmea_columnar
+from nmea_generator import nmea_line
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def write_log(path, bodies):
+    path.write_text(''.join(nmea_line(body) + '\n' for body in bodies))
+    return str(path)
+
+
+def test_out_of_range_integers_are_written_as_null(tmp_path):
+    filename = write_log(tmp_path / "log.nmea", [
+        "GPGGA,170141.751,3959.1660,N,03250.4580,E,300,12,1.1,850.0,M,36.0,M,,",
+        "GPGGA,170142.751,3959.1670,N,03250.4590,E,1,70000,1.1,850.0,M,36.0,M,,",
+        "GPGSA,A,3,01,02,99999,,,,,,,,,,1.8,1.1,1.4",
+    ])
+    counts = nmea_columnar.stream_to_columnar(filename, str(tmp_path))
+    assert counts == {"GGA": 2, "GSA": 1}
+
+    gga = pq.read_table(nmea_columnar.output_file("GGA", directory=str(tmp_path))).to_pydict()
+    assert gga["fix_quality"] == [None, 1]
+    assert gga["satellites"] == [12, None]
+    gsa = pq.read_table(nmea_columnar.output_file("GSA", directory=str(tmp_path))).to_pydict()
+    assert gsa["satellite_ids"] == [[1, 2, None]]
+
+
+def test_failed_batch_is_not_retried(tmp_path):
+    output = nmea_columnar.ColumnarOutput(str(tmp_path / "gga.parquet"), "GGA")
+    output._pending.append(("not a time",) + (None,) * 5)
+    with pytest.raises(Exception):
+        output.flush()
+    assert output._pending == []
@@ -0,0 +1,24 @@
+from nmea_epoch import MAX_PENDING, EpochAssembler, iter_epochs
+
+GSA = {"Mode 2": "3", "PDOP": "1.5", "HDOP": "0.9", "VDOP": "1.2", "Satellite IDs": ["01", "02", ""]}
+GGA = ["12:00:00.000", "48.1173", "11.5167", "545.4", "08", "1"]
+
+
+def test_untimed_records_before_the_first_fix_join_it():
+    epochs = list(iter_epochs([("GSA", GSA), ("GGA", GGA)]))
+    assert len(epochs) == 1
+    assert epochs[0]["utc_time"] == "12:00:00.000"
+    assert epochs[0]["used_satellites"] == ["01", "02"]
+
+
+def test_untimed_records_are_bounded_and_kept_at_flush():
+    assembler = EpochAssembler()
+    finished = [assembler.add("GSA", GSA) for _ in range(MAX_PENDING + 1)]
+    untimed = [epoch for epoch in finished if epoch is not None]
+    assert len(untimed) == 1
+    assert untimed[0]["utc_time"] == ''
+    assert len(untimed[0]["used_satellites"]) == 2 * MAX_PENDING
+
+    leftover = assembler.flush()
+    assert leftover["utc_time"] == '' and leftover["used_satellites"] == ["01", "02"]
+    assert assembler.flush() is None
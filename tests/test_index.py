@@ -0,0 +1,39 @@
+import datetime
+
+import nmea_parser
+from nmea_generator import LogGenerator, write_log
+from nmea_index import LogIndex, parse_date, parse_time
+
+
+def query_times(index, sentence_type, start, end, date=None):
+    return [data[0] for _, data in index.query([sentence_type], parse_time(start), parse_time(end),
+                                                None if date is None else parse_date(date), checksum="skip")]
+
+
+def test_date_query_keeps_the_epoch_before_the_first_rmc(tmp_path):
+    # Generated epochs are GGA, GSA, GSV..., RMC: the first GGA of the log comes before any date
+    filename = str(tmp_path / "log.nmea")
+    write_log(filename, duration=120, rate=10)
+    index = LogIndex.build(filename, interval=100)
+
+    undated = query_times(index, "GGA", "17:01", "17:02")
+    dated = query_times(index, "GGA", "17:01", "17:02", "020825")
+    assert dated == undated
+    assert dated[0] == "17:01:41.751"
+
+    expected = [data[0] for _, data in nmea_parser.iter_records(open(filename).read().splitlines(), ["GGA"],
+                                                                 checksum="skip")
+                if "17:01:00" <= data[0] <= "17:02:00"]
+    assert dated == expected
+
+
+def test_date_query_across_midnight(tmp_path):
+    filename = tmp_path / "midnight.nmea"
+    generator = LogGenerator(start=datetime.datetime(2025, 8, 2, 23, 59, 50))
+    filename.write_text(''.join(line + '\n' for _ in range(20) for line in generator.epoch()))
+    index = LogIndex.build(str(filename), interval=7)
+
+    assert query_times(index, "GGA", "23:59:55", "23:59:59.999", "020825") == \
+        [f"23:59:{second}.000" for second in range(55, 60)]
+    assert query_times(index, "GGA", "00:00", "00:00:04", "030825") == \
+        [f"00:00:0{second}.000" for second in range(5)]
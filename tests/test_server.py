@@ -0,0 +1,12 @@
+from nmea_server import IngestServer, RingBufferSink
+
+
+def test_source_ids_keep_receivers_behind_one_host_apart():
+    server = IngestServer([RingBufferSink()])
+    assert server.source_id('tcp', ('10.0.0.5', 40312)) != server.source_id('tcp', ('10.0.0.5', 40313))
+    assert server.source_id('udp', ('10.0.0.5', 40312)) == "udp:10.0.0.5:40312"
+
+
+def test_sticky_source_ids_are_per_host():
+    server = IngestServer([RingBufferSink()], sticky_sources=True)
+    assert server.source_id('tcp', ('10.0.0.5', 40312)) == server.source_id('tcp', ('10.0.0.5', 40313)) == "tcp:10.0.0.5"